@@ -1,18 +1,22 @@
 # -*- coding: utf-8 -*-
 __title__   = "Delete: Dimension Styles"
-__doc__     = """Version = 1.0
-Date    = 20.12.2025
+__doc__     = """Version = 1.1
+Date    = 19.10.2026
 ________________________________________________________________
 Description:
 
 Safely delete unused Dimension Styles from the model.
 
+Instance counts come from one collector pass (lib/typeusage.py). Default
+types and types Revit still references elsewhere (nested families, view
+templates, other types) are listed but never offered for deletion.
+
 Relative Path:
 ...\
 ________________________________________________________________
 How-To:
 
-1. Click on
+1. Review the usage table, select the unused Dimension Styles to delete.
 
 ________________________________________________________________
 Get Free:
@@ -25,53 +29,30 @@ clr.AddReference("RevitAPI")
 from Autodesk.Revit.DB import *
 from pyrevit import revit, forms, script
 
+from typeusage import TypeUsage, DIMENSION, type_name
+
 doc = revit.doc
 output = script.get_output()
 
-# 1. Collect all DimensionTypes
-dim_styles = list(FilteredElementCollector(doc).OfClass(DimensionType).ToElements())
+# ---------------------------------------
+# 1. Collect types and instance counts
+usage = TypeUsage(doc, [DIMENSION])
+rows = usage.rows(DIMENSION)
 
-if not dim_styles:
+if not rows:
     forms.alert("No Dimension Styles found.")
     script.exit()
 
-# 2. Collect all Dimensions to identify used styles
-used_type_ids = set(
-    d.GetTypeId().IntegerValue
-    for d in FilteredElementCollector(doc)
-    .OfClass(Dimension)
-    .WhereElementIsNotElementType()
-)
+output.print_table(rows, columns=["Dimension Style", "Instances", "Status"], title="Dimension Styles usage")
 
-# 3. Build selection list
-items = []
-unused_map = {}
-
-for dstyle in dim_styles:
-    name_param = dstyle.get_Parameter(BuiltInParameter.SYMBOL_NAME_PARAM)
-    if not name_param:
-        continue
-    name = name_param.AsString()
-    if not name:
-        continue
-
-    type_id = dstyle.Id.IntegerValue
-    if type_id in used_type_ids:
-        label = "{}  —  (in use)".format(name)
-    else:
-        label = "{}  —  [UNUSED]".format(name)
-        unused_map[label] = dstyle
-
-    items.append(label)
-
-# 4. Prompt user to select unused styles
-selectable = sorted([label for label in items if label in unused_map])
-if not selectable:
+# 2. Build selection list (unused only)
+unused_map = dict(("{}  —  [UNUSED]".format(type_name(t)), t) for t in usage.unused(DIMENSION))
+if not unused_map:
     forms.alert("No unused Dimension Styles found.")
     script.exit()
 
 selected = forms.SelectFromList.show(
-    selectable,
+    sorted(unused_map.keys()),
     multiselect=True,
     title="Select Unused Dimension Styles to Delete",
     button_name="Delete Selected",
@@ -80,16 +61,13 @@ selected = forms.SelectFromList.show(
 if not selected:
     script.exit("Nothing selected.")
 
-# 5. Safe deletion
+# 3. Safe deletion
 with Transaction(doc, "Delete Unused Dimension Styles") as t:
     t.Start()
-    count = 0
-    for label in selected:
-        try:
-            doc.Delete(unused_map[label].Id)
-            count += 1
-        except Exception as e:
-            output.print_md("*Could not delete `{}` – {}*".format(label, e))
+    count, failed = usage.delete([unused_map[label] for label in selected])
     t.Commit()
 
+for name, error in failed:
+    output.print_md("*Could not delete `{}` – {}*".format(name, error))
+
 forms.alert("✅ Deleted {} unused Dimension Style(s).".format(count))
@@ -1,18 +1,22 @@
 # -*- coding: utf-8 -*-
 __title__   = "Delete: Unused Filled Regions"
-__doc__     = """Version = 1.0
-Date    = 20.12.2025
+__doc__     = """Version = 1.1
+Date    = 19.10.2026
 ________________________________________________________________
 Description:
 
 Delete unused Filled Region Types from the project.
 
+Instance counts come from one collector pass (lib/typeusage.py). Default
+types and types Revit still references elsewhere (nested families, view
+templates, other types) are listed but never offered for deletion.
+
 Relative Path:
 ...\
 ________________________________________________________________
 How-To:
 
-1. Click on...
+1. Review the usage table, select the unused Filled Region Types to delete.
 
 ________________________________________________________________
 Get Free:
@@ -25,53 +29,30 @@ clr.AddReference("RevitAPI")
 from Autodesk.Revit.DB import *
 from pyrevit import revit, forms, script
 
+from typeusage import TypeUsage, FILLED_REGION, type_name
+
 doc = revit.doc
 output = script.get_output()
 
 # ---------------------------------------
-# 1. Collect all FilledRegionTypes
-region_types = list(
-    FilteredElementCollector(doc).OfClass(FilledRegionType).ToElements()
-)
-if not region_types:
+# 1. Collect types and instance counts
+usage = TypeUsage(doc, [FILLED_REGION])
+rows = usage.rows(FILLED_REGION)
+
+if not rows:
     forms.alert("No Filled Region Types found.")
     script.exit()
 
-# 2. Collect used FilledRegion type Ids
-used_ids = set(
-    r.GetTypeId().IntegerValue
-    for r in FilteredElementCollector(doc)
-    .OfClass(FilledRegion)
-    .WhereElementIsNotElementType()
-)
+output.print_table(rows, columns=["Filled Region Type", "Instances", "Status"], title="Filled Region Types usage")
 
-# 3. Build selection list for unused types
-items = []
-unused_map = {}
-
-for frt in region_types:
-    name_param = frt.get_Parameter(BuiltInParameter.SYMBOL_NAME_PARAM)
-    name = name_param.AsString() if name_param else None
-    if not name:
-        continue
-
-    label = (
-        "{}  —  [UNUSED]".format(name)
-        if frt.Id.IntegerValue not in used_ids
-        else "{}  —  (in use)".format(name)
-    )
-    if frt.Id.IntegerValue not in used_ids:
-        unused_map[label] = frt
-    items.append(label)
-
-# 4. Filter only deletable ones
-selectable = sorted([label for label in items if label in unused_map])
-if not selectable:
+# 2. Build selection list (unused only)
+unused_map = dict(("{}  —  [UNUSED]".format(type_name(t)), t) for t in usage.unused(FILLED_REGION))
+if not unused_map:
     forms.alert("No unused Filled Region Types found.")
     script.exit()
 
 selected = forms.SelectFromList.show(
-    selectable,
+    sorted(unused_map.keys()),
     multiselect=True,
     title="Select Unused Filled Region Types to Delete",
     button_name="Delete Selected",
@@ -80,17 +61,13 @@ selected = forms.SelectFromList.show(
 if not selected:
     script.exit("Nothing selected.")
 
-# ---------------------------------------
-# 5. Delete selected unused types
+# 3. Safe deletion
 with Transaction(doc, "Delete Unused Filled Region Types") as t:
     t.Start()
-    count = 0
-    for label in selected:
-        try:
-            doc.Delete(unused_map[label].Id)
-            count += 1
-        except Exception as e:
-            output.print_md("*Could not delete `{}` – {}*".format(label, e))
+    count, failed = usage.delete([unused_map[label] for label in selected])
     t.Commit()
 
+for name, error in failed:
+    output.print_md("*Could not delete `{}` – {}*".format(name, error))
+
 forms.alert("✅ Deleted {} unused Filled Region Type(s).".format(count))
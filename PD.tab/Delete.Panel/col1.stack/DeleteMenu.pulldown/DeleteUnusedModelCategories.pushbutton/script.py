@@ -1,18 +1,34 @@
 # -*- coding: utf-8 -*-
 __title__   = "Delete: Subcategories"
-__doc__     = """Version = 1.0
-Date    = 20.12.2025
+__doc__     = """Version = 1.1
+Date    = 19.10.2026
 ________________________________________________________________
 Description:
 
 List and delete unused or custom subcategories like "Site ➜ BG_Utilities".
 
+Usage is found in one sweep over the model instead of one collector
+per subcategory. A subcategory is in use when it is referenced by:
+  - placed family geometry (graphics styles of solids, curves and
+    nested instances; each family is inspected once)
+  - model / detail lines (line styles)
+  - imported / linked CAD files (the import and its layers)
+  - elements whose category is the subcategory itself
+Built-in subcategories are listed but cannot be deleted.
+
+Subcategories of a category that has loaded families are listed as
+(family) and never offered for deletion: a family can use them in plan
+symbolic lines, at Coarse / Fine, behind visibility parameters, in other
+types or while unplaced - none of which the model sweep can see - and
+deleting them edits the families. Remove those in the family editor.
+
 Relative Path:
 ...\
 ________________________________________________________________
 How-To:
 
-1. Click on...
+1. Click the button; the usage report is printed.
+2. Pick the subcategories to delete (unused ones are listed first).
 
 ________________________________________________________________
 Get Free:
@@ -20,6 +36,7 @@ ________________________________________________________________
 Author: Jarek Wityk"""
 
 import clr
+import time
 
 clr.AddReference("RevitAPI")
 from Autodesk.Revit.DB import *
@@ -28,9 +45,90 @@ from pyrevit import revit, forms, script
 doc = revit.doc
 output = script.get_output()
 
+UNUSED = "[UNUSED]"
+BUILT_IN = "(built-in)"
+FAMILY = "(family)"
+
+GEOMETRY = "family geometry"
+LINES = "line style"
+IMPORTS = "CAD import"
+ELEMENTS = "element category"
+
+
+# ------------------------------------------------------
+# Usage engine
+def _styles_in(geometry, found):
+    """Collect GraphicsStyle ids of a geometry tree (nested instances included)."""
+    if geometry is None:
+        return
+    for obj in geometry:
+        style_id = obj.GraphicsStyleId
+        if style_id != ElementId.InvalidElementId:
+            found.add(style_id.IntegerValue)
+        if isinstance(obj, GeometryInstance):
+            _styles_in(obj.GetSymbolGeometry(), found)
+
+
+def subcategory_usage(doc):
+    """{category id int: set(usage sources)} from one sweep over the model."""
+    usage = {}
+
+    def mark(cat_id, source):
+        if cat_id is not None and cat_id != ElementId.InvalidElementId:
+            usage.setdefault(cat_id.IntegerValue, set()).add(source)
+
+    style_category = {}
+    for gs in FilteredElementCollector(doc).OfClass(GraphicsStyle):
+        if gs.GraphicsStyleCategory:
+            style_category[gs.Id.IntegerValue] = gs.GraphicsStyleCategory.Id
+
+    options = Options()
+    options.IncludeNonVisibleObjects = True
+    seen_families = set()
+    geometry_styles = set()
+
+    for el in FilteredElementCollector(doc).WhereElementIsNotElementType():
+        if el.Category is not None:
+            mark(el.Category.Id, ELEMENTS)
+        if isinstance(el, FamilyInstance):
+            family_id = el.Symbol.Family.Id.IntegerValue
+            if family_id in seen_families:
+                continue
+            seen_families.add(family_id)
+            try:
+                _styles_in(el.get_Geometry(options), geometry_styles)
+            except Exception:
+                pass  # elements without geometry (e.g. some annotations)
+        elif isinstance(el, CurveElement):
+            try:
+                mark(el.LineStyle.GraphicsStyleCategory.Id, LINES)
+            except Exception:
+                pass
+        elif isinstance(el, ImportInstance):
+            mark(el.Category.Id, IMPORTS)
+            for layer in el.Category.SubCategories:
+                mark(layer.Id, IMPORTS)
+
+    for style_id in geometry_styles:
+        mark(style_category.get(style_id), GEOMETRY)
+    return usage, len(seen_families)
+
+
+def family_categories(doc):
+    """Ids (ints) of every category that owns a loaded family, placed or not."""
+    found = set()
+    for fam in FilteredElementCollector(doc).OfClass(Family):
+        try:
+            found.add(fam.FamilyCategory.Id.IntegerValue)
+        except Exception:
+            pass
+    return found
+
+
 # ------------------------------------------------------
 # 1. Collect all subcategories from all top-level categories
 subcat_map = {}
+parent_of = {}  # subcategory id int -> parent category id int
 
 for cat in doc.Settings.Categories:
     if not cat.SubCategories:
@@ -39,29 +137,53 @@ for cat in doc.Settings.Categories:
         # Format: "Parent ➜ Subcategory"
         label = "{} ➜ {}".format(cat.Name, subcat.Name)
         subcat_map[label] = subcat
+        parent_of[subcat.Id.IntegerValue] = cat.Id.IntegerValue
 
 if not subcat_map:
     forms.alert("No subcategories found.")
     script.exit()
 
 # ------------------------------------------------------
-# 2. Check if each subcategory is used
+# 2. Check if each subcategory is used (one sweep)
+start = time.time()
+usage, family_count = subcategory_usage(doc)
+family_cats = family_categories(doc)
+
 label_usage = {}
-for label, subcat in subcat_map.items():
-    collector = (
-        FilteredElementCollector(doc)
-        .WhereElementIsNotElementType()
-        .OfCategoryId(subcat.Id)
-    )
-    is_used = any(collector)
-    status = "(in use)" if is_used else "[UNUSED]"
-    full_label = "{}  —  {}".format(label, status)
-    label_usage[full_label] = subcat
+rows = []
+for label, subcat in sorted(subcat_map.items()):
+    sources = usage.get(subcat.Id.IntegerValue)
+    if subcat.Id.IntegerValue < 0:
+        status = BUILT_IN
+    elif parent_of[subcat.Id.IntegerValue] in family_cats:
+        status = FAMILY  # usage inside families cannot be proven from the model
+    elif sources:
+        status = "(in use)"
+    else:
+        status = UNUSED
+    rows.append([label, status, ", ".join(sorted(sources or []))])
+    if status not in (BUILT_IN, FAMILY):
+        full_label = "{}  —  {}".format(label, status)
+        label_usage[full_label] = subcat
+
+unused_count = len([r for r in rows if r[1] == UNUSED])
+output.print_table(
+    sorted(rows, key=lambda r: (r[1] != UNUSED, r[0])),
+    columns=["Subcategory", "Status", "Used by"],
+    title="{} subcategories, {} unused ({} families inspected, {:.2f} s)".format(
+        len(rows), unused_count, family_count, time.time() - start),
+)
+output.print_md("*{} (family) subcategories belong to categories with loaded families "
+                "and are not offered for deletion.*".format(len([r for r in rows if r[1] == FAMILY])))
+
+if not label_usage:
+    forms.alert("No subcategories can be deleted here.")
+    script.exit()
 
 # ------------------------------------------------------
 # 3. Prompt user to select subcategories to delete
 selected = forms.SelectFromList.show(
-    sorted(label_usage.keys()),
+    sorted(label_usage.keys(), key=lambda l: (UNUSED not in l, l)),
     multiselect=True,
     title="Select Subcategories to Delete",
     button_name="Delete Selected",
@@ -84,4 +206,4 @@ with Transaction(doc, "Delete Subcategories") as t:
             output.print_md("*Could not delete `{}` – {}*".format(subcat.Name, e))
     t.Commit()
 
-forms.alert("✅ Attempted to delete {} subcategory(ies).".format(count))
+forms.alert("✅ Attempted to delete {} subcategory(ies).".format(count))
\ No newline at end of file
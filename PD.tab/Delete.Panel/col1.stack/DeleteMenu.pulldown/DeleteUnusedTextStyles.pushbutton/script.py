@@ -1,18 +1,22 @@
 # -*- coding: utf-8 -*-
 __title__   = "Delete: Unused Text Styles"
-__doc__     = """Version = 1.0
-Date    = 20.12.2025
+__doc__     = """Version = 1.1
+Date    = 19.10.2026
 ________________________________________________________________
 Description:
 
 Delete only unused TextNoteTypes (Text Styles)
 
+Instance counts come from one collector pass (lib/typeusage.py). Default
+types and types Revit still references elsewhere (nested families, view
+templates, other types) are listed but never offered for deletion.
+
 Relative Path:
 ...\
 ________________________________________________________________
 How-To:
 
-1. Click on...
+1. Review the usage table, select the unused Text Styles to delete.
 
 ________________________________________________________________
 Get Free:
@@ -25,52 +29,30 @@ clr.AddReference("RevitAPI")
 from Autodesk.Revit.DB import *
 from pyrevit import revit, forms, script
 
+from typeusage import TypeUsage, TEXT, type_name
+
 doc = revit.doc
 output = script.get_output()
 
 # ---------------------------------------
-# 1. Collect all TextNoteTypes
-text_types = list(FilteredElementCollector(doc).OfClass(TextNoteType).ToElements())
+# 1. Collect types and instance counts
+usage = TypeUsage(doc, [TEXT])
+rows = usage.rows(TEXT)
 
-if not text_types:
-    forms.alert("No Text Styles (TextNoteTypes) found.")
+if not rows:
+    forms.alert("No Text Styles found.")
     script.exit()
 
-# 2. Collect all TextNotes and track used types
-used_type_ids = set(
-    tn.GetTypeId().IntegerValue
-    for tn in FilteredElementCollector(doc)
-    .OfClass(TextNote)
-    .WhereElementIsNotElementType()
-)
-
-# 3. Build selection list
-items = []
-unused_map = {}
+output.print_table(rows, columns=["Text Style", "Instances", "Status"], title="Text Styles usage")
 
-for ttype in text_types:
-    name_param = ttype.get_Parameter(BuiltInParameter.SYMBOL_NAME_PARAM)
-    name = name_param.AsString() if name_param else Element.Name.GetValue(ttype)
-    if not name:
-        continue
-
-    type_id = ttype.Id.IntegerValue
-    if type_id in used_type_ids:
-        label = "{}  —  (in use)".format(name)
-    else:
-        label = "{}  —  [UNUSED]".format(name)
-        unused_map[label] = ttype
-
-    items.append(label)
-
-# 4. Prompt user to select unused styles
-selectable = sorted([label for label in items if label in unused_map])
-if not selectable:
+# 2. Build selection list (unused only)
+unused_map = dict(("{}  —  [UNUSED]".format(type_name(t)), t) for t in usage.unused(TEXT))
+if not unused_map:
     forms.alert("No unused Text Styles found.")
     script.exit()
 
 selected = forms.SelectFromList.show(
-    selectable,
+    sorted(unused_map.keys()),
     multiselect=True,
     title="Select Unused Text Styles to Delete",
     button_name="Delete Selected",
@@ -79,16 +61,13 @@ selected = forms.SelectFromList.show(
 if not selected:
     script.exit("Nothing selected.")
 
-# 5. Safe deletion
+# 3. Safe deletion
 with Transaction(doc, "Delete Unused Text Styles") as t:
     t.Start()
-    count = 0
-    for label in selected:
-        try:
-            doc.Delete(unused_map[label].Id)
-            count += 1
-        except Exception as e:
-            output.print_md("*Could not delete `{}` – {}*".format(label, e))
+    count, failed = usage.delete([unused_map[label] for label in selected])
     t.Commit()
 
+for name, error in failed:
+    output.print_md("*Could not delete `{}` – {}*".format(name, error))
+
 forms.alert("✅ Deleted {} unused Text Style(s).".format(count))
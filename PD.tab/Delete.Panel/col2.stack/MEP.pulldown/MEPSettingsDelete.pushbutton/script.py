@@ -1,18 +1,26 @@
 # -*- coding: utf-8 -*-
-__title__   = "MEP: Delete Load Classifications"
-__doc__     = """Version = 1.0
-Date    = 20.12.2025
+__title__   = "MEP: Delete Unused Settings"
+__doc__     = """Version = 1.1
+Date    = 19.10.2026
 ________________________________________________________________
 Description:
 
-Delete electrical Load Classifications from MEP settings.
+Delete unused electrical MEP settings: load classifications, demand
+factors, wire types, voltage types and distribution systems.
+
+Settings are collected by class and cross-referenced in one pass against
+circuits, wires, equipment, the load classification of family
+instances and their electrical connectors, distribution systems and load
+classifications (lib/mepsettings.py). A usage table is printed and only
+settings used by nothing are offered for deletion.
 
 Relative Path:
 ...\
 ________________________________________________________________
 How-To:
 
-1. Click on...
+1. Pick the setting kinds to check.
+2. Review the usage table, select the unused settings to delete.
 
 ________________________________________________________________
 Get Free:
@@ -26,6 +34,8 @@ from Autodesk.Revit.DB import *
 
 from pyrevit import revit, forms, script
 
+from mepsettings import MEPSettings, KINDS
+
 # ----------------------------------------------
 doc = revit.doc
 output = script.get_output()
@@ -35,29 +45,48 @@ if doc is None:
     script.exit()
 
 # ----------------------------------------------
-# Collect only Load Classifications
-elements = FilteredElementCollector(doc).WhereElementIsNotElementType().ToElements()
-load_classes = [
-    e for e in elements if e.GetType().Name == "ElectricalLoadClassification"
-]
-
-if not load_classes:
-    forms.alert("No Load Classifications found in this model.")
+# Pick kinds, collect settings and their usage
+kinds = forms.SelectFromList.show(
+    [kind for kind, _ in KINDS],
+    multiselect=True,
+    title="MEP Settings to Check",
+    button_name="Check Usage",
+)
+if not kinds:
+    script.exit()
+
+mep = MEPSettings(doc)
+setting_ids = mep.ids(kinds)
+
+if not setting_ids:
+    forms.alert("No {} found in this model.".format(", ".join(kinds)))
+    script.exit()
+
+output.print_table(
+    [
+        [mep.kind(sid), mep.name(sid), mep.use_count(sid), mep.describe_usage(sid) or "[UNUSED]"]
+        for sid in setting_ids
+    ],
+    columns=["Kind", "Name", "Uses", "Used by"],
+    title="MEP settings usage",
+)
+
+unused = mep.unused(kinds)
+if not unused:
+    forms.alert("All selected settings are in use.")
     script.exit()
 
 # ----------------------------------------------
-# Build UI list
-items = []
+# Build UI list (unused only)
 label_map = {}
-for lc in load_classes:
-    label = "Load Classification: {}".format(lc.Name)
-    items.append(label)
-    label_map[label] = lc
+for sid in unused:
+    label = "{}: {}".format(mep.kind(sid), mep.name(sid))
+    label_map[label] = sid
 
 selected = forms.SelectFromList.show(
-    sorted(items),
+    sorted(label_map.keys()),
     multiselect=True,
-    title="Select Load Classifications to Delete",
+    title="Select Unused MEP Settings to Delete",
     button_name="Delete Selected",
 )
 
@@ -66,15 +95,15 @@ if not selected:
 
 # ----------------------------------------------
 # Safe deletion
-with Transaction(doc, "Delete Load Classifications") as t:
+with Transaction(doc, "Delete MEP Settings") as t:
     t.Start()
     count = 0
     for label in selected:
         try:
-            doc.Delete(label_map[label].Id)
+            doc.Delete(ElementId(label_map[label]))
             count += 1
         except Exception as e:
             output.print_md("*Could not delete `{}` – {}*".format(label, e))
     t.Commit()
 
-forms.alert("✅ Deleted {} Load Classification(s).".format(count))
+forms.alert("✅ Deleted {} MEP setting(s).".format(count))
@@ -1,18 +1,22 @@
 # -*- coding: utf-8 -*-
 __title__   = "Viewport: Audit All Viewport Types"
-__doc__     = """Version = 1.0
-Date    = 20.12.2025
+__doc__     = """Version = 1.1
+Date    = 19.10.2026
 ________________________________________________________________
 Description:
 
-Lists all used viewport types with counts for safe manual reassignment and purging.
+Lists all viewport types with instance counts for safe manual reassignment
+and purging. Unused types can be deleted in one transaction, and the type
+usage of every annotation kind (text, dimension, filled region, viewport)
+can be saved as CSV. Counts come from one collector pass (lib/typeusage.py).
 
 Relative Path:
 ...\
 ________________________________________________________________
 How-To:
 
-1. Click on...
+1. Review the audit.
+2. Choose to delete unused types or save the counts as CSV.
 
 ________________________________________________________________
 Get Free:
@@ -24,46 +28,68 @@ import clr
 clr.AddReference("RevitAPI")
 
 from Autodesk.Revit.DB import *
-from pyrevit import revit, script
+from pyrevit import revit, forms, script
+
+from typeusage import TypeUsage, VIEWPORT, IN_USE, UNUSED, type_name
 
 doc = revit.doc
 output = script.get_output()
 output.print_md("## 📊 Viewport Type Usage Audit\n")
 
-# 1. Collect all Viewport ElementTypes (no usage filter)
-all_types = FilteredElementCollector(doc).OfClass(ElementType).ToElements()
+DELETE_UNUSED = "Delete unused viewport types"
+SAVE_CSV = "Save all annotation type counts as CSV"
 
-viewport_types = []
-for t in all_types:
-    if t.Category and t.Category.Id.IntegerValue == int(BuiltInCategory.OST_Viewports):
-        viewport_types.append(t)
+# 1. Collect all types and instance counts (one pass for every kind)
+usage = TypeUsage(doc)
+rows = usage.rows(VIEWPORT)
 
-if not viewport_types:
+if not rows:
     output.print_md("_No viewport types found in model._")
     script.exit()
 
-# 2. Track used types by Viewport elements
-used_ids = set(
-    vp.GetTypeId().IntegerValue
-    for vp in FilteredElementCollector(doc).OfClass(Viewport).ToElements()
-)
-
-# 3. Output all types with usage tag
-output.print_md("Found **{}** viewport type(s):\n".format(len(viewport_types)))
-
-
-def _type_name(t):
-    name_param = t.get_Parameter(BuiltInParameter.SYMBOL_NAME_PARAM)
-    name = name_param.AsString() if name_param else None
-    return name if name else "(Unnamed)"
+# 2. Output all types with usage tag
+output.print_md("Found **{}** viewport type(s):\n".format(len(rows)))
 
-
-for t in sorted(viewport_types, key=lambda x: _type_name(x).lower()):
-    name = _type_name(t)
-    is_used = "✔ In Use" if t.Id.IntegerValue in used_ids else "❌ Not Used"
-    output.print_md("- **{}** — `{}`".format(name, is_used))
+TAGS = {IN_USE: "✔ In Use", UNUSED: "❌ Not Used"}
+for name, count, status in sorted(rows, key=lambda r: r[0].lower()):
+    tag = TAGS.get(status, "🔒 {}".format(status.capitalize()))
+    output.print_md("- **{}** — `{}` ({} viewport(s))".format(name, tag, count))
 
 output.print_md("\n### What to Do:\n")
 output.print_md("1. _Reassign instances of types you want to remove_")
-output.print_md("2. _Use **Purge Unused** to delete unused types (marked ❌)_")
+output.print_md("2. _Delete unused types (marked ❌) below or with **Purge Unused**_")
 output.print_md("3. _You can’t delete types in use unless you reassign them_")
+
+# 3. Optional follow-up
+selected_option = forms.CommandSwitchWindow.show(
+    [DELETE_UNUSED, SAVE_CSV],
+    message="Viewport types:",
+)
+
+if selected_option == DELETE_UNUSED:
+    unused = usage.unused(VIEWPORT)
+    if not unused:
+        forms.alert("No unused viewport types found.")
+        script.exit()
+    if not forms.alert(
+        "Delete {} unused viewport type(s)?\n\n{}".format(
+            len(unused), "\n".join(type_name(t) for t in unused)),
+        yes=True, no=True,
+    ):
+        script.exit()
+    with Transaction(doc, "Delete Unused Viewport Types") as t:
+        t.Start()
+        count, failed = usage.delete(unused)
+        t.Commit()
+    for name, error in failed:
+        output.print_md("*Could not delete `{}` – {}*".format(name, error))
+    forms.alert("✅ Deleted {} unused Viewport Type(s).".format(count))
+
+elif selected_option == SAVE_CSV:
+    path = forms.save_file(file_ext="csv", title="Save Annotation Type Usage")
+    if path:
+        try:
+            usage.write_csv(path)
+            output.print_md("Type usage saved to `{}`".format(path))
+        except IOError as ex:
+            forms.alert("Could not save the file.\n\n{}\n\nClose the file if it is open.".format(ex))
@@ -1,11 +1,90 @@
-"""Add selected view to selected sheets."""
+"""Add selected views to selected sheets, laid out without overlaps.
+
+Each view's paper size is read from its outline and each sheet's usable area
+from the titleblock extents minus the margins. Viewports are packed with a
+MaxRects bin packer (lib/sheetpack.py) around anything already on the sheet,
+spilling onto the next selected sheet and, if allowed, onto new sheets with
+the same titleblock. Everything is placed in one transaction.
+"""
+# pylint: disable=import-error,invalid-name,broad-except
+import time
 
 from pyrevit import revit, DB
 from pyrevit import forms
 from pyrevit import script
 
+from sheetpack import pack
+
 
 logger = script.get_logger()
+output = script.get_output()
+
+MM = 304.8
+DEFAULT_MARGINS = "20, 10, 10, 10, 10"
+MIN_SIZE = 10.0 / MM  # empty views still get a slot
+
+
+def parse_margins(text):
+    """'left, bottom, right, top, gap' in mm -> tuple in feet, or None."""
+    try:
+        values = [float(v) / MM for v in text.replace(";", ",").split(",")]
+    except (ValueError, AttributeError):
+        return None
+    return tuple(values) if len(values) == 5 else None
+
+
+def view_size(view):
+    outline = view.Outline
+    return (
+        max(outline.Max.U - outline.Min.U, MIN_SIZE),
+        max(outline.Max.V - outline.Min.V, MIN_SIZE),
+    )
+
+
+def sheet_extents(doc, sheet):
+    """(min x, min y, max x, max y) of the titleblock, or the sheet outline."""
+    titleblocks = (
+        DB.FilteredElementCollector(doc, sheet.Id)
+        .OfCategory(DB.BuiltInCategory.OST_TitleBlocks)
+        .WhereElementIsNotElementType()
+        .ToElements()
+    )
+    for tb in titleblocks:
+        bbox = tb.get_BoundingBox(sheet)
+        if bbox:
+            return bbox.Min.X, bbox.Min.Y, bbox.Max.X, bbox.Max.Y
+    outline = sheet.Outline
+    return outline.Min.U, outline.Min.V, outline.Max.U, outline.Max.V
+
+
+def usable_area(extents, margins):
+    """(origin x, origin y, width, height) inside the margins."""
+    left, bottom, right, top = margins[:4]
+    x0, y0 = extents[0] + left, extents[1] + bottom
+    return x0, y0, extents[2] - right - x0, extents[3] - top - y0
+
+
+def occupied(doc, sheet, area):
+    """Boxes of viewports and schedules already on the sheet, in packer coordinates."""
+    rects = []
+    for vp_id in sheet.GetAllViewports():
+        box = doc.GetElement(vp_id).GetBoxOutline()
+        rects.append((box.MinimumPoint, box.MaximumPoint))
+    for ssi in DB.FilteredElementCollector(doc, sheet.Id).OfClass(DB.ScheduleSheetInstance):
+        bbox = ssi.get_BoundingBox(sheet)
+        if bbox:
+            rects.append((bbox.Min, bbox.Max))
+    return [
+        (lo.X - area[0], lo.Y - area[1], hi.X - lo.X, hi.Y - lo.Y) for lo, hi in rects
+    ]
+
+
+def titleblock_type(doc, sheet):
+    for tb in DB.FilteredElementCollector(doc, sheet.Id).OfCategory(
+        DB.BuiltInCategory.OST_TitleBlocks
+    ).WhereElementIsNotElementType():
+        return tb.GetTypeId()
+    return DB.ElementId.InvalidElementId
 
 
 selected_views = forms.select_views(use_selection=True)
@@ -15,22 +94,100 @@ if selected_views:
     logger.debug("Selected views: {}".format(len(selected_views)))
     # get the destination sheets from user
     dest_sheets = forms.select_sheets(include_placeholder=False)
-
+    margins = None
     if dest_sheets:
+        margins = parse_margins(
+            forms.ask_for_string(
+                default=DEFAULT_MARGINS,
+                prompt="Margins inside the titleblock and gap between viewports (mm):\n"
+                "left, bottom, right, top, gap",
+                title="Sheet Layout",
+            )
+            or ""
+        )
+        if margins is None:
+            forms.alert("Enter five numbers: left, bottom, right, top, gap.")
+
+    if dest_sheets and margins:
         logger.debug("Selected sheets: {}".format(len(dest_sheets)))
+        doc = revit.doc
+        start = time.time()
+        gap = margins[4]
+
+        items, skipped = [], []
+        for view in selected_views:
+            if DB.Viewport.CanAddViewToSheet(doc, dest_sheets[0].Id, view.Id):
+                w, h = view_size(view)
+                items.append((view.Id.IntegerValue, w, h))
+            else:
+                skipped.append(view)
+
+        areas = [usable_area(sheet_extents(doc, s), margins) for s in dest_sheets]
+        sizes = [(a[2], a[3]) for a in areas]
+        reserved = dict(
+            (i, occupied(doc, s, areas[i])) for i, s in enumerate(dest_sheets)
+        )
+
+        t0 = time.time()
+        placed, unplaced, bins = pack(
+            items, sizes, padding=gap, new_bin=sizes[0], reserved=reserved
+        )
+        extra = len(bins) - len(dest_sheets)
+        if extra and not forms.alert(
+            "The views do not fit on the selected sheets.\n"
+            "Create {} more sheet(s) with the titleblock of {}?".format(
+                extra, dest_sheets[0].SheetNumber
+            ),
+            yes=True,
+            no=True,
+        ):
+            placed, unplaced, bins = pack(items, sizes, padding=gap, reserved=reserved)
+            extra = 0
+        pack_time = time.time() - t0
+
+        by_id = dict((v.Id.IntegerValue, v) for v in selected_views)
+        sizes_by_id = dict((key, (w, h)) for key, w, h in items)
+        failed = []
         with revit.Transaction("Add Views to Sheets"):
-            for selected_view in selected_views:
-                for sheet in dest_sheets:
-                    logger.debug("Adding: %s", revit.query.get_name(selected_view))
-                    try:
-                        DB.Viewport.Create(
-                            revit.doc, sheet.Id, selected_view.Id, DB.XYZ(0, 0, 0)
-                        )
-                    except Exception:
-                        logger.debug(
-                            "Error placing view on sheet: {} -> {}".format(
-                                selected_view.Id, sheet.Id
-                            )
-                        )
+            sheets = list(dest_sheets)
+            tb_type = titleblock_type(doc, dest_sheets[0])
+            for _ in range(extra):
+                sheets.append(DB.ViewSheet.Create(doc, tb_type))
+                areas.append(areas[0])
+            for key, (index, x, y) in placed.items():
+                w, h = sizes_by_id[key]
+                area = areas[index]
+                center = DB.XYZ(area[0] + x + w / 2.0, area[1] + y + h / 2.0, 0)
+                logger.debug("Adding: %s", revit.query.get_name(by_id[key]))
+                try:
+                    DB.Viewport.Create(doc, sheets[index].Id, by_id[key].Id, center)
+                except Exception as ex:
+                    failed.append((by_id[key], str(ex)))
+
+        rows = []
+        for index, sheet in enumerate(sheets):
+            count = len([1 for p in placed.values() if p[0] == index])
+            rows.append(
+                [
+                    sheet.SheetNumber,
+                    sheet.Name,
+                    count,
+                    "{:.0f}%".format(bins[index].occupancy() * 100),
+                    "new" if index >= len(dest_sheets) else "",
+                ]
+            )
+        output.print_table(
+            rows,
+            columns=["Sheet", "Name", "Views placed", "Area used", ""],
+            title="Sheet layout ({} views packed in {:.3f} s)".format(len(items), pack_time),
+        )
+        problems = (
+            [[revit.query.get_name(v), "already on a sheet / not placeable"] for v in skipped]
+            + [[revit.query.get_name(by_id[k]), "does not fit on the sheets"] for k in unplaced]
+            + [[revit.query.get_name(v), err] for v, err in failed]
+        )
+        if problems:
+            output.print_table(problems, columns=["View", "Not placed"])
+        output.print_md("Total: {:.2f} s".format(time.time() - start))
 else:
     forms.alert("No views selected.")
@@ -1,16 +1,246 @@
-"""Copy selected view templates to other open models."""
+"""Copy selected view templates (and filters) to other open models.
+
+The source is indexed once: templates -> filters -> fill/line patterns used
+by the filter overrides. For every destination the missing part of that
+dependency closure is computed against a name index of the destination and
+copied with a single CopyElements call. Templates that already exist are
+skipped, or replaced in place (views keep pointing at the new copy).
+A dry run prints what each destination would receive. Timings per document.
+"""
 
 # pylint: disable=import-error,invalid-name
-from pyrevit import revit
+import time
+
+from System.Collections.Generic import List
+from pyrevit import revit, DB
 from pyrevit import forms
+from pyrevit import script
+
+
+output = script.get_output()
+
+SKIP_EXISTING = "Copy missing only (skip templates that already exist)"
+REPLACE_EXISTING = "Copy and replace templates that already exist"
+DRY_RUN = "Dry run (report only, change nothing)"
+
+PATTERN_GETTERS = (
+    "ProjectionLinePatternId",
+    "CutLinePatternId",
+    "SurfaceForegroundPatternId",
+    "SurfaceBackgroundPatternId",
+    "CutForegroundPatternId",
+    "CutBackgroundPatternId",
+)
+
+
+class UseDestinationTypes(DB.IDuplicateTypeNamesHandler):
+    def OnDuplicateTypeNamesFound(self, args):
+        return DB.DuplicateTypeAction.UseDestinationTypes
+
+
+def kind_of(element):
+    if isinstance(element, DB.View):
+        return "Template"
+    if isinstance(element, DB.FilterElement):
+        return "Filter"
+    if isinstance(element, DB.FillPatternElement):
+        return "Fill Pattern"
+    if isinstance(element, DB.LinePatternElement):
+        return "Line Pattern"
+    return element.GetType().Name
+
+
+def name_index(doc):
+    """(kind, name) -> element id for templates, filters and patterns of a doc."""
+    index = {}
+    for view in DB.FilteredElementCollector(doc).OfClass(DB.View):
+        if view.IsTemplate:
+            index[("Template", view.Name)] = view.Id
+    for cls in (DB.FilterElement, DB.FillPatternElement, DB.LinePatternElement):
+        for el in DB.FilteredElementCollector(doc).OfClass(cls):
+            index[(kind_of(el), el.Name)] = el.Id
+    return index
+
+
+def index_source(src_doc, templates, extra_filters):
+    """Return {element id int: (kind, name, element id)} and {id int: [dependency id ints]}."""
+    nodes = {}
+    deps = {}
+
+    def add(el):
+        key = el.Id.IntegerValue
+        if key not in nodes:
+            nodes[key] = (kind_of(el), el.Name, el.Id)
+        return key
 
+    def add_filter_with_patterns(view, filter_id):
+        fkey = add(src_doc.GetElement(filter_id))
+        pats = deps.setdefault(fkey, [])
+        if view is None:
+            return fkey
+        overrides = view.GetFilterOverrides(filter_id)
+        for getter in PATTERN_GETTERS:
+            pat_id = getattr(overrides, getter, DB.ElementId.InvalidElementId)
+            if pat_id != DB.ElementId.InvalidElementId:
+                pat = src_doc.GetElement(pat_id)
+                if pat is not None and pat.Id.IntegerValue not in pats:
+                    pats.append(add(pat))
+        return fkey
 
-selected_viewtemplates = forms.select_viewtemplates(doc=revit.doc)
-if selected_viewtemplates:
+    for template in templates:
+        tkey = add(template)
+        deps[tkey] = [add_filter_with_patterns(template, fid) for fid in template.GetFilters()]
+    for flt in extra_filters:
+        add_filter_with_patterns(None, flt.Id)
+    return nodes, deps
+
+
+def closure(roots, deps):
+    seen = set()
+    ordered = []
+    stack = list(roots)
+    while stack:
+        key = stack.pop()
+        if key in seen:
+            continue
+        seen.add(key)
+        ordered.append(key)
+        stack.extend(deps.get(key, []))
+    return ordered
+
+
+def plan_for(dest_doc, nodes, deps, roots, replace):
+    """Ids to copy and existing templates to replace for one destination."""
+    existing = name_index(dest_doc)
+    to_copy, to_replace, present = [], [], []
+    for key in closure(roots, deps):
+        kind, name, _ = nodes[key]
+        if (kind, name) not in existing:
+            to_copy.append(key)
+        elif kind == "Template" and replace:
+            to_copy.append(key)
+            to_replace.append(existing[(kind, name)])
+        else:
+            present.append(key)
+    return to_copy, to_replace, present
+
+
+def apply_plan(src_doc, dest_doc, nodes, to_copy, to_replace):
+    # park the old templates under a temporary name so the copies keep the real one
+    old_by_name = {}
+    for old_id in to_replace:
+        old = dest_doc.GetElement(old_id)
+        old_by_name[old.Name] = old
+        old.Name = "{} (replaced {})".format(old.Name, old_id.IntegerValue)
+
+    options = DB.CopyPasteOptions()
+    options.SetDuplicateTypeNamesHandler(UseDestinationTypes())
+    ids = List[DB.ElementId]([nodes[key][2] for key in to_copy])
+    new_ids = DB.ElementTransformUtils.CopyElements(src_doc, ids, dest_doc, None, options)
+
+    if old_by_name:
+        new_templates = {}
+        for nid in new_ids:
+            el = dest_doc.GetElement(nid)
+            if isinstance(el, DB.View) and el.IsTemplate:
+                new_templates[el.Name] = el.Id
+        old_to_new = {}
+        for name, old in old_by_name.items():
+            if name in new_templates:
+                old_to_new[old.Id.IntegerValue] = new_templates[name]
+        for view in DB.FilteredElementCollector(dest_doc).OfClass(DB.View):
+            new_id = old_to_new.get(view.ViewTemplateId.IntegerValue)
+            if new_id is not None and not view.IsTemplate:
+                view.ViewTemplateId = new_id
+        dest_doc.Delete(List[DB.ElementId]([old.Id for old in old_by_name.values()
+                                            if old.Id.IntegerValue in old_to_new]))
+    return new_ids.Count
+
+
+def summarize(nodes, keys):
+    counts = {}
+    for key in keys:
+        kind = nodes[key][0]
+        counts[kind] = counts.get(kind, 0) + 1
+    return ", ".join("{} {}".format(v, k) for k, v in sorted(counts.items())) or "-"
+
+
+selected_viewtemplates = forms.select_viewtemplates(doc=revit.doc) or []
+filter_map = {f.Name: f for f in DB.FilteredElementCollector(revit.doc).OfClass(DB.FilterElement)}
+selected_filters = []
+if filter_map:
+    selected_filters = [
+        filter_map[n]
+        for n in (
+            forms.SelectFromList.show(
+                sorted(filter_map.keys()),
+                multiselect=True,
+                title="Also copy these filters (optional)",
+                button_name="Continue",
+            )
+            or []
+        )
+    ]
+
+if selected_viewtemplates or selected_filters:
     dest_docs = forms.select_open_docs(title="Select Destination Documents")
+    mode = None
     if dest_docs:
+        mode = forms.SelectFromList.show(
+            [SKIP_EXISTING, REPLACE_EXISTING, DRY_RUN],
+            multiselect=False,
+            title="Propagation Mode",
+            button_name="Run",
+        )
+    if dest_docs and mode:
+        start = time.time()
+        nodes, deps = index_source(revit.doc, selected_viewtemplates, selected_filters)
+        roots = [t.Id.IntegerValue for t in selected_viewtemplates] + [
+            f.Id.IntegerValue for f in selected_filters
+        ]
+        output.print_md(
+            "### Source indexed in {:.2f} s ({} elements in the closure)".format(
+                time.time() - start, len(closure(roots, deps))
+            )
+        )
+
+        rows = []
         for ddoc in dest_docs:
-            with revit.Transaction("Copy View Templates", doc=ddoc):
-                revit.create.copy_viewtemplates(
-                    selected_viewtemplates, src_doc=revit.doc, dest_doc=ddoc
-                )
+            t0 = time.time()
+            to_copy, to_replace, present = plan_for(
+                ddoc, nodes, deps, roots, mode == REPLACE_EXISTING
+            )
+            copied = 0
+            note = ""
+            if mode != DRY_RUN and to_copy:
+                try:
+                    with revit.Transaction("Copy View Templates", doc=ddoc):
+                        copied = apply_plan(revit.doc, ddoc, nodes, to_copy, to_replace)
+                except Exception as ex:
+                    note = str(ex)
+            rows.append(
+                [
+                    ddoc.Title,
+                    summarize(nodes, to_copy),
+                    len(to_replace),
+                    summarize(nodes, present),
+                    "-" if mode == DRY_RUN else copied,
+                    "{:.2f}".format(time.time() - t0),
+                    note,
+                ]
+            )
+
+        output.print_table(
+            rows,
+            columns=[
+                "Document",
+                "Would receive" if mode == DRY_RUN else "Received",
+                "Replaced",
+                "Already present",
+                "Elements copied",
+                "Time (s)",
+                "Error",
+            ],
+            title="Template propagation",
+        )
+        output.print_md("Total: {:.2f} s".format(time.time() - start))
@@ -1,71 +1,273 @@
-"""Creates print set from selected views."""
+"""Creates print set from selected views, or all print sets from a rules table.
+
+Rules table (CSV), one row per condition set; rows sharing a print set name
+are OR-ed, the conditions within a row are AND-ed (empty = any):
+
+    Print Set, Sheet Numbers, Parameter, Value, Revision
+    Issue - Arch, A-100..A-199; A-9*, , ,
+    Issue - Fire, , Discipline, Fire*, C03
+
+Sheet Numbers: ';'-separated ranges (natural order), globs or exact numbers.
+Value: glob on the parameter's displayed value. Revision: a revision number
+(or description glob) that must be on the sheet.
+
+All sheets are evaluated against all rules in one pass; every set is created
+or updated in one transaction. Sets whose membership is unchanged are skipped.
+"""
+# pylint: disable=import-error,invalid-name,broad-except
+import fnmatch
+import hashlib
+import time
 
 from pyrevit import framework
 from pyrevit import revit, script, DB
 from pyrevit import forms
 
+from csvutil import read_rows
+from renamer import natural_key, param_text
 
-# Get printmanager / viewsheetsetting
-printmanager = revit.doc.PrintManager
-printmanager.PrintRange = DB.PrintRange.Select
-viewsheetsetting = printmanager.ViewSheetSetting
 
-# Collect existing ViewSheetSets
-print_sets_existing = (
-    DB.FilteredElementCollector(revit.doc)
-    .WhereElementIsNotElementType()
-    .OfClass(DB.ViewSheetSet)
-    .ToElements()
-)
-print_sets_names_existing = [vs.Name for vs in print_sets_existing if vs.Name]
+output = script.get_output()
+config = script.get_config()
+
+FROM_SELECTION = "From selected views"
+FROM_RULES = "From rules table (CSV)"
+
+
+# ---------------------------------------------------------------- rules
+class NumberSpec(object):
+    """'A-100..A-199; A-9*; B-001' -> matcher over sheet numbers."""
+
+    def __init__(self, text):
+        self.ranges, self.globs = [], []
+        for part in (text or "").split(";"):
+            part = part.strip()
+            if ".." in part:
+                lo, hi = [p.strip() for p in part.split("..", 1)]
+                self.ranges.append((natural_key(lo), natural_key(hi)))
+            elif part:
+                self.globs.append(part)
+
+    def __nonzero__(self):
+        return bool(self.ranges or self.globs)
+
+    __bool__ = __nonzero__
+
+    def match(self, number):
+        key = natural_key(number)
+        if any(lo <= key <= hi for lo, hi in self.ranges):
+            return True
+        return any(fnmatch.fnmatchcase(number, g) for g in self.globs)
+
+
+class Rule(object):
+    def __init__(self, set_name, numbers, param, value, revision):
+        self.set_name = set_name
+        self.numbers = NumberSpec(numbers)
+        self.param = param
+        self.value = value
+        self.revision = revision
+
+    def match(self, info):
+        if self.numbers and not self.numbers.match(info["number"]):
+            return False
+        if self.param:
+            value = info["params"].get(self.param)
+            if value is None or not fnmatch.fnmatchcase(value, self.value or "*"):
+                return False
+        if self.revision:
+            return any(
+                rev_num == self.revision or fnmatch.fnmatchcase(desc, self.revision)
+                for rev_num, desc in info["revisions"]
+            )
+        return True
+
+
+def read_rules(path):
+    rules = []
+    with open(path, "rb") as csvfile:
+        for row in read_rows(csvfile):
+            if row.get("Print Set"):
+                rules.append(
+                    Rule(
+                        row["Print Set"],
+                        row.get("Sheet Numbers"),
+                        row.get("Parameter"),
+                        row.get("Value"),
+                        row.get("Revision"),
+                    )
+                )
+    return rules
+
+
+# ---------------------------------------------------------------- evaluation
+def sheet_info(sheet, param_names, revisions):
+    return {
+        "number": sheet.SheetNumber,
+        "params": dict((n, param_text(sheet, n)) for n in param_names),
+        "revisions": [revisions[rid.IntegerValue] for rid in sheet.GetAllRevisionIds()
+                      if rid.IntegerValue in revisions],
+    }
 
-# Collect selected views
-selected_views = forms.select_views(
-    use_selection=True,
-    filterfunc=lambda v: not isinstance(v, DB.ViewSheet) or not v.IsPlaceholder,
-)
 
-if selected_views:
+def evaluate(doc, rules):
+    """{print set name: [sheets]} in one pass over all sheets."""
+    param_names = set(r.param for r in rules if r.param)
+    revisions = dict(
+        (r.Id.IntegerValue, (r.RevisionNumber or "", r.Description or ""))
+        for r in DB.FilteredElementCollector(doc).OfClass(DB.Revision)
+    )
+    members = dict((r.set_name, []) for r in rules)
+    sheets = [s for s in DB.FilteredElementCollector(doc).OfClass(DB.ViewSheet)
+              if not s.IsPlaceholder]
+    for sheet in sorted(sheets, key=lambda s: natural_key(s.SheetNumber)):
+        info = sheet_info(sheet, param_names, revisions)
+        hit = set()
+        for rule in rules:
+            if rule.set_name not in hit and rule.match(info):
+                hit.add(rule.set_name)
+                members[rule.set_name].append(sheet)
+    return members
+
+
+def membership_hash(ids):
+    return hashlib.md5(",".join(str(i) for i in sorted(ids))).hexdigest()
+
+
+def existing_sets(doc):
+    return dict(
+        (vss.Name, vss)
+        for vss in DB.FilteredElementCollector(doc)
+        .OfClass(framework.get_type(DB.ViewSheetSet))
+        .WhereElementIsNotElementType()
+        .ToElements()
+    )
+
+
+def current_hash(vss):
+    return membership_hash([v.Id.IntegerValue for v in vss.Views])
+
+
+def save_sets(doc, members):
+    """Create / update changed sets in one transaction. Returns report rows."""
+    printmanager = doc.PrintManager
+    printmanager.PrintRange = DB.PrintRange.Select
+    viewsheetsetting = printmanager.ViewSheetSetting
+    existing = existing_sets(doc)
+    rows, todo = [], []
+    for name, sheets in sorted(members.items()):
+        new_hash = membership_hash([s.Id.IntegerValue for s in sheets])
+        if not sheets:
+            rows.append([name, 0, "empty - skipped"])
+        elif name in existing and current_hash(existing[name]) == new_hash:
+            rows.append([name, len(sheets), "unchanged"])
+        else:
+            todo.append((name, sheets))
+    if todo:
+        with revit.Transaction("Create Print Sets"):
+            for name, sheets in todo:
+                viewset = DB.ViewSet()
+                for sheet in sheets:
+                    viewset.Insert(sheet)
+                if name in existing:
+                    viewsheetsetting.CurrentViewSheetSet = existing[name]
+                    viewsheetsetting.CurrentViewSheetSet.Views = viewset
+                    viewsheetsetting.Save()
+                    rows.append([name, len(sheets), "updated"])
+                else:
+                    viewsheetsetting.CurrentViewSheetSet = viewsheetsetting.InSession
+                    viewsheetsetting.CurrentViewSheetSet.Views = viewset
+                    viewsheetsetting.SaveAs(name)
+                    rows.append([name, len(sheets), "created"])
+    return rows
+
+
+def run_rules():
+    path = forms.pick_file(
+        file_ext="csv",
+        init_dir=getattr(config, "rules_folder", "") or "",
+        title="Print set rules: Print Set, Sheet Numbers, Parameter, Value, Revision",
+    )
+    if not path:
+        return
+    config.rules_folder = path.rsplit("\\", 1)[0]
+    script.save_config()
+    start = time.time()
+    rules = read_rules(path)
+    if not rules:
+        forms.alert("No rules found in:\n{}".format(path))
+        return
+    members = evaluate(revit.doc, rules)
+    evaluated = time.time() - start
+    rows = save_sets(revit.doc, members)
+    output.print_table(
+        sorted(rows),
+        columns=["Print Set", "Sheets", "Result"],
+        title="Print sets: {} rules evaluated in {:.2f} s, total {:.2f} s".format(
+            len(rules), evaluated, time.time() - start
+        ),
+    )
+
+
+def run_selection():
+    # Get printmanager / viewsheetsetting
+    printmanager = revit.doc.PrintManager
+    printmanager.PrintRange = DB.PrintRange.Select
+    viewsheetsetting = printmanager.ViewSheetSetting
+
+    # Collect existing ViewSheetSets
+    print_sets_names_existing = [name for name in existing_sets(revit.doc) if name]
+
+    # Collect selected views
+    selected_views = forms.select_views(
+        use_selection=True,
+        filterfunc=lambda v: not isinstance(v, DB.ViewSheet) or not v.IsPlaceholder,
+    )
+    if not selected_views:
+        return
+
     myviewset = DB.ViewSet()
     for el in selected_views:
         myviewset.Insert(el)
 
     if myviewset.IsEmpty:
         forms.alert("At least one view must be selected.")
-    else:
-        # Ask for a print set name and check if need to be replaced
-        sheetsetname = None
-        while not sheetsetname or (
-            sheetsetname in print_sets_names_existing
-            and not forms.alert("Replace existing Print Set?", yes=True, no=True)
-        ):
-            sheetsetname = forms.ask_for_string(
-                default=(
-                    print_sets_names_existing[-1]
-                    if print_sets_names_existing
-                    else "ViewPrintSet"
-                ),
-                prompt="Give new Print Set a Name:",
-            )
-            if not sheetsetname:
-                script.exit()
-
-        # Collect existing sheet sets
-        viewsheetsets = (
-            DB.FilteredElementCollector(revit.doc)
-            .OfClass(framework.get_type(DB.ViewSheetSet))
-            .WhereElementIsNotElementType()
-            .ToElements()
+        return
+
+    # Ask for a print set name and check if need to be replaced
+    sheetsetname = None
+    while not sheetsetname or (
+        sheetsetname in print_sets_names_existing
+        and not forms.alert("Replace existing Print Set?", yes=True, no=True)
+    ):
+        sheetsetname = forms.ask_for_string(
+            default=(
+                print_sets_names_existing[-1]
+                if print_sets_names_existing
+                else "ViewPrintSet"
+            ),
+            prompt="Give new Print Set a Name:",
         )
+        if not sheetsetname:
+            script.exit()
+
+    allviewsheetsets = existing_sets(revit.doc)
 
-        allviewsheetsets = {vss.Name: vss for vss in viewsheetsets}
+    with revit.Transaction("Created Print Set"):
+        # Delete existing matching sheet set
+        if sheetsetname in allviewsheetsets.keys():
+            viewsheetsetting.CurrentViewSheetSet = allviewsheetsets[sheetsetname]
+            viewsheetsetting.Delete()
 
-        with revit.Transaction("Created Print Set"):
-            # Delete existing matching sheet set
-            if sheetsetname in allviewsheetsets.keys():
-                viewsheetsetting.CurrentViewSheetSet = allviewsheetsets[sheetsetname]
-                viewsheetsetting.Delete()
+        # Create new sheet set
+        viewsheetsetting.CurrentViewSheetSet.Views = myviewset
+        viewsheetsetting.SaveAs(sheetsetname)
 
-            # Create new sheet set
-            viewsheetsetting.CurrentViewSheetSet.Views = myviewset
-            viewsheetsetting.SaveAs(sheetsetname)
+
+mode = forms.CommandSwitchWindow.show(
+    [FROM_SELECTION, FROM_RULES], message="Create print set:"
+)
+if mode == FROM_RULES:
+    run_rules()
+elif mode == FROM_SELECTION:
+    run_selection()
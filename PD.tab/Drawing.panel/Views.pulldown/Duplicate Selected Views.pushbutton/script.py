@@ -1,32 +1,238 @@
-"""Batch duplicates the selected views with or without detailing, or as dependents"""
+"""Batch duplicates the selected views with or without detailing, or as dependents.
+
+Duplication is driven by rules: source view -> N copies with a name pattern,
+view template, scope box and phase. One rule can be entered for all selected
+views, or a CSV rules table can be loaded (one row per source view name,
+"*" for any other selected view):
+
+    Source View, Copies, Name Pattern, Template, Scope Box, Phase
+
+Name patterns use {name}, {n} (copy number, e.g. {n:02}), {level} and {type}.
+Names are resolved against an index of existing view names, so a copy never
+hits a duplicate-name error; a name Revit would reject (characters such as
+: { } [ ] | ; < > ?) falls back to the default pattern and is reported, as
+are selected views no rule matches. Duplication, renaming and parameter setting run
+in one transaction with a single regenerate at the end.
+"""
+# pylint: disable=import-error,invalid-name,broad-except
+import time
 
 from pyrevit import revit, DB
 from pyrevit import forms
 from pyrevit import script
 
+from csvutil import read_rows
+from renamer import name_problem
+
 
 logger = script.get_logger()
+output = script.get_output()
+
+KEEP = "<keep>"
+NONE = "<none>"
+DEFAULT_PATTERN = "{name} - {n}"
+CSV_COLUMNS = ["Source View", "Copies", "Name Pattern", "Template", "Scope Box", "Phase"]
 
 
 def duplicableview(view):
     return view.CanViewBeDuplicated(DB.ViewDuplicateOption.Duplicate)
 
 
-def duplicate_views(viewlist, dupop):
+class Rule(object):
+    def __init__(self, copies=1, pattern=DEFAULT_PATTERN, template=KEEP, scope_box=KEEP, phase=KEEP):
+        self.copies = copies
+        self.pattern = pattern or DEFAULT_PATTERN
+        self.template = template or KEEP
+        self.scope_box = scope_box or KEEP
+        self.phase = phase or KEEP
+
+
+def read_rules(path):
+    """{source view name or '*': Rule} from a CSV rules table."""
+    rules = {}
+    with open(path, "rb") as csvfile:
+        for row in read_rows(csvfile):
+            source = row.get("Source View")
+            if not source:
+                continue
+            try:
+                copies = int(row.get("Copies") or 1)
+            except ValueError:
+                logger.warning("Bad copy count for '{}', using 1".format(source))
+                copies = 1
+            rules[source] = Rule(
+                copies,
+                row.get("Name Pattern"),
+                row.get("Template"),
+                row.get("Scope Box"),
+                row.get("Phase"),
+            )
+    return rules
+
+
+def ask_rule(doc):
+    copies = forms.ask_for_string(default="1", prompt="Copies per view:", title="Duplicate Views")
+    if not copies:
+        return None
+    try:
+        copies = max(int(copies), 1)
+    except ValueError:
+        forms.alert("Copies must be a whole number.")
+        return None
+    pattern = forms.ask_for_string(
+        default=DEFAULT_PATTERN,
+        prompt="Name pattern - {name}, {n}, {n:02}, {level}, {type}:",
+        title="Duplicate Views",
+    )
+    if not pattern:
+        return None
+    lookups = name_lookups(doc)
+    picks = []
+    for key, title in (("template", "View Template"), ("scope_box", "Scope Box"), ("phase", "Phase")):
+        options = [KEEP] if key == "phase" else [KEEP, NONE]
+        choice = forms.SelectFromList.show(
+            options + sorted(lookups[key].keys()),
+            multiselect=False,
+            title=title,
+            button_name="Next",
+        )
+        if not choice:
+            return None
+        picks.append(choice)
+    return Rule(copies, pattern, *picks)
+
+
+def name_lookups(doc):
+    templates = dict(
+        (v.Name, v.Id) for v in DB.FilteredElementCollector(doc).OfClass(DB.View) if v.IsTemplate
+    )
+    scope_boxes = dict(
+        (e.Name, e.Id)
+        for e in DB.FilteredElementCollector(doc)
+        .OfCategory(DB.BuiltInCategory.OST_VolumeOfInterest)
+        .WhereElementIsNotElementType()
+    )
+    phases = dict((p.Name, p.Id) for p in doc.Phases)
+    return {"template": templates, "scope_box": scope_boxes, "phase": phases}
+
+
+def view_names(doc):
+    return set(v.Name for v in DB.FilteredElementCollector(doc).OfClass(DB.View))
+
+
+def unique_name(wanted, taken):
+    name, i = wanted, 2
+    while name in taken:
+        name = "{} ({})".format(wanted, i)
+        i += 1
+    taken.add(name)
+    return name
+
+
+def pattern_values(view):
+    level = view.GenLevel.Name if getattr(view, "GenLevel", None) else ""
+    return {"name": view.Name, "level": level, "type": str(view.ViewType)}
+
+
+def _set_param(view, bip, value_id):
+    param = view.Parameter[bip]
+    if param is None or param.IsReadOnly:
+        return False
+    return param.Set(value_id)
+
+
+def apply_lookup(view, choice, lookup, setter):
+    """Resolve a rule value to an element id and apply it. Returns an error or None."""
+    if choice == KEEP:
+        return None
+    if choice == NONE:
+        value_id = DB.ElementId.InvalidElementId
+    elif choice in lookup:
+        value_id = lookup[choice]
+    else:
+        return "'{}' not found".format(choice)
+    try:
+        if setter(view, value_id) is False:
+            return "'{}' is controlled by the template".format(choice)
+    except Exception as ex:
+        return str(ex)
+    return None
+
+
+def _set_template(view, value_id):
+    view.ViewTemplateId = value_id
+
+
+def _set_scope_box(view, value_id):
+    return _set_param(view, DB.BuiltInParameter.VIEWER_VOLUME_OF_INTEREST_CROP, value_id)
+
+
+def _set_phase(view, value_id):
+    return _set_param(view, DB.BuiltInParameter.VIEW_PHASE, value_id)
+
+
+def duplicate_views(doc, viewlist, dupop, rules):
+    """Run the rules in one transaction. Returns (new ids, report rows)."""
+    lookups = name_lookups(doc)
+    taken = view_names(doc)
     dup_view_ids = []
+    rows = []
     with revit.Transaction("Duplicate selected views"):
         for el in viewlist:
-            try:
-                dup_view_ids.append(el.Duplicate(dupop))
-            except Exception as duplerr:
-                logger.error(
-                    'Error duplicating view "{}" | {}'.format(
-                        revit.query.get_name(el), duplerr
+            rule = rules.get(el.Name) or rules.get("*")
+            if rule is None:
+                rows.append([revit.query.get_name(el), 0, "", "", "skipped: no rule for this view"])
+                continue
+            t0 = time.time()
+            values = pattern_values(el)
+            names, errors = [], []
+            for n in range(1, rule.copies + 1):
+                try:
+                    new_view = doc.GetElement(el.Duplicate(dupop))
+                except Exception as duplerr:
+                    logger.error(
+                        'Error duplicating view "{}" | {}'.format(
+                            revit.query.get_name(el), duplerr
+                        )
                     )
-                )
+                    errors.append(str(duplerr))
+                    break
+                dup_view_ids.append(new_view.Id)
+                try:
+                    wanted = rule.pattern.format(n=n, **values)
+                except (KeyError, ValueError, IndexError) as ex:
+                    wanted = DEFAULT_PATTERN.format(n=n, **values)
+                    errors.append("pattern: {}".format(ex))
+                problem = name_problem(wanted)
+                if problem:
+                    errors.append(u"name '{}': {}".format(wanted, problem))
+                    wanted = DEFAULT_PATTERN.format(n=n, **values)
+                try:
+                    new_view.Name = unique_name(wanted, taken)
+                except Exception as ex:
+                    errors.append(u"name '{}': {}".format(wanted, ex))
+                names.append(new_view.Name)
+                # template first: it decides which of the other parameters stay editable
+                for choice, key, setter in (
+                    (rule.template, "template", _set_template),
+                    (rule.scope_box, "scope_box", _set_scope_box),
+                    (rule.phase, "phase", _set_phase),
+                ):
+                    err = apply_lookup(new_view, choice, lookups[key], setter)
+                    if err and err not in errors:
+                        errors.append(err)
+            rows.append(
+                [
+                    revit.query.get_name(el),
+                    len(names),
+                    ", ".join(names),
+                    "{:.0f}".format((time.time() - t0) * 1000),
+                    "; ".join(errors),
+                ]
+            )
         if dup_view_ids:
             revit.doc.Regenerate()
-    return dup_view_ids
+    return dup_view_ids, rows
 
 
 selected_views = forms.select_views(filterfunc=duplicableview, use_selection=True)
@@ -37,7 +243,22 @@ if selected_views:
         message="Select duplication option:",
     )
 
+    rules = None
     if selected_option:
+        source = forms.CommandSwitchWindow.show(
+            ["Same rule for all selected views", "Load rules table (CSV)"],
+            message="Duplication rules:",
+        )
+        if source == "Load rules table (CSV)":
+            path = forms.pick_file(file_ext="csv", title="Rules table: " + ", ".join(CSV_COLUMNS))
+            if path:
+                rules = read_rules(path)
+        elif source:
+            rule = ask_rule(revit.doc)
+            if rule:
+                rules = {"*": rule}
+
+    if selected_option and rules:
         dupop = DB.ViewDuplicateOption.AsDependent
         if selected_option == "WITH Detailing":
             dupop = DB.ViewDuplicateOption.WithDetailing
@@ -45,6 +266,12 @@ if selected_views:
             dupop = DB.ViewDuplicateOption.Duplicate
         if selected_option == "AS Dependent":
             dupop = DB.ViewDuplicateOption.AsDependent
-        dup_view_ids = duplicate_views(selected_views, dupop)
+        start = time.time()
+        dup_view_ids, rows = duplicate_views(revit.doc, selected_views, dupop, rules)
+        output.print_table(
+            rows,
+            columns=["Source view", "Copies", "New names", "Time (ms)", "Issues"],
+            title="Duplicated {} views in {:.2f} s".format(len(dup_view_ids), time.time() - start),
+        )
         if dup_view_ids:
             revit.get_selection().set_to(dup_view_ids)
@@ -5,6 +5,11 @@ from pyrevit import revit, DB
 from pyrevit import forms
 from pyrevit import script
 
+from viewgraph import get_view_graph
+
+
+__persistentengine__ = True  # the view graph's change tracking runs in this engine
+
 
 logger = script.get_logger()
 output = script.get_output()
@@ -26,6 +31,7 @@ if selection:
     )
 
     print("Collecting all references in all view...")
+    graph = get_view_graph(revit.doc)
     for vp in selection:
         if isinstance(vp, DB.Viewport):
             target_view = revit.doc.GetElement(vp.ViewId)
@@ -41,24 +47,25 @@ if selection:
             )
         )
 
-        for ref_viewid in revit.query.yield_referring_views(target_view):
-            ref_view = revit.doc.GetElement(ref_viewid)
-            sheetrefinfo = revit.query.get_view_sheetrefinfo(ref_view)
+        for ref_viewid in graph.referring_views(target_view.Id):
+            ref_view = revit.doc.GetElement(DB.ElementId(ref_viewid))
+            sheetrefinfo = graph.sheetrefinfo(ref_viewid)
             if sheetrefinfo:
+                sheet_num, sheet_name, detail_num, ref_id = sheetrefinfo
                 print(
                     '\t\t{} "{}" {} {}/{} ("{}")'.format(
-                        output.linkify(ref_viewid),
+                        output.linkify(ref_view.Id),
                         revit.query.get_name(ref_view, title_on_sheet=True),
-                        "referred to on" if sheetrefinfo.ref_viewid else "placed on",
-                        sheetrefinfo.detail_num,
-                        sheetrefinfo.sheet_num,
-                        sheetrefinfo.sheet_name,
+                        "referred to on" if ref_id else "placed on",
+                        detail_num,
+                        sheet_num,
+                        sheet_name,
                     )
                 )
             elif list_nonsheeted:
                 print(
                     '\t\t{} "{}"'.format(
-                        output.linkify(ref_viewid),
+                        output.linkify(ref_view.Id),
                         revit.query.get_name(ref_view, title_on_sheet=True),
                     )
                 )
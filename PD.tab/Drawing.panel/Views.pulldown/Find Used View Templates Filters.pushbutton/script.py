@@ -1,27 +1,71 @@
-"""Lists all view templates and the filters that has been assigned to each."""
+"""Lists all view templates and the filters that has been assigned to each.
 
-from pyrevit import revit, DB
+Templates (optionally views too) x filters as a usage matrix: visibility,
+enabled state and an override signature per cell (lib/filtermatrix.py).
+The matrix can be saved as CSV; filters used nowhere can be purged.
+"""
+# pylint: disable=import-error,invalid-name
+import time
+
+from pyrevit import revit
+from pyrevit import forms
 from pyrevit import script
 
+from filtermatrix import FilterMatrix
+
 
 output = script.get_output()
 output.set_width(1100)
 
+SAVE_CSV = "Save matrix as CSV"
+PURGE = "Purge unused filters"
+INCLUDE_VIEWS = "Include views (not only templates)"
+
 
-views = (
-    DB.FilteredElementCollector(revit.doc)
-    .OfCategory(DB.BuiltInCategory.OST_Views)
-    .WhereElementIsNotElementType()
-    .ToElements()
+selected_option, switches = forms.CommandSwitchWindow.show(
+    ["Report", SAVE_CSV, PURGE],
+    switches=[INCLUDE_VIEWS],
+    message="Template / filter usage:",
 )
 
-for v in views:
-    if v.IsTemplate:
-        print("\nID: {1}\t{0}".format(revit.query.get_name(v), str(v.Id).ljust(10)))
-        filters = v.GetFilters()
-        for fl in filters:
-            print(
-                "\t\t\tID: {0}\t{1}".format(
-                    fl, DB.Element.Name.GetValue(revit.doc.GetElement(fl))
-                )
-            )
+if selected_option:
+    start = time.time()
+    matrix = FilterMatrix(revit.doc)
+    vids = matrix.rows(templates_only=not switches[INCLUDE_VIEWS])
+    unused = matrix.unused()
+    built = time.time() - start
+
+    output.print_table(
+        [
+            [
+                output.linkify(matrix.views[vid].Id),
+                matrix.views[vid].Name,
+                ", ".join(
+                    "{} ({})".format(matrix.filter_name(fid), matrix.cell_text(vid, fid))
+                    for fid in matrix.by_view[vid]
+                ),
+            ]
+            for vid in vids
+        ],
+        columns=["ID", "View / Template", "Filters (V visible, H hidden, /off disabled, Sn overrides)"],
+        title="{} rows x {} filters ({:.2f} s)".format(len(vids), len(matrix.columns(vids)), built),
+    )
+    output.print_table(matrix.legend(), columns=["Signature", "Overrides"])
+    output.print_md("**Unused filters ({}):** {}".format(
+        len(unused), ", ".join(matrix.filter_name(fid) for fid in unused) or "none"))
+
+    if selected_option == SAVE_CSV:
+        path = forms.save_file(file_ext="csv", title="Save Filter Usage Matrix")
+        if path:
+            try:
+                matrix.write_csv(path, vids)
+                output.print_md("Matrix saved to `{}`".format(path))
+            except IOError as ex:
+                forms.alert("Could not save the file.\n\n{}\n\nClose the file if it is open.".format(ex))
+    elif selected_option == PURGE:
+        if not unused:
+            forms.alert("No unused filters.")
+        elif forms.alert("Delete {} unused filters?".format(len(unused)), yes=True, no=True):
+            with revit.Transaction("Purge Unused Filters"):
+                deleted = matrix.purge_unused()
+            output.print_md("Deleted **{}** unused filters.".format(deleted))
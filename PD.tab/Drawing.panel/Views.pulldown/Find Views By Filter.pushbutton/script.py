@@ -1,113 +1,346 @@
-"""Lists views based on a search option."""
+"""Lists views matching a query over a precomputed view table.
+
+The table (one row per view) is built once per run and every query is
+evaluated in memory against it:
+
+    type=FloorPlan and template=null and placed=true
+    (filters~fire or filters=*Sprinkler*) and not sheet=null sort sheet
+    scale>=100 and detail=Fine sort scale desc
+
+Fields: name, type, istemplate, template, phase, underlay, scopebox, placed,
+sheet, detail, discipline, scale, filters.
+Operators: = (case-insensitive, * wildcards), != , ~ (regex), < <= > >=.
+Values: words, "quoted text", null, true, false. Combine with and / or /
+not / parentheses; end with `sort <field> [desc]`.
+Results go to a table, and can be saved as CSV.
+"""
+# pylint: disable=import-error,invalid-name,broad-except
+import csv
+import fnmatch
+import re
+import time
 
 from pyrevit import HOST_APP
 from pyrevit import revit, DB
 from pyrevit import script
 from pyrevit import forms
 
+from csvutil import enc
+from viewgraph import get_view_graph
+
+
+__persistentengine__ = True  # the view graph's change tracking runs in this engine
+
 
 output = script.get_output()
 
+LAST_QUERY = "PD_FIND_VIEWS_LAST_QUERY"
+
+PRESETS = {
+    "with underlay": "underlay!=null",
+    "without underlay": "underlay=null and istemplate=false",
+    "with template": "template!=null",
+    "without template": "template=null and istemplate=false",
+}
+CUSTOM = "custom query..."
+
+FIELDS = [
+    "name", "type", "istemplate", "template", "phase", "underlay", "scopebox",
+    "placed", "sheet", "detail", "discipline", "scale", "filters",
+]
+NEW_QUERY = "New query"
+SAVE_CSV = "Save results as CSV"
 
-views = (
-    DB.FilteredElementCollector(revit.doc)
-    .OfCategory(DB.BuiltInCategory.OST_Views)
-    .WhereElementIsNotElementType()
-    .ToElements()
-)
 
-ELEMENT_ID_NULL = DB.ElementId(-1)
+# ---------------------------------------------------------------- view table
+def _value_string(view, bip):
+    param = view.Parameter[bip]
+    if param is None:
+        return None
+    if param.StorageType == DB.StorageType.ElementId:
+        if param.AsElementId() == DB.ElementId.InvalidElementId:
+            return None
+    value = param.AsValueString()
+    return value if value and value != "None" else None
 
 
-def elementid_has_value(p):
-    return p.AsElementId() != ELEMENT_ID_NULL
+def _underlay(view):
+    if HOST_APP.is_newer_than(2016, or_equal=True):
+        names = [
+            _value_string(view, DB.BuiltInParameter.VIEW_UNDERLAY_BOTTOM_ID),
+            _value_string(view, DB.BuiltInParameter.VIEW_UNDERLAY_TOP_ID),
+        ]
+        names = [n for n in names if n]
+        return " / ".join(names) if names else None
+    return _value_string(view, DB.BuiltInParameter.VIEW_UNDERLAY_ID)
 
 
-def find_views_with_underlay(invert=False):
-    for v in views:
+def _filters(doc, view):
+    try:
+        return [doc.GetElement(fid).Name for fid in view.GetFilters()]
+    except Exception:
+        return []  # views that do not support filters
+
+
+def build_table(doc):
+    graph = get_view_graph(doc)
+    sheet_numbers = dict(
+        (s.Id.IntegerValue, s.SheetNumber)
+        for s in DB.FilteredElementCollector(doc).OfClass(DB.ViewSheet)
+    )
+    templates = {}
+    rows = []
+    for v in DB.FilteredElementCollector(doc).OfClass(DB.View):
+        if isinstance(v, DB.ViewSheet):
+            continue
+        if v.IsTemplate:
+            templates[v.Id.IntegerValue] = v.Name
+        sheets = sorted(sheet_numbers.get(s, "") for s in graph.sheets_of(v.Id))
         try:
-            if HOST_APP.is_newer_than(2016, or_equal=True):
-                base_underlay_param = v.Parameter[
-                    DB.BuiltInParameter.VIEW_UNDERLAY_BOTTOM_ID
-                ]
-                top_underlay_param = v.Parameter[
-                    DB.BuiltInParameter.VIEW_UNDERLAY_TOP_ID
-                ]
-                if (
-                    base_underlay_param
-                    and top_underlay_param
-                    and elementid_has_value(base_underlay_param)
-                    and elementid_has_value(top_underlay_param)
-                ) != invert:
-                    print(
-                        "TYPE: {1}\n"
-                        "ID: {2}\n"
-                        "TEMPLATE: {3}\n"
-                        "UNDERLAY (BASE): {4}\n"
-                        "UNDERLAY (TOP): {5}\n"
-                        "{0}\n\n".format(
-                            revit.query.get_name(v),
-                            str(v.ViewType).ljust(20),
-                            output.linkify(v.Id),
-                            str(v.IsTemplate).ljust(10),
-                            base_underlay_param.AsValueString().ljust(25),
-                            top_underlay_param.AsValueString().ljust(25),
-                        )
-                    )
-            else:
-                underlayp = v.Parameter[DB.BuiltInParameter.VIEW_UNDERLAY_ID]
-                if (underlayp and elementid_has_value(underlayp)) != invert:
-                    print(
-                        "TYPE: {1}\n"
-                        "ID: {2}\n"
-                        "TEMPLATE: {3}\n"
-                        "UNDERLAY: {4}\n"
-                        "{0}\n\n".format(
-                            revit.query.get_name(v),
-                            str(v.ViewType).ljust(20),
-                            output.linkify(v.Id),
-                            str(v.IsTemplate).ljust(10),
-                            underlayp.AsValueString().ljust(25),
-                        )
-                    )
-            print("\n\n")
+            scale = v.Scale
         except Exception:
-            continue
+            scale = None
+        rows.append({
+            "id": v.Id,
+            "name": revit.query.get_name(v),
+            "type": str(v.ViewType),
+            "istemplate": v.IsTemplate,
+            "template": v.ViewTemplateId.IntegerValue,
+            "phase": _value_string(v, DB.BuiltInParameter.VIEW_PHASE),
+            "underlay": _underlay(v),
+            "scopebox": _value_string(v, DB.BuiltInParameter.VIEWER_VOLUME_OF_INTEREST_CROP),
+            "placed": graph.is_placed(v.Id),
+            "sheet": ", ".join(sheets) or None,
+            "detail": str(v.DetailLevel) if v.DetailLevel is not None else None,
+            "discipline": _value_string(v, DB.BuiltInParameter.VIEW_DISCIPLINE),
+            "scale": scale,
+            "filters": _filters(doc, v),
+        })
+    for row in rows:
+        row["template"] = templates.get(row["template"])
+    return rows
 
 
-def find_view_with_template(invert=False):
-    views_sorted = sorted(views, key=lambda v: v.IsTemplate)
-    for v in views_sorted:
-        vtid = v.ViewTemplateId
-        vt = revit.doc.GetElement(vtid)
-        if bool(vt) != invert:
-            phasep = v.Parameter[DB.BuiltInParameter.VIEW_PHASE]
-            print(
-                "TYPE: {1}\n"
-                "ID: {2}\n"
-                "TEMPLATE: {3}\n"
-                "PHASE:{4}\n"
-                "{0}".format(
-                    revit.query.get_name(v),
-                    str(v.ViewType).ljust(20),
-                    output.linkify(v.Id),
-                    str(v.IsTemplate).ljust(10),
-                    phasep.AsValueString().ljust(25) if phasep else "---".ljust(25),
-                )
-            )
-            print("\n\n")
+# ---------------------------------------------------------------- query language
+TOKEN_RE = re.compile(
+    r"""\s*(?:(?P<lp>\()|(?P<rp>\))|(?P<op>!=|>=|<=|=|~|>|<)"""
+    r"""|"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<word>[^\s()=!<>~"']+))"""
+)
+SORT_RE = re.compile(r"^(?P<expr>.*?)\s*\bsort\s+(?P<field>\w+)(?P<desc>\s+desc)?\s*$", re.I)
+
+
+class QueryError(Exception):
+    pass
+
+
+def tokenize(text):
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        m = TOKEN_RE.match(text, pos)
+        if not m or m.end() == pos:
+            raise QueryError("cannot read '{}'".format(text[pos:]))
+        pos = m.end()
+        kind = m.lastgroup
+        if kind in ("dq", "sq"):
+            tokens.append(("str", m.group(kind)))
+        elif kind == "word" and m.group(kind).lower() in ("and", "or", "not"):
+            tokens.append((m.group(kind).lower(), None))
+        else:
+            tokens.append((kind, m.group(kind)))
+    return tokens
+
+
+def _as_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def comparison(field, op, literal, quoted):
+    """Predicate row -> bool for one `field op value`."""
+    if field not in FIELDS:
+        raise QueryError("unknown field '{}' (fields: {})".format(field, ", ".join(FIELDS)))
+    is_null = not quoted and literal.lower() == "null"
+    as_bool = None if quoted else {"true": True, "false": False}.get(literal.lower())
+    pattern = literal.lower()
+    number = _as_number(literal)
+    if op == "~":
+        try:
+            regex = re.compile(literal, re.I)
+        except re.error as ex:
+            raise QueryError("bad regex '{}': {}".format(literal, ex))
+
+    def match_one(value):
+        if value is None:
+            return False
+        if as_bool is not None and isinstance(value, bool):
+            return value == as_bool
+        if op == "~":
+            return bool(regex.search(str(value)))
+        if op in ("=", "!="):
+            return fnmatch.fnmatchcase(str(value).lower(), pattern)
+        left = value if isinstance(value, (int, float)) else _as_number(value)
+        if left is not None and number is not None:
+            right = number
+        else:
+            left, right = str(value).lower(), pattern
+        return {"<": left < right, "<=": left <= right, ">": left > right, ">=": left >= right}[op]
+
+    def predicate(row):
+        value = row[field]
+        values = value if isinstance(value, list) else ([] if value is None else [value])
+        if is_null:
+            return (not values) == (op == "=")
+        hit = any(match_one(v) for v in values)
+        return not hit if op == "!=" else hit
+
+    return predicate
+
+
+class Parser(object):
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self, kind=None):
+        if self.pos >= len(self.tokens):
+            raise QueryError("query ends too early")
+        token = self.tokens[self.pos]
+        if kind and token[0] != kind:
+            raise QueryError("expected {} but found '{}'".format(kind, token[1] or token[0]))
+        self.pos += 1
+        return token
+
+    def parse(self):
+        pred = self.expr()
+        if self.pos != len(self.tokens):
+            raise QueryError("unexpected '{}'".format(self.tokens[self.pos][1]))
+        return pred
+
+    def expr(self):
+        parts = [self.term()]
+        while self.peek() == "or":
+            self.take()
+            parts.append(self.term())
+        return parts[0] if len(parts) == 1 else (lambda row: any(p(row) for p in parts))
+
+    def term(self):
+        parts = [self.factor()]
+        while self.peek() == "and":
+            self.take()
+            parts.append(self.factor())
+        return parts[0] if len(parts) == 1 else (lambda row: all(p(row) for p in parts))
+
+    def factor(self):
+        kind = self.peek()
+        if kind == "not":
+            self.take()
+            inner = self.factor()
+            return lambda row: not inner(row)
+        if kind == "lp":
+            self.take()
+            inner = self.expr()
+            self.take("rp")
+            return inner
+        field = self.take("word")[1].lower()
+        op = self.take("op")[1]
+        kind, literal = self.take()
+        if kind not in ("word", "str"):
+            raise QueryError("expected a value after '{}{}'".format(field, op))
+        return comparison(field, op, literal, kind == "str")
+
+
+def compile_query(text):
+    """(predicate, sort field or None, descending)"""
+    sort_field, descending = None, False
+    m = SORT_RE.match(text)
+    if m:
+        text, sort_field, descending = m.group("expr"), m.group("field").lower(), bool(m.group("desc"))
+        if sort_field not in FIELDS:
+            raise QueryError("cannot sort by unknown field '{}'".format(sort_field))
+    tokens = tokenize(text)
+    predicate = Parser(tokens).parse() if tokens else (lambda row: True)
+    return predicate, sort_field, descending
+
+
+def run_query(table, text):
+    predicate, sort_field, descending = compile_query(text)
+    found = [row for row in table if predicate(row)]
+    key = sort_field or "name"
+    found.sort(key=lambda r: (r[key] is None, r[key]), reverse=descending)
+    return found
+
+
+# ---------------------------------------------------------------- output
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ", ".join(value)
+    return value
+
+
+def print_results(found, query, elapsed):
+    output.print_table(
+        [[output.linkify(r["id"])] + [_cell(r[f]) for f in FIELDS] for r in found],
+        columns=["ID"] + FIELDS,
+        title="{} views for `{}` ({:.3f} s)".format(len(found), query, elapsed),
+    )
+
+
+def save_csv(found, path):
+    with open(path, "wb") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Id"] + FIELDS)
+        for r in found:
+            writer.writerow([r["id"].IntegerValue] + [enc(_cell(r[f])) for f in FIELDS])
 
 
 selected_option = forms.CommandSwitchWindow.show(
-    ["with underlay", "without underlay", "with template", "without template"],
+    sorted(PRESETS.keys()) + [CUSTOM],
     message="Select search option:",
 )
 
-if selected_option == "with underlay":
-    find_views_with_underlay()
-elif selected_option == "without underlay":
-    find_views_with_underlay(True)
-elif selected_option == "with template":
-    find_view_with_template()
-elif selected_option == "without template":
-    find_view_with_template(True)
+if selected_option:
+    start = time.time()
+    table = build_table(revit.doc)
+    output.print_md("View table: {} views in {:.2f} s".format(len(table), time.time() - start))
+    query = PRESETS.get(selected_option)
+    found = None
+    while True:
+        if query is None:
+            query = forms.ask_for_string(
+                default=script.get_envvar(LAST_QUERY) or "type=FloorPlan and template=null",
+                prompt="Query (fields: {}):".format(", ".join(FIELDS)),
+                title="Find Views",
+            )
+            if not query:
+                break
+        t0 = time.time()
+        try:
+            found = run_query(table, query)
+        except QueryError as ex:
+            forms.alert("Query error: {}".format(ex))
+            query = None
+            continue
+        script.set_envvar(LAST_QUERY, query)
+        print_results(found, query, time.time() - t0)
+        next_step = forms.CommandSwitchWindow.show(
+            [NEW_QUERY, SAVE_CSV], message="{} views found.".format(len(found))
+        )
+        if next_step == SAVE_CSV:
+            path = forms.save_file(file_ext="csv", title="Save Views As")
+            if path:
+                try:
+                    save_csv(found, path)
+                except IOError as ex:
+                    forms.alert("Could not save the file.\n\n{}\n\nClose the file if it is open.".format(ex))
+            next_step = forms.CommandSwitchWindow.show([NEW_QUERY], message="Saved.")
+        if next_step != NEW_QUERY:
+            break
+        query = None
@@ -1,4 +1,9 @@
-from pyrevit import revit, DB
+import time
+
+from pyrevit import revit, DB, script
+
+
+output = script.get_output()
 
 
 def collect_views(input_doc):
@@ -10,43 +15,47 @@ def collect_views(input_doc):
     )
 
 
-# current document views
-curdoc_views = collect_views(revit.doc)
-curdoc_views_dict = {revit.query.get_name(v): v for v in curdoc_views}
+def title_on_sheet(view):
+    param = view.Parameter[DB.BuiltInParameter.VIEW_DESCRIPTION]
+    return param, (param.AsString() if param else None)
+
 
+# current document views: name -> Title on Sheet, read once
+curdoc_titles = {}
+for v in collect_views(revit.doc):
+    _, value = title_on_sheet(v)
+    curdoc_titles[v.Name] = value
+
+rows = []
 skipped = 0
 
 for open_doc in revit.docs:
-    if open_doc is not revit.doc and not open_doc.IsLinked:
-        views = collect_views(open_doc)
-        with revit.Transaction("Match Title on Sheets", doc=open_doc):
-            for v in views:
-                if revit.query.get_name(v) in curdoc_views_dict:
-                    tos_param = v.Parameter[DB.BuiltInParameter.VIEW_DESCRIPTION]
-                    matching_view = curdoc_views_dict[revit.query.get_name(v)]
-                    orig_tos_param = matching_view.Parameter[
-                        DB.BuiltInParameter.VIEW_DESCRIPTION
-                    ]
-
-                    if orig_tos_param and tos_param:
-                        print(
-                            "Matching Views: {} / {}".format(
-                                revit.query.get_name(v),
-                                revit.query.get_name(matching_view),
-                            )
-                        )
-
-                        print(
-                            "{} = {}".format(
-                                tos_param.AsString(), orig_tos_param.AsString()
-                            )
-                        )
-
-                        val = orig_tos_param.AsString()
-                        if val is None:
-                            skipped += 1
-                        else:
-                            tos_param.Set(val)
-
+    if open_doc is revit.doc or open_doc.IsLinked:
+        continue
+    start = time.time()
+    matched = changed = 0
+    with revit.Transaction("Match Title on Sheets", doc=open_doc):
+        for v in collect_views(open_doc):
+            name = v.Name
+            if name not in curdoc_titles:
+                continue
+            tos_param, current = title_on_sheet(v)
+            if tos_param is None:
+                continue
+            matched += 1
+            val = curdoc_titles[name]
+            if val is None:
+                skipped += 1
+            elif val != current and not tos_param.IsReadOnly:
+                tos_param.Set(val)
+                changed += 1
+    rows.append([open_doc.Title, matched, changed, "{:.2f}".format(time.time() - start)])
+
+if rows:
+    output.print_table(
+        rows,
+        columns=["Document", "Matching views", "Titles changed", "Time (s)"],
+        title="Match Title on Sheet",
+    )
 if skipped:
     print("Skipped {} view(s) with empty Title on Sheet.".format(skipped))
@@ -2,30 +2,31 @@
 
 from pyrevit import revit, DB
 
+from viewgraph import get_view_graph
 
-shts = (
-    DB.FilteredElementCollector(revit.doc)
-    .OfCategory(DB.BuiltInCategory.OST_Sheets)
-    .WhereElementIsNotElementType()
-    .ToElements()
-)
 
-sheets = sorted(shts, key=lambda x: x.SheetNumber)
+__persistentengine__ = True  # the view graph's change tracking runs in this engine
+
 
 curview = revit.active_view
-count = 0
-
-for s in sheets:
-    vpsIds = [revit.doc.GetElement(x).ViewId for x in s.GetAllViewports()]
-    if curview.Id in vpsIds:
-        revit.uidoc.ActiveView = s
-        vpids = s.GetAllViewports()
-        for vpid in vpids:
-            vp = revit.doc.GetElement(vpid)
-            if curview.Id == vp.ViewId:
-                ol = vp.GetBoxOutline()
-                revit.uidoc.RefreshActiveView()
-                avs = revit.uidoc.GetOpenUIViews()
-                for uiv in avs:
-                    if uiv.ViewId == s.Id:
-                        uiv.ZoomAndCenterRectangle(ol.MinimumPoint, ol.MaximumPoint)
+graph = get_view_graph(revit.doc)
+
+# lowest sheet number first, as before
+placements = sorted(
+    graph.sheets_of(curview.Id),
+    key=lambda sid: revit.doc.GetElement(DB.ElementId(sid)).SheetNumber,
+)
+
+if placements:
+    s = revit.doc.GetElement(DB.ElementId(placements[0]))
+    revit.uidoc.ActiveView = s
+    vpids = s.GetAllViewports()
+    for vpid in vpids:
+        vp = revit.doc.GetElement(vpid)
+        if curview.Id == vp.ViewId:
+            ol = vp.GetBoxOutline()
+            revit.uidoc.RefreshActiveView()
+            avs = revit.uidoc.GetOpenUIViews()
+            for uiv in avs:
+                if uiv.ViewId == s.Id:
+                    uiv.ZoomAndCenterRectangle(ol.MinimumPoint, ol.MaximumPoint)
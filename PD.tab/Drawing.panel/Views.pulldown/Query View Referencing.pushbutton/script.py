@@ -5,6 +5,11 @@ from pyrevit import revit
 from pyrevit import forms
 from pyrevit import script
 
+from viewgraph import get_view_graph
+
+
+__persistentengine__ = True  # the view graph's change tracking runs in this engine
+
 
 output = script.get_output()
 
@@ -19,31 +24,29 @@ if selected_views:
     )
 
     list_nonsheeted = not switches["Only Sheeted"]
+    want_referenced = selected_option == "List Referenced Views"
 
-    collector_func = (
-        revit.query.yield_referenced_views
-        if selected_option == "List Referenced Views"
-        else revit.query.yield_unreferenced_views
-    )
-
-    for ref_viewid in collector_func(doc=revit.doc, all_views=selected_views):
-        ref_view = revit.doc.GetElement(ref_viewid)
-        sheetrefinfo = revit.query.get_view_sheetrefinfo(ref_view)
+    graph = get_view_graph(revit.doc)
+    for ref_view in selected_views:
+        if graph.is_referenced(ref_view.Id) != want_referenced:
+            continue
+        sheetrefinfo = graph.sheetrefinfo(ref_view.Id)
         if sheetrefinfo:
+            sheet_num, sheet_name, detail_num, ref_id = sheetrefinfo
             print(
                 '\t\t{} "{}" {} {}/{} ("{}")'.format(
-                    output.linkify(ref_viewid),
+                    output.linkify(ref_view.Id),
                     revit.query.get_name(ref_view, title_on_sheet=True),
-                    "referred to on" if sheetrefinfo.ref_viewid else "placed on",
-                    sheetrefinfo.detail_num,
-                    sheetrefinfo.sheet_num,
-                    sheetrefinfo.sheet_name,
+                    "referred to on" if ref_id else "placed on",
+                    detail_num,
+                    sheet_num,
+                    sheet_name,
                 )
             )
         elif list_nonsheeted:
             print(
                 '\t\t{} "{}"'.format(
-                    output.linkify(ref_viewid),
+                    output.linkify(ref_view.Id),
                     revit.query.get_name(ref_view, title_on_sheet=True),
                 )
             )
@@ -1,116 +1,325 @@
-"""Lists views that have not been placed on any sheets."""
+"""Classifies every view by sheet placement and lists the ones not on any sheet.
 
-from pyrevit import framework
+Classes: placed, dependent-of-placed, parent-of-kept, referenced-only,
+template-only, orphan. A view whose dependents or callouts / sections are
+placed or referenced is parent-of-kept, never orphan: deleting it would take
+them along. Each view carries its element count and detail (view-owned)
+element count. Orphans can be deleted or tagged in one transaction.
+
+Detail elements come from ONE pass over the model, grouped by owner view;
+the first run also keeps the element ids each view shows. A DocumentChanged
+handler records the ids touched since the last report. On a re-run only
+those ids are re-filed and tested against each view (VisibleInViewFilter
+over the touched ids, not a full view collector); only views that were
+added or themselves changed are scanned again in full.
+Shift+Click rebuilds everything. Classification comes from the cached
+view graph.
+"""
+
+# pylint: disable=import-error,broad-except,invalid-name
+import time
+
+from System.Collections.Generic import List
 from pyrevit import revit, DB
+from pyrevit import forms
 from pyrevit import script
 
+from viewgraph import get_view_graph
+
+
+__persistentengine__ = True
 
 out = script.get_output()
 
+STATE_PREFIX = "PD_UNPLACED_STATE_"
+TOUCHED_PREFIX = "PD_UNPLACED_TOUCHED_"
+TRACKING_FLAG = "PD_UNPLACED_TRACKING"
+ORPHAN_TAG = "ZZ_ORPHAN - "
 
-# COLELCTING DATA
-dviews = []
-mviews = []
-lviews = []
-scheduleviews = []
-all_sheeted_view_ids = []
+PLACED = "placed"
+DEPENDENT = "dependent-of-placed"
+PARENT = "parent-of-kept"
+REFERENCED = "referenced-only"
+TEMPLATE = "template-only"
+ORPHAN = "orphan"
 
-# Collecting all the model, drafting, and legend views
-views = (
-    DB.FilteredElementCollector(revit.doc)
-    .OfCategory(DB.BuiltInCategory.OST_Views)
-    .WhereElementIsNotElementType()
-    .ToElements()
-)
+# views that are never reported (browsers, sheets, internal views)
+SKIP_TYPES = set(["DrawingSheet", "ProjectBrowser", "SystemBrowser", "Internal", "Undefined"])
 
-for v in views:
-    if not v.IsTemplate:
-        if v.ViewType == DB.ViewType.DraftingView:
-            dviews.append(v)
-        elif v.ViewType == DB.ViewType.Legend:
-            lviews.append(v)
-        else:
-            mviews.append(v)
-
-# Schedules need to be collected separately
-schedule_views = (
-    DB.FilteredElementCollector(revit.doc)
-    .OfClass(framework.get_type(DB.ViewSchedule))
-    .WhereElementIsNotElementType()
-    .ToElements()
-)
 
-for sv in schedule_views:
-    scheduleviews.append(sv)
+# ---------------------------------------------------------------- change tracking
+def _doc_key(doc):
+    return doc.PathName or doc.Title
 
 
-# Now collecting all sheets and find all sheeted views
-sheets = (
-    DB.FilteredElementCollector(revit.doc)
-    .OfCategory(DB.BuiltInCategory.OST_Sheets)
-    .WhereElementIsNotElementType()
-    .ToElements()
-)
+def _on_doc_changed(sender, args):
+    try:
+        doc = args.GetDocument()
+        touched = script.get_envvar(TOUCHED_PREFIX + _doc_key(doc))
+        if touched is None:
+            return  # only documents that have been reported are tracked
+        for getter in (args.GetAddedElementIds, args.GetModifiedElementIds, args.GetDeletedElementIds):
+            for eid in getter():
+                touched.add(eid.IntegerValue)
+    except Exception:
+        pass
 
-for sht in sheets:
-    vp_ids = [revit.doc.GetElement(x).ViewId for x in sht.GetAllViewports()]
-    all_sheeted_view_ids.extend(vp_ids)
 
+def ensure_tracking():
+    if not script.get_envvar(TRACKING_FLAG):
+        __revit__.Application.DocumentChanged += _on_doc_changed  # noqa: F821
+        script.set_envvar(TRACKING_FLAG, True)
 
-# Find all sheeted schedule views and add them to the list as well
-allSheetedSchedules = (
-    DB.FilteredElementCollector(revit.doc)
-    .OfClass(DB.ScheduleSheetInstance)
-    .ToElements()
-)
 
-for ss in allSheetedSchedules:
-    all_sheeted_view_ids.append(ss.ScheduleId)
+# ---------------------------------------------------------------- metrics
+def scan_view(doc, vid):
+    """Ids (ints) of the elements a view shows, or None if it cannot be scanned."""
+    try:
+        ids = DB.FilteredElementCollector(doc, DB.ElementId(vid)).ToElementIds()
+    except Exception:
+        return None  # templates, schedules and legends cannot be scanned by view
+    return set(eid.IntegerValue for eid in ids)
 
-# NOW LET'S REPORT
-out.print_md("### DRAFTING VIEWS NOT ON ANY SHEETS")
-for v in dviews:
-    if v.Id in all_sheeted_view_ids:
-        continue
-    else:
-        print(
-            "TYPE: {1}\t\tID: {2}\t\t{0}".format(
-                revit.query.get_name(v), v.ViewType, out.linkify(v.Id)
-            )
-        )
 
+def visible_of(doc, vid, candidates):
+    """The candidate ids (ElementId list) a view shows."""
+    found = (DB.FilteredElementCollector(doc, candidates)
+             .WherePasses(DB.VisibleInViewFilter(doc, DB.ElementId(vid))).ToElementIds())
+    return set(eid.IntegerValue for eid in found)
 
-out.print_md("### MODEL VIEWS NOT ON ANY SHEETS")
-for v in mviews:
-    if v.Id in all_sheeted_view_ids:
-        continue
-    else:
-        print(
-            "TYPE: {1}\t\tID: {2}\t\t{0}".format(
-                revit.query.get_name(v), v.ViewType, out.linkify(v.Id)
-            )
-        )
 
+def _file(state, eid, owner):
+    """Record an element under its owner view (moving or dropping it as needed)."""
+    prev = state["owner"].pop(eid, None)
+    if prev is not None and prev in state["owned"]:
+        state["owned"][prev].discard(eid)
+    if owner in state["owned"]:
+        state["owned"][owner].add(eid)
+        state["owner"][eid] = owner
+
+
+def full_state(doc, view_ids):
+    """View-owned elements from one pass over the model, then each view's elements."""
+    state = {"members": {}, "owned": dict((vid, set()) for vid in view_ids), "owner": {}}
+    for el in DB.FilteredElementCollector(doc).WhereElementIsNotElementType():
+        owner = el.OwnerViewId.IntegerValue
+        if owner in state["owned"]:
+            _file(state, el.Id.IntegerValue, owner)
+    for vid in view_ids:
+        state["members"][vid] = scan_view(doc, vid)
+    return state
+
+
+def size(state, vid):
+    """(elements in view, detail elements)"""
+    return len(state["members"].get(vid) or ()), len(state["owned"].get(vid, ()))
+
+
+def refresh_state(doc, state, touched, view_ids):
+    """Re-file the touched elements and update the views they enter or leave.
+
+    Returns the number of views whose contents changed.
+    """
+    current = set(view_ids)
+    for vid in list(state["owned"].keys()):
+        if vid not in current:
+            for eid in state["owned"].pop(vid):
+                state["owner"].pop(eid, None)
+            state["members"].pop(vid, None)
+    rescan = set(vid for vid in current if vid not in state["owned"] or vid in touched)
+    for vid in rescan:
+        state["owned"].setdefault(vid, set())
+
+    gone, alive = set(), []
+    for eid in touched:
+        if eid in current:
+            continue
+        el = doc.GetElement(DB.ElementId(eid))
+        if el is None:
+            _file(state, eid, None)
+            gone.add(eid)
+            continue
+        _file(state, eid, el.OwnerViewId.IntegerValue)
+        if not isinstance(el, DB.ElementType):
+            alive.append(el.Id)
+
+    changed = set(rescan)
+    candidates = List[DB.ElementId](alive)
+    checked = set(eid.IntegerValue for eid in alive) | gone
+    for vid in current:
+        if vid in rescan:
+            state["members"][vid] = scan_view(doc, vid)
+            continue
+        members = state["members"].get(vid)
+        if members is None or not checked:
+            continue
+        now = visible_of(doc, vid, candidates) if alive else set()
+        if (members & checked) != now:
+            members -= checked
+            members |= now
+            changed.add(vid)
+    return len(changed)
 
-out.print_md("### LEGENDS NOT ON ANY SHEETS")
-for v in lviews:
-    if v.Id in all_sheeted_view_ids:
-        continue
-    else:
-        print(
-            "TYPE: {1}\t\tID: {2}\t\t{0}".format(
-                revit.query.get_name(v), v.ViewType, out.linkify(v.Id)
-            )
-        )
 
+# ---------------------------------------------------------------- classification
+def kept_ancestors(graph, view_ids):
+    """Primary views and marker hosts (at any depth) of placed or referenced views.
 
-out.print_md("### SCHEDULES NOT ON ANY SHEETS")
-for v in scheduleviews:
-    if v.Id in all_sheeted_view_ids:
+    Revit deletes dependents and callouts with their parent view, so none of
+    these may be offered as an orphan.
+    """
+    keep = set()
+    stack = [vid for vid in view_ids if graph.is_placed(vid) or graph.is_referenced(vid)]
+    while stack:
+        cur = stack.pop()
+        for up in (graph.primary_view(cur), graph.parent_view(cur)):
+            if up is not None and up not in keep:
+                keep.add(up)
+                stack.append(up)
+    return keep
+
+
+def classify(graph, vid, parents):
+    if graph.is_template(vid):
+        return TEMPLATE
+    if graph.is_placed(vid):
+        return PLACED
+    primary = graph.primary_view(vid)
+    if primary is not None and graph.is_placed(primary):
+        return DEPENDENT
+    if vid in parents:
+        return PARENT
+    if graph.is_referenced(vid):
+        return REFERENCED
+    return ORPHAN
+
+
+def reportable_views(doc):
+    views = {}
+    for v in DB.FilteredElementCollector(doc).OfClass(DB.View):
+        if str(v.ViewType) in SKIP_TYPES or isinstance(v, DB.ViewSheet):
+            continue
+        views[v.Id.IntegerValue] = v
+    return views
+
+
+# ---------------------------------------------------------------- bulk actions
+def _try_delete(doc, ids):
+    """Delete ids in a sub-transaction; True if Revit accepted them."""
+    st = DB.SubTransaction(doc)
+    st.Start()
+    try:
+        doc.Delete(List[DB.ElementId](ids))
+        st.Commit()
+        return True
+    except Exception:
+        st.RollBack()
+        return False
+
+
+def delete_orphans(doc, orphan_ids):
+    """Delete the orphans in one batch, falling back to one view at a time.
+
+    Returns (deleted, [view ids Revit refused]).
+    """
+    active = revit.active_view.Id.IntegerValue
+    ids = [DB.ElementId(vid) for vid in orphan_ids if vid != active]
+    deleted, refused = 0, []
+    with revit.Transaction("Delete Orphan Views", doc=doc):
+        if _try_delete(doc, ids):
+            return len(ids), refused
+        for eid in ids:
+            if doc.GetElement(eid) is None:
+                continue  # went with an earlier view
+            if _try_delete(doc, [eid]):
+                deleted += 1
+            else:
+                refused.append(eid.IntegerValue)
+    return deleted, refused
+
+
+def tag_orphans(doc, orphan_ids, views):
+    names = set(v.Name for v in views.values())
+    tagged = 0
+    with revit.Transaction("Tag Orphan Views", doc=doc):
+        for vid in orphan_ids:
+            view = views[vid]
+            if view.Name.startswith(ORPHAN_TAG):
+                continue
+            new_name = ORPHAN_TAG + view.Name
+            if new_name in names:
+                continue
+            view.Name = new_name
+            names.add(new_name)
+            tagged += 1
+    return tagged
+
+
+# ---------------------------------------------------------------- main
+doc = revit.doc
+start = time.time()
+key = _doc_key(doc)
+rebuild = __shiftclick__  # noqa: F821  (Shift+Click forces a full rebuild)
+
+graph = get_view_graph(doc, rebuild=rebuild)
+views = reportable_views(doc)
+
+state = None if rebuild else script.get_envvar(STATE_PREFIX + key)
+touched = script.get_envvar(TOUCHED_PREFIX + key)
+if state is None or touched is None or "members" not in state:
+    state = full_state(doc, views.keys())
+    updated = len(views)
+    touched = set()
+    script.set_envvar(TOUCHED_PREFIX + key, touched)
+else:
+    updated = refresh_state(doc, state, set(touched), views.keys())
+    touched.clear()
+script.set_envvar(STATE_PREFIX + key, state)
+ensure_tracking()
+
+parents = kept_ancestors(graph, views.keys())
+classes = {}
+for vid in views:
+    classes.setdefault(classify(graph, vid, parents), []).append(vid)
+
+elapsed = time.time() - start
+out.print_md("### View placement ({} views, {} updated, {:.2f} s)".format(
+    len(views), updated, elapsed))
+out.print_table(
+    [[cls, len(classes.get(cls, []))]
+     for cls in (PLACED, DEPENDENT, PARENT, REFERENCED, TEMPLATE, ORPHAN)],
+    columns=["Class", "Views"],
+)
+
+for cls in (ORPHAN, REFERENCED, PARENT, DEPENDENT, TEMPLATE):
+    vids = classes.get(cls, [])
+    if not vids:
         continue
-    else:
-        print(
-            "TYPE: {1}\t\tID: {2}\t\t{0}".format(
-                revit.query.get_name(v), v.ViewType, out.linkify(v.Id)
-            )
-        )
+    rows = []
+    for vid in sorted(vids, key=lambda i: -size(state, i)[1]):
+        v = views[vid]
+        total, detail = size(state, vid)
+        rows.append([out.linkify(v.Id), revit.query.get_name(v), str(v.ViewType), total, detail])
+    out.print_table(
+        rows,
+        columns=["ID", "View", "Type", "Elements in view", "Detail elements"],
+        title="{} ({})".format(cls.upper(), len(vids)),
+    )
+
+orphans = classes.get(ORPHAN, [])
+if orphans:
+    action = forms.CommandSwitchWindow.show(
+        ["Report only", "Tag orphans", "Delete orphans"],
+        message="{} orphan views. Bulk action:".format(len(orphans)),
+    )
+    if action == "Delete orphans":
+        if forms.alert("Delete {} orphan views?".format(len(orphans)), yes=True, no=True):
+            deleted, refused = delete_orphans(doc, orphans)
+            out.print_md("Deleted **{}** orphan views.".format(deleted))
+            if refused:
+                out.print_table([[out.linkify(DB.ElementId(vid)), revit.query.get_name(views[vid])]
+                                 for vid in refused],
+                                columns=["ID", "View"], title="Not deleted (refused by Revit)")
+    elif action == "Tag orphans":
+        out.print_md("Tagged **{}** orphan views with '{}'.".format(
+            tag_orphans(doc, orphans, views), ORPHAN_TAG))
@@ -1,9 +1,23 @@
-"""Changes the selected view names."""
+"""Renames the selected views, view templates or sheets.
+
+Case changes, regex find / replace, or a token template such as
+{Level}-{Discipline}-{Sequence:03} (any parameter name is a token).
+The full old -> new map is previewed with collisions flagged, then applied
+in one transaction (lib/renamer.py).
+"""
 
 # pylint: disable=import-error,invalid-name,broad-except,superfluous-parens
 import re
+import time
+
 from pyrevit import revit, DB
 from pyrevit import forms
+from pyrevit import script
+
+import renamer
+
+
+output = script.get_output()
 
 
 def _lower(name):
@@ -36,33 +50,96 @@ CASE_FUNCTIONS = {
     "Title Case": _title,
     "Sentence case": _sentence,
 }
-
-
-def _change_case(view_list, casefunc, verbose=False):
-    with revit.Transaction("Viewnames to Upper"):
-        for view in view_list:
-            if isinstance(view, DB.Viewport):
-                view = revit.doc.GetElement(view.ViewId)
-            orig_name = revit.query.get_name(view)
-            revit.update.set_name(view, casefunc(orig_name))
-            if verbose:
-                print(
-                    "VIEW: {0}\n"
-                    "\tRENAMED TO:\n"
-                    "\t{1}\n\n".format(orig_name, revit.query.get_name(view))
-                )
-
-
-selected_views = forms.select_views(use_selection=True)
-
-if selected_views:
-    selected_option, switches = forms.CommandSwitchWindow.show(
-        CASE_FUNCTIONS.keys(), switches=["Show Report"], message="Select rename option:"
+REGEX = "Find / Replace (regex)"
+TEMPLATE = "Token template"
+
+TARGETS = ["Views", "View Templates", "Sheet Numbers", "Sheet Names"]
+
+
+def pick_elements(target):
+    """(elements sorted by current value, renamer field) for the chosen target."""
+    if target == "Views":
+        views = forms.select_views(use_selection=True) or []
+        views = [
+            revit.doc.GetElement(v.ViewId) if isinstance(v, DB.Viewport) else v
+            for v in views
+        ]
+        field = renamer.VIEW_NAME
+    elif target == "View Templates":
+        views = forms.select_viewtemplates(doc=revit.doc) or []
+        field = renamer.VIEW_NAME
+    else:
+        views = forms.select_sheets(include_placeholder=True) or []
+        field = renamer.SHEET_NUMBER if target == "Sheet Numbers" else renamer.SHEET_NAME
+    return sorted(views, key=field.get), field
+
+
+def ask_rule():
+    option = forms.CommandSwitchWindow.show(
+        sorted(CASE_FUNCTIONS.keys()) + [REGEX, TEMPLATE], message="Select rename option:"
     )
-
-    if selected_option:
-        _change_case(
-            selected_views,
-            casefunc=CASE_FUNCTIONS[selected_option],
-            verbose=switches["Show Report"],
+    if option in CASE_FUNCTIONS:
+        return renamer.case_rule(CASE_FUNCTIONS[option])
+    if option == REGEX:
+        pattern = forms.ask_for_string(prompt="Find (regular expression):", title=REGEX)
+        if not pattern:
+            return None
+        replacement = forms.ask_for_string(
+            default="", prompt="Replace with (\\1 for groups):", title=REGEX
+        )
+        if replacement is None:
+            return None
+        try:
+            return renamer.regex_rule(pattern, replacement)
+        except re.error as ex:
+            forms.alert("Invalid expression: {}".format(ex))
+            return None
+    if option == TEMPLATE:
+        template = forms.ask_for_string(
+            default="{Level}-{Sequence:03}",
+            prompt="Tokens: {Old} {Name} {Number} {Level} {ViewType} {Sequence:03}\n"
+            "or any parameter name, e.g. {Discipline}",
+            title=TEMPLATE,
+        )
+        if template:
+            return renamer.template_rule(template)
+    return None
+
+
+target = forms.CommandSwitchWindow.show(TARGETS, message="Rename what?")
+elements, field = pick_elements(target) if target else ([], None)
+
+if elements:
+    rule = ask_rule()
+    if rule:
+        start = time.time()
+        plan = renamer.build_plan(revit.doc, elements, field, rule)
+        counts = plan.counts()
+        output.print_table(
+            plan.rows(),
+            columns=["Current " + field.label, "New " + field.label, "Status", "Note"],
+            title="Rename preview ({} of {} change, planned in {:.2f} s)".format(
+                counts.get(renamer.RENAME, 0), len(elements), time.time() - start
+            ),
         )
+        skipped = counts.get(renamer.COLLISION, 0) + counts.get(renamer.INVALID, 0)
+        if not plan.renames:
+            forms.alert("Nothing to rename.")
+        elif forms.alert(
+            "Rename {} {}?{}".format(
+                len(plan.renames),
+                target.lower(),
+                "\n{} skipped (collision / invalid).".format(skipped) if skipped else "",
+            ),
+            yes=True,
+            no=True,
+        ):
+            with revit.Transaction("Rename " + target):
+                renamed = renamer.apply_plan(plan)
+            output.print_md(
+                "Renamed **{}** in {:.2f} s.".format(renamed, time.time() - start)
+            )
+            failed = plan.by_status(renamer.FAILED)
+            if failed:
+                output.print_table([[e.old, e.new, e.note] for e in failed],
+                                   columns=["Old", "New", "Error"], title="Not renamed")
@@ -1,64 +1,250 @@
+"""Include or exclude template parameters on many view templates at once.
+
+Templates x template parameters are loaded in one pass into two bitsets per
+template (parameters available / parameters controlled). Edits work on the
+bitsets; only templates whose controlled bitset changed are written.
+
+The matrix can be exported to / imported from CSV (one row per template,
+one column per parameter: 1 = included, 0 = excluded, empty = not
+available or leave unchanged), so template standards can be versioned.
+"""
+# pylint: disable=import-error,invalid-name,broad-except
+import csv
+import time
+
+from System.Collections.Generic import List
 from pyrevit import script, revit, DB, forms
 
+from csvutil import enc, enc_row, read_rows
+
 output = script.get_output()
 output.close_others()
 
 doc = revit.doc
 
+EDIT = "Include / exclude selected parameters"
+EXPORT = "Export matrix to CSV"
+IMPORT = "Import matrix from CSV"
+
+INCLUDE = "Include"
+EXCLUDE = "Exclude"
+
+
+class TemplateMatrix(object):
+    """Templates x template parameters as int bitsets."""
+
+    def __init__(self, templates):
+        self.templates = dict((t.Id.IntegerValue, t) for t in templates)
+        self.bit = {}          # parameter id -> bit position
+        self.param_ids = []    # bit position -> parameter id
+        self.names = {}        # parameter id -> display name
+        self.available = {}    # template id -> bitset
+        self.controlled = {}   # template id -> bitset (as loaded)
+        for tid, template in self.templates.items():
+            available = 0
+            for pid in template.GetTemplateParameterIds():
+                available |= self._mask(pid.IntegerValue)
+            non_controlled = 0
+            for pid in template.GetNonControlledTemplateParameterIds():
+                non_controlled |= self._mask(pid.IntegerValue)
+            self.available[tid] = available
+            self.controlled[tid] = available & ~non_controlled
+            for p in template.Parameters:
+                pid = p.Id.IntegerValue
+                if pid in self.bit and pid not in self.names:
+                    self.names[pid] = p.Definition.Name
+        self.edited = dict(self.controlled)
+
+    def _mask(self, pid):
+        if pid not in self.bit:
+            self.bit[pid] = len(self.param_ids)
+            self.param_ids.append(pid)
+        return 1 << self.bit[pid]
+
+    def name(self, pid):
+        return self.names.get(pid) or "Parameter {}".format(pid)
+
+    def columns(self):
+        """Unique column label -> parameter id, ordered by label."""
+        labels = {}
+        for pid in self.param_ids:
+            label = self.name(pid)
+            if label in labels:
+                label = "{} [{}]".format(label, pid)
+            labels[label] = pid
+        return sorted(labels.items())
+
+    def template_name(self, tid):
+        return self.templates[tid].Name
+
+    def state(self, tid, pid):
+        """True included, False excluded, None not available."""
+        mask = 1 << self.bit[pid]
+        if not self.available[tid] & mask:
+            return None
+        return bool(self.edited[tid] & mask)
+
+    def set(self, tid, pid, included):
+        mask = 1 << self.bit[pid]
+        if not self.available[tid] & mask:
+            return
+        if included:
+            self.edited[tid] |= mask
+        else:
+            self.edited[tid] &= ~mask
+
+    def changed(self):
+        return [tid for tid in self.templates if self.edited[tid] != self.controlled[tid]]
+
+    def diff(self, tid):
+        """(included count, excluded count) against the loaded state."""
+        delta = self.edited[tid] ^ self.controlled[tid]
+        return (
+            bin(delta & self.edited[tid]).count("1"),
+            bin(delta & self.controlled[tid]).count("1"),
+        )
+
+    def write(self):
+        """Write changed templates (call inside a transaction)."""
+        written = []
+        for tid in self.changed():
+            non_controlled = self.available[tid] & ~self.edited[tid]
+            ids = List[DB.ElementId](
+                [DB.ElementId(pid) for pid in self.param_ids
+                 if non_controlled & (1 << self.bit[pid])]
+            )
+            self.templates[tid].SetNonControlledTemplateParameterIds(ids)
+            written.append(tid)
+        return written
+
+
+def _cell(state):
+    return "" if state is None else ("1" if state else "0")
+
+
+def export_csv(matrix, path):
+    columns = matrix.columns()
+    with open(path, "wb") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(enc_row(["Template"] + [label for label, _ in columns]))
+        for tid in sorted(matrix.templates, key=matrix.template_name):
+            writer.writerow(
+                [enc(matrix.template_name(tid))]
+                + [_cell(matrix.state(tid, pid)) for _, pid in columns]
+            )
+
+
+def import_csv(matrix, path):
+    """Apply the CSV to the matrix; returns (unknown templates, unknown columns)."""
+    by_name = dict((matrix.template_name(tid), tid) for tid in matrix.templates)
+    by_label = dict(matrix.columns())
+    unknown_templates, unknown_columns = [], set()
+    with open(path, "rb") as csvfile:
+        for row in read_rows(csvfile):
+            name = row.pop("Template", "")
+            tid = by_name.get(name)
+            if tid is None:
+                unknown_templates.append(name)
+                continue
+            for label, value in row.items():
+                pid = by_label.get(label)
+                if pid is None:
+                    unknown_columns.add(label)
+                elif value in ("1", "0"):
+                    matrix.set(tid, pid, value == "1")
+    return unknown_templates, sorted(unknown_columns)
+
+
+def print_matrix(matrix, tids, pids):
+    marks = {None: "", True: "&#10004;", False: "&#10008;"}
+    output.print_table(
+        [[matrix.template_name(tid)] + [marks[matrix.state(tid, pid)] for pid in pids]
+         for tid in sorted(tids, key=matrix.template_name)],
+        columns=["Template"] + [matrix.name(pid) for pid in pids],
+        title="Controlled parameters",
+    )
+
+
 view_templates = [
     v
     for v in DB.FilteredElementCollector(doc).OfClass(DB.View).ToElements()
     if v.IsTemplate
 ]
 
-selected_view_templates = forms.SelectFromList.show(
-    sorted(view_templates, key=lambda template: template.Name),
-    button_name="Select Template",
-    multiselect=True,
-    name_attr="Name",
-)
+mode = forms.CommandSwitchWindow.show([EDIT, EXPORT, IMPORT], message="View template parameters:")
+if not mode:
+    script.exit()
 
-params_dict = {}
-if selected_view_templates:
-    for template in selected_view_templates:
-        for p in template.Parameters:
-            if p.Definition.Name not in params_dict.keys():
-                params_dict[p.Definition.Name] = p
+if mode == IMPORT:
+    selected_view_templates = view_templates
+else:
+    selected_view_templates = forms.SelectFromList.show(
+        sorted(view_templates, key=lambda template: template.Name),
+        button_name="Select Template",
+        multiselect=True,
+        name_attr="Name",
+    )
+if not selected_view_templates:
+    script.exit()
+
+start = time.time()
+matrix = TemplateMatrix(selected_view_templates)
+output.print_md("Loaded {} templates x {} parameters in {:.2f} s".format(
+    len(matrix.templates), len(matrix.param_ids), time.time() - start))
 
+if mode == EXPORT:
+    path = forms.save_file(file_ext="csv", title="Export Template Parameter Matrix")
+    if path:
+        try:
+            export_csv(matrix, path)
+            output.print_md("Matrix saved to `{}`".format(path))
+        except IOError as ex:
+            forms.alert("Could not save the file.\n\n{}\n\nClose the file if it is open.".format(ex))
+    script.exit()
+
+if mode == EDIT:
+    labels = dict(matrix.columns())
     parameters_processed = forms.SelectFromList.show(
-        sorted(params_dict.keys()), button_name="Select Parameters", multiselect=True
+        sorted(labels.keys()), button_name="Select Parameters", multiselect=True
     )
-    if parameters_processed:
-        selected_params = [params_dict[p] for p in parameters_processed]
-        params_ids = [p.Id for p in selected_params]
-        inclusion = forms.CommandSwitchWindow.show(
-            ["Include", "Exclude"],
-            message="Include or Exclude parameters from selected templates?",
-        )
-        if inclusion:
-            if inclusion == "Include":
-                include = False
-            else:
-                include = True
-
-            with revit.Transaction("set params in view templates"):
-                results = []
-                for template in selected_view_templates:
-                    all_params = template.GetTemplateParameterIds()
-                    switch_off_param_ids = params_ids
-
-                    non_controlled_param_ids = (
-                        template.GetNonControlledTemplateParameterIds()
-                    )
-                    for switch_off_param_id in switch_off_param_ids:
-                        if include:
-                            non_controlled_param_ids.Add(switch_off_param_id)
-                        else:
-                            non_controlled_param_ids.Remove(switch_off_param_id)
-
-                    template.SetNonControlledTemplateParameterIds(
-                        non_controlled_param_ids
-                    )
-                    results.append(template)
+    if not parameters_processed:
+        script.exit()
+    inclusion = forms.CommandSwitchWindow.show(
+        [INCLUDE, EXCLUDE],
+        message="Include or Exclude parameters from selected templates?",
+    )
+    if not inclusion:
+        script.exit()
+    pids = [labels[p] for p in parameters_processed]
+    for tid in matrix.templates:
+        for pid in pids:
+            matrix.set(tid, pid, inclusion == INCLUDE)
 else:
+    path = forms.pick_file(file_ext="csv", title="Import Template Parameter Matrix")
+    if not path:
+        script.exit()
+    missing_templates, missing_columns = import_csv(matrix, path)
+    if missing_templates:
+        output.print_md("Templates not in this model: {}".format(", ".join(missing_templates)))
+    if missing_columns:
+        output.print_md("Parameters not in this model: {}".format(", ".join(missing_columns)))
+    delta = 0
+    for tid in matrix.templates:
+        delta |= matrix.edited[tid] ^ matrix.controlled[tid]
+    pids = [pid for pid in matrix.param_ids if delta & (1 << matrix.bit[pid])]
+
+changed = matrix.changed()
+if not changed:
+    forms.alert("No template changes.")
     script.exit()
+
+with revit.Transaction("set params in view templates"):
+    written = matrix.write()
+
+print_matrix(matrix, changed, sorted(pids, key=matrix.name))
+output.print_table(
+    [[matrix.template_name(tid)] + list(matrix.diff(tid)) for tid in sorted(written, key=matrix.template_name)],
+    columns=["Template", "Included", "Excluded"],
+    title="{} of {} templates written in {:.2f} s".format(
+        len(written), len(matrix.templates), time.time() - start),
+)
@@ -1,44 +1,230 @@
-"""Toggle all/selected grid bubbles in the active view."""
+"""Normalize grid / level bubbles and 2D extents in one or many views.
+
+Rules: show or hide both bubbles, or keep bubbles on the top / left (or
+bottom / right) end only. Optionally the 2D extents are pulled to the crop
+box, offset inwards by a paper distance. Applies to the active view, the
+selected views or every view using a template. Crop geometry is computed
+once per view and all changes run in one transaction; per-view success and
+failure counts are reported.
+"""
+
+# pylint: disable=E0401,broad-except,invalid-name
+import time
 
-# pylint: disable=E0401
 from pyrevit import forms
 from pyrevit import revit, DB
+from pyrevit import script
 
 
-all_grids = (
-    DB.FilteredElementCollector(revit.doc)
-    .OfCategory(DB.BuiltInCategory.OST_Grids)
-    .WhereElementIsNotElementType()
-    .ToElements()
-)
+output = script.get_output()
 
-selected_option = forms.CommandSwitchWindow.show(
-    ["Show Bubbles", "Hide Bubbles"], message="Select option:"
-)
+MM = 304.8
 
-if selected_option:
-    hide = True
-    if selected_option == "Show Bubbles":
-        hide = False
-
-    grids = []
-    selection = revit.get_selection()
-    if selection:
-        grids = [x for x in selection if isinstance(x, DB.Grid)]
+SHOW = "Show Bubbles"
+HIDE = "Hide Bubbles"
+TOP_LEFT = "Bubbles Top / Left Only"
+BOTTOM_RIGHT = "Bubbles Bottom / Right Only"
+
+ACTIVE = "Active view"
+SELECTED = "Selected views"
+BY_TEMPLATE = "All views using a template"
+
+GRIDS = "Grids"
+LEVELS = "Levels"
+EXTENTS = "2D extents to crop box"
+
+ENDS = (DB.DatumEnds.End0, DB.DatumEnds.End1)
+
+
+class ViewFrame(object):
+    """Per-view geometry computed once: axes, crop rectangle, offset."""
+
+    def __init__(self, view, offset_mm):
+        self.view = view
+        self.right = view.RightDirection
+        self.up = view.UpDirection
+        self.crop = None
+        if view.CropBoxActive:
+            box = view.CropBox
+            lo, hi = box.Transform.OfPoint(box.Min), box.Transform.OfPoint(box.Max)
+            off = offset_mm / MM * view.Scale
+            r = sorted((lo.DotProduct(self.right), hi.DotProduct(self.right)))
+            u = sorted((lo.DotProduct(self.up), hi.DotProduct(self.up)))
+            if r[1] - r[0] > 2 * off and u[1] - u[0] > 2 * off:
+                self.crop = (r[0] + off, r[1] - off, u[0] + off, u[1] - off)
+
+    def coords(self, point):
+        return point.DotProduct(self.right), point.DotProduct(self.up)
+
+    def preferred_end(self, line, top_left=True):
+        """The datum end that is top (vertical-ish) or left (horizontal-ish) in this view."""
+        r0, u0 = self.coords(line.GetEndPoint(0))
+        r1, u1 = self.coords(line.GetEndPoint(1))
+        if abs(u1 - u0) >= abs(r1 - r0):
+            first = u0 > u1          # end 0 is the top end
+        else:
+            first = r0 < r1          # end 0 is the left end
+        if not top_left:
+            first = not first
+        return ENDS[0] if first else ENDS[1]
+
+    def clip(self, line):
+        """The line clipped to the offset crop rectangle (Liang-Barsky), or None."""
+        p0 = line.GetEndPoint(0)
+        d = line.GetEndPoint(1) - p0
+        r0, u0 = self.coords(p0)
+        dr, du = d.DotProduct(self.right), d.DotProduct(self.up)
+        rmin, rmax, umin, umax = self.crop
+        # extend the datum line across the whole crop before clipping
+        t0, t1 = -1e9, 1e9
+        for p, q in ((-dr, r0 - rmin), (dr, rmax - r0), (-du, u0 - umin), (du, umax - u0)):
+            if abs(p) < 1e-12:
+                if q < 0:
+                    return None
+                continue
+            t = q / p
+            if p < 0:
+                t0 = max(t0, t)
+            else:
+                t1 = min(t1, t)
+        if t1 - t0 < 1e-6:
+            return None
+        return DB.Line.CreateBound(p0 + d * t0, p0 + d * t1)
+
+
+def view_line(datum, view):
+    curves = datum.GetCurvesInView(DB.DatumExtentType.ViewSpecific, view)
+    if not curves or not isinstance(curves[0], DB.Line):
+        return None
+    return curves[0]
+
+
+def set_bubble(datum, end, view, visible):
+    if not datum.HasBubbleInView(end, view):
+        return False
+    if datum.IsBubbleVisibleInView(end, view) == visible:
+        return False
+    if visible:
+        datum.ShowBubbleInView(end, view)
+    else:
+        datum.HideBubbleInView(end, view)
+    return True
+
+
+def normalize(datum, frame, rule, extents):
+    """Apply the rule to one datum in one view. Returns the number of changes."""
+    view = frame.view
+    changes = 0
+    line = view_line(datum, view)
+    if extents:
+        if frame.crop is None:
+            raise ValueError("view has no active crop box")
+        if line is None:
+            raise ValueError("not a straight datum")
+        clipped = frame.clip(line)
+        if clipped is None:
+            raise ValueError("outside the crop box")
+        for end in ENDS:
+            if datum.GetDatumExtentTypeInView(end, view) != DB.DatumExtentType.ViewSpecific:
+                datum.SetDatumExtentType(end, view, DB.DatumExtentType.ViewSpecific)
+        datum.SetCurveInView(DB.DatumExtentType.ViewSpecific, view, clipped)
+        line = clipped
+        changes += 1
+    if rule in (SHOW, HIDE):
+        for end in ENDS:
+            changes += set_bubble(datum, end, view, rule == SHOW)
     else:
-        grids = all_grids
+        if line is None:
+            raise ValueError("not a straight datum")
+        keep = frame.preferred_end(line, top_left=(rule == TOP_LEFT))
+        for end in ENDS:
+            changes += set_bubble(datum, end, view, end == keep)
+    return changes
+
+
+def pick_views(scope):
+    if scope == ACTIVE:
+        return [revit.active_view]
+    if scope == SELECTED:
+        return forms.select_views(use_selection=True) or []
+    template = forms.select_viewtemplates(doc=revit.doc, multiple=False)
+    if not template:
+        return []
+    return [
+        v for v in DB.FilteredElementCollector(revit.doc).OfClass(DB.View)
+        if not v.IsTemplate and v.ViewTemplateId == template.Id
+    ]
+
 
+def datums_in(view, categories, only_ids):
+    found = []
+    for cat in categories:
+        for el in (
+            DB.FilteredElementCollector(revit.doc, view.Id)
+            .OfCategory(cat)
+            .WhereElementIsNotElementType()
+        ):
+            if isinstance(el, DB.DatumPlane) and (not only_ids or el.Id.IntegerValue in only_ids):
+                found.append(el)
+    return found
+
+
+selected_option, switches = forms.CommandSwitchWindow.show(
+    [SHOW, HIDE, TOP_LEFT, BOTTOM_RIGHT],
+    switches={GRIDS: True, LEVELS: False, EXTENTS: False},
+    message="Select option:",
+)
+scope = None
+if selected_option:
+    scope = forms.CommandSwitchWindow.show([ACTIVE, SELECTED, BY_TEMPLATE], message="Apply to:")
+
+offset = 0.0
+if scope and switches[EXTENTS]:
+    value = forms.ask_for_string(
+        default="5", prompt="Extent offset inside the crop box (paper mm):", title=EXTENTS
+    )
     try:
-        with revit.Transaction("Toggle Grid Bubbles"):
-            for grid in grids:
-                if hide:
-                    grid.HideBubbleInView(DB.DatumEnds.End0, revit.active_view)
-                    grid.HideBubbleInView(DB.DatumEnds.End1, revit.active_view)
-                else:
-                    grid.ShowBubbleInView(DB.DatumEnds.End0, revit.active_view)
-                    grid.ShowBubbleInView(DB.DatumEnds.End1, revit.active_view)
-
-    except Exception:
-        pass
+        offset = float(value)
+    except (TypeError, ValueError):
+        scope = None
+
+views = pick_views(scope) if scope else []
+categories = []
+if views:
+    if switches[GRIDS]:
+        categories.append(DB.BuiltInCategory.OST_Grids)
+    if switches[LEVELS]:
+        categories.append(DB.BuiltInCategory.OST_Levels)
+
+if views and categories:
+    # a datum selection in the active view narrows the run to those datums
+    only_ids = set()
+    if scope == ACTIVE:
+        only_ids = set(x.Id.IntegerValue for x in revit.get_selection()
+                       if isinstance(x, DB.DatumPlane))
+
+    start = time.time()
+    frames = [ViewFrame(v, offset) for v in views]
+    rows = []
+    with revit.Transaction("Normalize Datums"):
+        for frame in frames:
+            ok = failed = changed = 0
+            errors = {}
+            for datum in datums_in(frame.view, categories, only_ids):
+                try:
+                    changed += normalize(datum, frame, selected_option, switches[EXTENTS])
+                    ok += 1
+                except Exception as ex:
+                    failed += 1
+                    errors[str(ex)] = errors.get(str(ex), 0) + 1
+            rows.append([
+                revit.query.get_name(frame.view), ok, failed, changed,
+                "; ".join("{} ({})".format(msg, n) for msg, n in sorted(errors.items())),
+            ])
 
+    output.print_table(
+        rows,
+        columns=["View", "Datums OK", "Failed", "Changes", "Failures"],
+        title="{} - {} views in {:.2f} s".format(selected_option, len(views), time.time() - start),
+    )
     revit.uidoc.RefreshActiveView()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""2D bin packing of viewport rectangles onto sheets (MaxRects, best short side fit).
+
+Pure Python, no Revit imports: everything works on plain (width, height)
+rectangles in any unit, so the packer can be exercised outside Revit.
+
+    >>> placed, unplaced, bins = pack([("A", 4, 3), ("B", 4, 3)], [(8, 3)])
+    >>> sorted(placed.items())
+    [('A', (0, 0.0, 0.0)), ('B', (0, 4.0, 0.0))]
+"""
+
+
+class MaxRectsBin(object):
+    """One sheet's usable area. Origin bottom-left, y up."""
+
+    def __init__(self, width, height):
+        self.width = float(width)
+        self.height = float(height)
+        self.free = [(0.0, 0.0, self.width, self.height)]   # (x, y, w, h)
+        self.used = []
+
+    def insert(self, w, h):
+        """Place a w x h rectangle; returns (x, y) or None if it does not fit."""
+        best = None
+        best_key = None
+        for fx, fy, fw, fh in self.free:
+            if w <= fw and h <= fh:
+                key = (min(fw - w, fh - h), max(fw - w, fh - h))
+                if best_key is None or key < best_key:
+                    best, best_key = (fx, fy), key
+        if best is None:
+            return None
+        rect = (best[0], best[1], float(w), float(h))
+        self._split(rect)
+        self.used.append(rect)
+        return best
+
+    def reserve(self, x, y, w, h):
+        """Mark an area as taken (e.g. a viewport already on the sheet)."""
+        rect = (float(x), float(y), float(w), float(h))
+        self._split(rect)
+        self.used.append(rect)
+
+    def _split(self, used):
+        ux, uy, uw, uh = used
+        result = []
+        for fr in self.free:
+            fx, fy, fw, fh = fr
+            if ux >= fx + fw or ux + uw <= fx or uy >= fy + fh or uy + uh <= fy:
+                result.append(fr)
+                continue
+            if ux > fx:
+                result.append((fx, fy, ux - fx, fh))
+            if ux + uw < fx + fw:
+                result.append((ux + uw, fy, fx + fw - ux - uw, fh))
+            if uy > fy:
+                result.append((fx, fy, fw, uy - fy))
+            if uy + uh < fy + fh:
+                result.append((fx, uy + uh, fw, fy + fh - uy - uh))
+        self.free = _prune(result)
+
+    def occupancy(self):
+        area = self.width * self.height
+        return sum(r[2] * r[3] for r in self.used) / area if area else 0.0
+
+
+def _contains(a, b):
+    return (b[0] >= a[0] and b[1] >= a[1]
+            and b[0] + b[2] <= a[0] + a[2] and b[1] + b[3] <= a[1] + a[3])
+
+
+def _prune(rects):
+    rects = [r for r in rects if r[2] > 1e-9 and r[3] > 1e-9]
+    keep = []
+    for i, r in enumerate(rects):
+        contained = False
+        for j, o in enumerate(rects):
+            if i != j and _contains(o, r) and (r != o or j < i):
+                contained = True
+                break
+        if not contained:
+            keep.append(r)
+    return keep
+
+
+def pack(items, bin_sizes, padding=0.0, new_bin=None, reserved=None, max_bins=100):
+    """Pack rectangles into bins in order, opening new bins on overflow.
+
+    items     -- [(key, width, height)]
+    bin_sizes -- [(width, height)] of the bins that already exist (e.g. chosen sheets)
+    padding   -- clear gap kept between rectangles
+    new_bin   -- (width, height) of extra bins to open when the existing ones are
+                 full, or None to report the overflow as unplaced
+    reserved  -- {bin index: [(x, y, width, height)]} areas already taken
+    Returns (placed, unplaced, bins):
+        placed   -- {key: (bin index, x, y)} bottom-left corner inside the bin
+        unplaced -- [key] that fit in no bin
+        bins     -- [MaxRectsBin] including any newly opened ones
+    """
+    bins = [MaxRectsBin(w + padding, h + padding) for w, h in bin_sizes]
+    for index, rects in (reserved or {}).items():
+        for x, y, w, h in rects:
+            bins[index].reserve(x, y, w + padding, h + padding)
+    order = sorted(items, key=lambda it: (-max(it[1], it[2]), -(it[1] * it[2])))
+    placed = {}
+    unplaced = []
+    for key, w, h in order:
+        pw, ph = w + padding, h + padding
+        spot = None
+        for index, b in enumerate(bins):
+            spot = b.insert(pw, ph)
+            if spot is not None:
+                break
+        if spot is None and new_bin is not None and len(bins) < max_bins:
+            if w <= new_bin[0] and h <= new_bin[1]:
+                bins.append(MaxRectsBin(new_bin[0] + padding, new_bin[1] + padding))
+                index = len(bins) - 1
+                spot = bins[index].insert(pw, ph)
+        if spot is None:
+            unplaced.append(key)
+        else:
+            placed[key] = (index, spot[0], spot[1])
+    return placed, unplaced, bins
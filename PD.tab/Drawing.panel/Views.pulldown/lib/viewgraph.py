@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""View placement / reference graph shared by the Views pulldown tools.
+
+Built in one pass over views, sheets, viewports and schedule instances:
+
+    view -> sheets          (viewports + schedule sheet instances)
+    view -> parent view     (section / callout / elevation markers)
+    view -> referenced on   (Referencing Sheet / Referencing Detail)
+    view -> dependents      (GetPrimaryViewId)
+
+Only element ids (ints) and plain tuples are stored, so the graph can be kept
+in the AppDomain between commands. It is cached per document next to a
+change counter: a DocumentChanged handler (installed on first use) bumps the
+counter whenever a view, sheet, viewport or schedule instance is added or
+modified, or anything is deleted. A cached lookup is one envvar read; the
+graph is rebuilt only after such a change (renames, renumbering, moved
+markers) or on request (rebuild=True).
+"""
+
+from System.Collections.Generic import List
+from pyrevit import DB, HOST_APP, script
+
+
+_CACHE_PREFIX = "PD_VIEWGRAPH_"
+_COUNTER_PREFIX = "PD_VIEWGRAPH_CHANGES_"
+_TRACKING_FLAG = "PD_VIEWGRAPH_TRACKING"
+
+
+def _pstr(el, bip):
+    try:
+        p = el.Parameter[bip]
+        return p.AsString() if p else None
+    except Exception:
+        return None
+
+
+def _cache_key(doc):
+    return _CACHE_PREFIX + (doc.PathName or doc.Title)
+
+
+def _graph_filter():
+    return DB.LogicalOrFilter(List[DB.ElementFilter]([
+        DB.ElementClassFilter(DB.View),
+        DB.ElementClassFilter(DB.Viewport),
+        DB.ElementClassFilter(DB.ScheduleSheetInstance),
+    ]))
+
+
+def _on_doc_changed(sender, args):
+    try:
+        relevant = _graph_filter()
+        if not (args.GetDeletedElementIds().Count
+                or args.GetAddedElementIds(relevant).Count
+                or args.GetModifiedElementIds(relevant).Count):
+            return
+        key = _COUNTER_PREFIX + _cache_key(args.GetDocument())
+        script.set_envvar(key, (script.get_envvar(key) or 0) + 1)
+    except Exception:
+        pass
+
+
+def _ensure_tracking():
+    if not script.get_envvar(_TRACKING_FLAG):
+        HOST_APP.app.DocumentChanged += _on_doc_changed
+        script.set_envvar(_TRACKING_FLAG, True)
+
+
+def _signature(doc):
+    """(document instance, change counter): cheap, read on every lookup."""
+    return doc.GetHashCode(), script.get_envvar(_COUNTER_PREFIX + _cache_key(doc)) or 0
+
+
+def _build(doc):
+    views = {}          # view id -> (name, ViewType str, is template)
+    by_name = {}        # view name -> view id
+    sheets = {}         # sheet id -> (number, name)
+    sheet_by_num = {}   # sheet number -> sheet id
+    placed = {}         # view id -> [(sheet id, detail number)]
+    sched_inst = {}     # schedule view id -> [(instance id, sheet id)]
+    parent_of = {}      # view id -> parent view id (marker host)
+    children = {}       # parent view id -> [view ids]
+    ref_on = {}         # view id -> (referencing sheet number, referencing detail)
+    dependents = {}     # primary view id -> [dependent view ids]
+    parent_names = {}   # view id -> parent view name (resolved after the pass)
+
+    for v in DB.FilteredElementCollector(doc).OfClass(DB.View):
+        vid = v.Id.IntegerValue
+        if isinstance(v, DB.ViewSheet):
+            sheets[vid] = (v.SheetNumber, v.Name)
+            sheet_by_num[v.SheetNumber] = vid
+            continue
+        views[vid] = (v.Name, str(v.ViewType), v.IsTemplate)
+        if v.IsTemplate:
+            continue
+        by_name[v.Name] = vid
+        pname = _pstr(v, DB.BuiltInParameter.SECTION_PARENT_VIEW_NAME)
+        if pname:
+            parent_names[vid] = pname
+        rsheet = _pstr(v, DB.BuiltInParameter.VIEW_REFERENCING_SHEET)
+        rdetail = _pstr(v, DB.BuiltInParameter.VIEW_REFERENCING_DETAIL)
+        if rsheet and rdetail:
+            ref_on[vid] = (rsheet, rdetail)
+        try:
+            primary = v.GetPrimaryViewId()
+            if primary != DB.ElementId.InvalidElementId:
+                dependents.setdefault(primary.IntegerValue, []).append(vid)
+        except Exception:
+            pass
+
+    for pvid, pname in parent_names.items():
+        parent = by_name.get(pname)
+        if parent is not None and parent != pvid:
+            parent_of[pvid] = parent
+            children.setdefault(parent, []).append(pvid)
+
+    for vp in DB.FilteredElementCollector(doc).OfClass(DB.Viewport):
+        detail = _pstr(vp, DB.BuiltInParameter.VIEWPORT_DETAIL_NUMBER)
+        placed.setdefault(vp.ViewId.IntegerValue, []).append((vp.SheetId.IntegerValue, detail))
+
+    for ssi in DB.FilteredElementCollector(doc).OfClass(DB.ScheduleSheetInstance):
+        sched_inst.setdefault(ssi.ScheduleId.IntegerValue, []).append(
+            (ssi.Id.IntegerValue, ssi.OwnerViewId.IntegerValue))
+
+    return {
+        "views": views, "sheets": sheets, "sheet_by_num": sheet_by_num,
+        "placed": placed, "sched_inst": sched_inst, "parent_of": parent_of,
+        "children": children, "ref_on": ref_on, "dependents": dependents,
+    }
+
+
+class ViewGraph(object):
+    """Constant-time lookups over the cached graph data of one document."""
+
+    def __init__(self, doc, data):
+        self.doc = doc
+        self._d = data
+        # (sheet number, detail number) -> view id, for referencing lookups
+        self._detail_index = {}
+        for vid, places in data["placed"].items():
+            for sheet_id, detail in places:
+                sheet = data["sheets"].get(sheet_id)
+                if sheet and detail:
+                    self._detail_index[(sheet[0], detail)] = vid
+        self._primary = {}
+        for primary, deps in data["dependents"].items():
+            for dep in deps:
+                self._primary[dep] = primary
+
+    # -- basic sets
+    def view_ids(self, include_templates=False):
+        return [vid for vid, info in self._d["views"].items() if include_templates or not info[2]]
+
+    def is_template(self, view_id):
+        info = self._d["views"].get(_int(view_id))
+        return bool(info and info[2])
+
+    # -- placement
+    def sheets_of(self, view_id):
+        """Sheet ids (ints) the view is placed on, as viewport or schedule instance."""
+        vid = _int(view_id)
+        found = set(s for s, _ in self._d["placed"].get(vid, ()))
+        found.update(s for _, s in self._d["sched_inst"].get(vid, ()))
+        return found
+
+    def is_placed(self, view_id):
+        vid = _int(view_id)
+        return vid in self._d["placed"] or vid in self._d["sched_inst"]
+
+    def schedule_instances(self, view_id):
+        return [i for i, _ in self._d["sched_inst"].get(_int(view_id), ())]
+
+    def viewports_on(self, view_id):
+        """[(sheet id, detail number)] for every viewport showing the view."""
+        return list(self._d["placed"].get(_int(view_id), ()))
+
+    # -- references
+    def referring_views(self, view_id):
+        """Views whose marker lives in this view (sections / callouts / elevations)."""
+        return list(self._d["children"].get(_int(view_id), ()))
+
+    def parent_view(self, view_id):
+        return self._d["parent_of"].get(_int(view_id))
+
+    def is_referenced(self, view_id):
+        return _int(view_id) in self._d["ref_on"]
+
+    def dependents(self, view_id):
+        return list(self._d["dependents"].get(_int(view_id), ()))
+
+    def primary_view(self, view_id):
+        """Primary view id of a dependent view, or None."""
+        return self._primary.get(_int(view_id))
+
+    def sheetrefinfo(self, view_id):
+        """(sheet number, sheet name, detail number, referring view id or None) or None.
+
+        Mirrors pyrevit.revit.query.get_view_sheetrefinfo: placement first, then
+        the Referencing Sheet / Detail of the view's marker.
+        """
+        vid = _int(view_id)
+        for sheet_id, detail in self._d["placed"].get(vid, ()):
+            sheet = self._d["sheets"].get(sheet_id)
+            if sheet:
+                return sheet[0], sheet[1], detail, None
+        ref = self._d["ref_on"].get(vid)
+        if ref:
+            sheet_id = self._d["sheet_by_num"].get(ref[0])
+            sheet_name = self._d["sheets"][sheet_id][1] if sheet_id else ""
+            return ref[0], sheet_name, ref[1], self._detail_index.get(ref)
+        return None
+
+
+def _int(view_id):
+    return view_id if isinstance(view_id, int) else view_id.IntegerValue
+
+
+def get_view_graph(doc, rebuild=False):
+    """Return the ViewGraph of `doc`, reusing the cached data when still valid."""
+    _ensure_tracking()
+    key = _cache_key(doc)
+    sig = _signature(doc)
+    cached = None if rebuild else script.get_envvar(key)
+    if cached and cached[0] == sig:
+        return ViewGraph(doc, cached[1])
+    data = _build(doc)
+    script.set_envvar(key, (sig, data))
+    return ViewGraph(doc, data)
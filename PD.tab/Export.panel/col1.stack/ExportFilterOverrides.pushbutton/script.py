@@ -10,8 +10,12 @@ clr.AddReference("RevitAPI")
 from Autodesk.Revit.DB import *
 from pyrevit import revit, forms, script
 
+from filtermatrix import FilterMatrix
+
 doc = revit.doc
 
+ALL_VIEWS = "<All views and templates - filter matrix CSV>"
+
 # ----------------------------------------
 # 1. Collect views
 views = (
@@ -30,17 +34,36 @@ for v in named_views:
     view_map[label] = v
 
 selected_label = forms.SelectFromList.show(
-    view_labels, multiselect=False, title="Select View or Template to List Filters"
+    [ALL_VIEWS] + view_labels,
+    multiselect=False,
+    title="Select View or Template to List Filters",
 )
 
 if not selected_label:
     script.exit("No view selected.")
 
+# ----------------------------------------
+# All views: views / templates x filters matrix with override signatures
+if selected_label == ALL_VIEWS:
+    matrix = FilterMatrix(doc)
+    save_path = forms.save_file(file_ext="csv", title="Save Filter Matrix As")
+    if not save_path:
+        script.exit()
+    try:
+        matrix.write_csv(save_path, matrix.rows(templates_only=False))
+    except IOError as e:
+        forms.alert("Could not save the file.\n\n{}\n\nClose the file if it is open.".format(e),
+                    exitscript=True)
+    forms.alert("Exported filter matrix to:\n{}".format(save_path))
+    os.startfile(save_path)
+    script.exit()
+
 view = view_map[selected_label]
+matrix = FilterMatrix(doc, [view])
 
 # ----------------------------------------
-# 2. List filter names
-filter_ids = view.GetFilters()
+# 2. List filter names with visibility and overrides
+filter_ids = matrix.by_view.get(view.Id.IntegerValue)
 if not filter_ids:
     forms.alert("Selected view has no filters.")
     script.exit()
@@ -48,9 +71,12 @@ if not filter_ids:
 lines = []
 lines.append("Filters applied to view '{}':\n".format(view.Name))
 
+legend = dict(matrix.legend())
 for fid in filter_ids:
-    fe = doc.GetElement(fid)
-    lines.append("- {}".format(Element.Name.GetValue(fe) if fe else "Unknown Filter"))
+    cell = matrix.cell_text(view.Id.IntegerValue, fid)
+    code = cell.split(" ")[-1] if " " in cell else ""
+    lines.append("- {} [{}]{}".format(
+        matrix.filter_name(fid), cell, "  " + legend[code] if code in legend else ""))
 
 # ----------------------------------------
 # 3. Save to text file
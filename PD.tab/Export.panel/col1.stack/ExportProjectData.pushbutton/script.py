@@ -11,6 +11,8 @@ from Autodesk.Revit.DB.Electrical import WireType  # ✅ required for wiring typ
 
 from pyrevit import forms, revit, DB
 
+from mepsettings import load_classification_names
+
 # Ensure a Revit document is open
 doc = revit.doc
 if not doc:
@@ -97,8 +99,7 @@ def get_dimension_styles(doc):
 
 
 def get_load_classifications(doc):
-    elems = DB.FilteredElementCollector(doc).WhereElementIsNotElementType().ToElements()
-    return [e.Name for e in elems if e.GetType().Name == "ElectricalLoadClassification"]
+    return load_classification_names(doc)
 
 
 def get_wiring_types(doc):
@@ -0,0 +1,135 @@
+"""Compares the model's styles with the company standard.
+
+The reference is either a snapshot (JSON, saved here from the standards
+model) or the standards model itself, open in this session. View
+templates, filters, line styles, line and fill patterns, text, dimension
+and filled region types are matched by name and by a hash of their
+defining properties (lib/standards.py): missing, extra, divergent (with
+the differing properties), renamed copies and names that collide after
+normalizing are reported. When the standards model is open, missing
+styles can be copied from it in one go.
+"""
+# pylint: disable=import-error,invalid-name,broad-except
+import time
+
+from pyrevit import revit
+from pyrevit import forms
+from pyrevit import script
+
+import standards
+
+
+doc = revit.doc
+app = revit.uidoc.Application.Application
+output = script.get_output()
+config = script.get_config()
+
+SAVE_SNAPSHOT = "Save standards snapshot (JSON)"
+COMPARE_JSON = "Compare with snapshot (JSON)"
+COMPARE_DOC = "Compare with open standards model"
+
+
+def pick_kinds():
+    return forms.SelectFromList.show(
+        standards.KIND_NAMES,
+        multiselect=True,
+        title="Styles to Compare",
+        button_name="Compare",
+    )
+
+
+def print_results(results, reference):
+    output.print_md("## Standards check against `{}` ({})".format(
+        reference.get("source", "?"), reference.get("created", "")))
+    output.print_table(
+        [[kind] + results[kind].counts() for kind in standards.KIND_NAMES if kind in results],
+        columns=["Kind", "Missing", "Extra", "Divergent", "Renamed", "Collisions", "Matching"],
+        title="Summary",
+    )
+    for kind in standards.KIND_NAMES:
+        res = results.get(kind)
+        if res is None:
+            continue
+        rows = [["missing", i["name"], ""] for i in res.missing]
+        rows += [["renamed", cur["name"], "standard name: {}".format(ref["name"])]
+                 for ref, cur in res.renamed]
+        rows += [["divergent", cur["name"], ", ".join(keys)] for ref, cur, keys in res.divergent]
+        rows += [["extra", i["name"], ""] for i in res.extra]
+        rows += [["collision", dup["name"], "same {} name as '{}', not compared".format(side, kept["name"])]
+                 for side, kept, dup in res.collisions]
+        if rows:
+            output.print_table(rows, columns=["Status", "Name", "Details"], title=kind)
+
+
+def standards_documents():
+    return [d for d in app.Documents
+            if not d.IsFamilyDocument and not d.IsLinked and d.Title != doc.Title]
+
+
+selected_option = forms.CommandSwitchWindow.show(
+    [COMPARE_JSON, COMPARE_DOC, SAVE_SNAPSHOT],
+    message="Project standards:",
+)
+
+if selected_option == SAVE_SNAPSHOT:
+    path = forms.save_file(file_ext="json", title="Save Standards Snapshot",
+                           default_name="{}_standards".format(doc.Title))
+    if path:
+        start = time.time()
+        snap = standards.snapshot(doc)
+        try:
+            standards.write_snapshot(path, snap)
+        except IOError as ex:
+            forms.alert("Could not save the file.\n\n{}".format(ex))
+            script.exit()
+        output.print_md("Saved **{}** styles to `{}` ({:.2f} s)".format(
+            sum(len(items) for items in snap["kinds"].values()), path, time.time() - start))
+
+elif selected_option in (COMPARE_JSON, COMPARE_DOC):
+    source_doc = None
+    if selected_option == COMPARE_JSON:
+        path = forms.pick_file(file_ext="json", init_dir=getattr(config, "snapshot_folder", "") or "",
+                               title="Standards Snapshot")
+        if not path:
+            script.exit()
+        config.snapshot_folder = path.rsplit("\\", 1)[0]
+        script.save_config()
+    else:
+        candidates = standards_documents()
+        if not candidates:
+            forms.alert("Open the standards model in this Revit session first.")
+            script.exit()
+        chosen = forms.SelectFromList.show(
+            sorted(d.Title for d in candidates), title="Select Standards Model", button_name="Compare")
+        if not chosen:
+            script.exit()
+        source_doc = next(d for d in candidates if d.Title == chosen)
+
+    kinds = pick_kinds()
+    if not kinds:
+        script.exit()
+
+    start = time.time()
+    if source_doc is None:
+        try:
+            reference = standards.read_snapshot(path)
+        except (IOError, ValueError) as ex:
+            forms.alert("Could not read the snapshot.\n\n{}".format(ex))
+            script.exit()
+    else:
+        reference = standards.snapshot(source_doc, kinds)
+    current = standards.snapshot(doc, kinds)
+    results = standards.compare(reference, current)
+    print_results(results, reference)
+    output.print_md("_Compared in {:.2f} s_".format(time.time() - start))
+
+    copyable = sum(len(res.missing) for kind, res in results.items()
+                   if kind not in standards.NOT_COPYABLE)
+    if source_doc is not None and copyable and forms.alert(
+        "Copy {} missing style(s) from {}?\n\n(Line styles need Transfer Project Standards.)".format(
+            copyable, source_doc.Title),
+        yes=True, no=True,
+    ):
+        with revit.Transaction("Copy Missing Standards"):
+            copied = standards.copy_missing(source_doc, doc, results)
+        output.print_md("Copied **{}** element(s) from `{}`.".format(copied, source_doc.Title))
@@ -1,28 +1,29 @@
 # coding: utf-8
 """
-Rename Text Types & Dimension Styles (System Families)
-• Find & replace in type names (case-insensitive).
+Rename Text Types, Dimension Styles, Filled Region Types & Line Styles
+• Find & replace in names (case-insensitive).
 • Ensures unique names (_1, _2, ... if needed).
-• Duplicate ➜ Swap ➜ Delete for safety.
+• All new names are planned first, then applied in one transaction
+  (lib/stylerename.py); line styles are swapped to a renamed copy.
 """
 
 import clr
 
 clr.AddReference("RevitAPI")
+import re
+
 from Autodesk.Revit.DB import *
 from pyrevit import forms, revit, script
 
+import stylerename
+from renamer import RENAME, UNCHANGED
+
 doc = revit.doc
 output = script.get_output()
 
 # 1️⃣ User input
-CATEGORY_MAP = {
-    "Text Types": TextNoteType,
-    "Dimension Styles": DimensionType,
-}
-
 cat_choice = forms.SelectFromList.show(
-    sorted(CATEGORY_MAP.keys()), title="Select Type Category to Rename"
+    stylerename.SCOPES, title="Select Type Category to Rename"
 )
 if not cat_choice:
     script.exit()
@@ -32,81 +33,24 @@ replace_text = forms.ask_for_string(prompt="Replace with:")
 if not (find_text and replace_text):
     script.exit()
 
-target_class = CATEGORY_MAP[cat_choice]
-f_lc = find_text.lower()
-
-# 2️⃣ Collect all elements of the selected class
-elements = list(FilteredElementCollector(doc).OfClass(target_class))
-
-
-def get_name(el):
-    param = el.get_Parameter(BuiltInParameter.SYMBOL_NAME_PARAM)
-    return param.AsString() if param else ""
-
-
-# All existing names
-all_names = [get_name(el) for el in elements if get_name(el)]
-name_set = set(n.lower() for n in all_names)
+# plain text: escape the pattern and any backslash in the replacement
+rule = stylerename.Rule(cat_choice, re.escape(find_text), replace_text.replace("\\", "\\\\"), ignore_case=True)
 
-# Find matches
-matches = []
-for el in elements:
-    name = get_name(el)
-    if name and f_lc in name.lower():
-        matches.append((el.Id, name))
+# 2️⃣ Plan every new name against the names in use
+plan = stylerename.build_plans(doc, [rule], unique=True)[cat_choice]
 
-if not matches:
+if not plan.renames:
     output.print_md("_No matching names for **{}**_".format(find_text))
     script.exit()
 
-# 3️⃣ Collect instances to swap
-INSTANCE_CLASSES = {"Text Types": TextNote, "Dimension Styles": Dimension}
-instance_class = INSTANCE_CLASSES.get(cat_choice)
-inst_elems = (
-    list(
-        FilteredElementCollector(doc)
-        .OfClass(instance_class)
-        .WhereElementIsNotElementType()
-    )
-    if instance_class
-    else []
-)
-
-renamed = []
-skipped = []
-
-# 4️⃣ Rename via duplicate ➜ swap ➜ delete
+# 3️⃣ Rename
 with revit.Transaction("Rename {} (Safe Rename)".format(cat_choice)):
-    for old_id, oldname in matches:
-        old_type = doc.GetElement(old_id)
-        if not old_type:
-            continue
-
-        base_new = oldname.replace(find_text, replace_text)
-        new_name = base_new
-        suffix = 1
-        name_set.discard(oldname.lower())
-
-        while new_name.lower() in name_set:
-            new_name = "{}_{}".format(base_new, suffix)
-            suffix += 1
-
-        try:
-            dup = old_type.Duplicate(new_name)
-            new_id = dup if isinstance(dup, ElementId) else dup.Id
-
-            for inst in inst_elems:
-                if inst.GetTypeId() == old_id:
-                    inst.ChangeTypeId(new_id)
-
-            doc.Delete(old_id)
-            name_set.add(new_name.lower())
-            renamed.append((oldname, new_name))
+    stylerename.apply_plans({cat_choice: plan})
 
-        except Exception as err:
-            skipped.append((oldname, str(err)))
+renamed = [(e.old, e.new) for e in plan.renames]
+skipped = [(e.old, e.note) for e in plan.entries if e.status not in (RENAME, UNCHANGED)]
 
-# 5️⃣ Output results
+# 4️⃣ Output results
 if renamed:
     output.print_md("### ✅ Renamed:")
     for oldn, newn in renamed:
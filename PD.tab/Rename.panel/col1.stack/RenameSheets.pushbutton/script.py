@@ -1,17 +1,101 @@
+# Rename sheet numbers or sheet names with a list of rules.
+#
+# Each rule has an optional condition on any sheet parameter, e.g.
+#   Sheet Name=*Plan*; Discipline~^Arch
+# and one operation: find / replace, prefix, or a numbering template such as
+#   A-{Sequence:03}   (start / step, optionally restarting per {Discipline})
+# The first rule whose condition holds renames the sheet. The full old -> new
+# map is validated against the numbers in use and previewed, then applied in
+# one transaction in two phases, so swaps and shifts never collide
+# (lib/renamer.py).
+
 # Import necessary Revit API and pyRevit libraries
+import re
+import time
+
 from Autodesk.Revit.DB import *
-from pyrevit import forms
+from pyrevit import revit, forms, script
+
+import renamer
 
 # Get the current Revit document
-doc = __revit__.ActiveUIDocument.Document
-
-# Collect all sheets in the model
-sheets = (
-    FilteredElementCollector(doc)
-    .OfCategory(BuiltInCategory.OST_Sheets)
-    .WhereElementIsNotElementType()
-    .ToElements()
-)
+doc = revit.doc
+output = script.get_output()
+
+FIND_REPLACE = "Find / Replace"
+PREFIX = "Add prefix"
+NUMBERING = "Numbering template"
+
+
+def ask(title, prompt, default=""):
+    return forms.ask_for_string(title=title, prompt=prompt, default=default)
+
+
+def ask_int(title, prompt, default):
+    value = ask(title, prompt, str(default))
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        forms.alert("'{}' is not a whole number.".format(value))
+        return None
+
+
+def ask_branch(field_label, number):
+    """(predicate or None, rule, description) for one rule, or None when cancelled."""
+    condition_text = ask(
+        "Rule {} Condition".format(number),
+        "Only sheets where (e.g. Sheet Name=*Plan*; Discipline~^Arch).\n"
+        "Leave blank for all remaining sheets:",
+    )
+    if condition_text is None:
+        return None
+    try:
+        predicate = renamer.condition(condition_text) if condition_text.strip() else None
+    except ValueError as e:
+        forms.alert(str(e))
+        return None
+
+    operation = forms.CommandSwitchWindow.show(
+        [FIND_REPLACE, PREFIX, NUMBERING],
+        message="Rule {}: how to change the {}?".format(number, field_label.lower()),
+    )
+    if operation == FIND_REPLACE:
+        text_to_replace = ask("Text to Replace", "Enter the text to replace:")
+        if not text_to_replace:
+            return None
+        replacement_text = ask("Replacement Text", "Enter the replacement text:")
+        if replacement_text is None:
+            return None
+        rule = renamer.regex_rule(re.escape(text_to_replace), replacement_text.replace("\\", "\\\\"))
+        description = "replace '{}' with '{}'".format(text_to_replace, replacement_text)
+    elif operation == PREFIX:
+        prefix = ask("Prefix to Add", "Enter the prefix to add:")
+        if not prefix:
+            return None
+        rule = renamer.prefix_rule(prefix)
+        description = "prefix '{}'".format(prefix)
+    elif operation == NUMBERING:
+        template = ask(
+            "Numbering Template",
+            "Template ({Sequence:03}, {Old}, {Number}, {Name} or any parameter name):",
+            "A-{Sequence:03}",
+        )
+        if not template:
+            return None
+        start = ask_int("Start", "First sequence number:", 1)
+        step = ask_int("Step", "Sequence step:", 1) if start is not None else None
+        if step is None:
+            return None
+        restart = ask("Restart", "Restart the sequence for each value of (e.g. {Discipline}), or blank:")
+        rule = renamer.sequence_rule(template, start, step, restart or None)
+        description = "number '{}' from {} step {}{}".format(
+            template, start, step, " per {}".format(restart) if restart else "")
+    else:
+        return None
+    return predicate, rule, "{} -> {}".format(condition_text.strip() or "all", description)
+
 
 # Ask the user whether to rename Sheet Name or Sheet Number
 rename_option = forms.ask_for_one_item(
@@ -25,95 +109,58 @@ rename_option = forms.ask_for_one_item(
 if rename_option is None:
     forms.alert("Operation cancelled. No changes were made.", exitscript=True)
 
-# Ask if the renaming should be conditional based on Sheet Name
-conditional_rename = forms.alert(
-    "Do you want the renaming to be conditional based on Sheet Name?",
-    options=["Yes", "No"],
-)
+field = renamer.SHEET_NUMBER if rename_option == "Sheet Number" else renamer.SHEET_NAME
 
-# Initialize condition_text to None if "No" is selected
-condition_text = None
+# Collect the rules, first match wins
+branches = []
+while True:
+    branch = ask_branch(rename_option, len(branches) + 1)
+    if branch is None:
+        break
+    branches.append(branch)
+    if not forms.alert("Add another rule?", yes=True, no=True):
+        break
 
-# Handle conditional renaming logic
-if conditional_rename == "Yes":
-    condition_text = forms.ask_for_string(
-        title="Condition Text",
-        prompt="Enter the text that must be contained in the Sheet Name for the operation to apply:",
-        default="",
-    )
-    if not condition_text:
-        forms.alert(
-            "You must provide a condition text for conditional renaming. Operation cancelled.",
-            exitscript=True,
-        )
+if not branches:
+    forms.alert("Operation cancelled. No changes were made.", exitscript=True)
 
-# Now, proceed to ask for the renaming details
-# Ask the user for the text to replace or add a prefix
-text_to_replace = forms.ask_for_string(
-    title="Text to Replace",
-    prompt="Enter the text to replace, or leave blank to add a prefix:",
-    default="",
+# Plan: sheets in natural number order, so sequences follow the set
+start_time = time.time()
+sheets = sorted(
+    FilteredElementCollector(doc).OfClass(ViewSheet),
+    key=lambda s: renamer.natural_key(s.SheetNumber),
 )
+plan = renamer.build_plan(doc, sheets, field, renamer.first_match([(p, r) for p, r, _ in branches]))
+planned = time.time() - start_time
 
-# Decide prompt for replacement text or prefix
-if text_to_replace:
-    replacement_text = forms.ask_for_string(
-        title="Replacement Text", prompt="Enter the replacement text:", default=""
-    )
-else:
-    replacement_text = forms.ask_for_string(
-        title="Prefix to Add", prompt="Enter the prefix to add:", default=""
-    )
+output.print_table(
+    [[i + 1, d] for i, (_, _, d) in enumerate(branches)],
+    columns=["#", "Rule (condition -> operation)"],
+    title="Rules (first match wins)",
+)
+counts = plan.counts()
+output.print_table(
+    plan.rows(),
+    columns=["Old", "New", "Status", "Note"],
+    title="{} sheets: {} ({:.2f} s)".format(
+        len(sheets), ", ".join("{} {}".format(n, s) for s, n in sorted(counts.items())), planned),
+)
 
-# Validate inputs
-if replacement_text is None:
-    forms.alert("Operation cancelled. No changes were made.", exitscript=True)
+if not plan.renames:
+    forms.alert("Nothing to rename.", exitscript=True)
 
-# Start a transaction to rename sheets
-t = Transaction(doc, "Rename Sheets")
-t.Start()
-
-try:
-    for sheet in sheets:
-        # Check if the operation should be conditional
-        if condition_text and condition_text not in sheet.Name:
-            # Skip sheets that do not match the condition
-            continue
-
-        if rename_option == "Sheet Name":
-            # Rename Sheet Name
-            if text_to_replace:
-                # Replace text in the name
-                if text_to_replace in sheet.Name:
-                    new_name = sheet.Name.replace(text_to_replace, replacement_text)
-                    sheet.Name = new_name
-            else:
-                # Add prefix if no text to replace
-                sheet.Name = replacement_text + sheet.Name
-
-        elif rename_option == "Sheet Number":
-            # Rename Sheet Number
-            current_value = sheet.SheetNumber
-            if text_to_replace:
-                # Replace text in the sheet number
-                if text_to_replace in current_value:
-                    new_number = current_value.replace(
-                        text_to_replace, replacement_text
-                    )
-                    sheet.SheetNumber = new_number
-            else:
-                # Add prefix if no text to replace
-                new_number = replacement_text + current_value
-                sheet.SheetNumber = new_number
-
-    # Commit the transaction
-    t.Commit()
-    forms.alert(
-        "Sheet {}s updated successfully!".format(rename_option.lower()),
-        exitscript=False,
-    )
+if not forms.alert(
+    "Rename {} sheet {}s?".format(len(plan.renames), rename_option.lower().split()[-1]), yes=True, no=True
+):
+    script.exit()
+
+# Apply in one transaction (temporary values first where needed)
+with revit.Transaction("Rename Sheets"):
+    renamed = renamer.apply_plan(plan)
 
-except Exception as e:
-    # Rollback the transaction in case of an error
-    t.RollBack()
-    forms.alert("An error occurred: {}".format(str(e)), exitscript=True)
+failed = plan.by_status(renamer.FAILED)
+forms.alert(
+    "Sheet {}s updated successfully! ({} renamed)".format(rename_option.lower(), renamed)
+    + "".join("\nNot renamed: {} ({})".format(e.old, e.note) for e in failed),
+    exitscript=False,
+)
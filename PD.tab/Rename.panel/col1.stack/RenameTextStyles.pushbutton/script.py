@@ -1,127 +1,131 @@
 # -*- coding: utf-8 -*-
-__title__ = "Rename Text Styles (Regex)"
+__title__ = "Rename Styles (Regex)"
 __author__ = "Jarek Wityk @ PD"
 
+# Ordered regex rules over text types, dimension styles, filled region
+# types and line styles (lib/stylerename.py). All new names are previewed
+# (dry run) with collisions flagged before anything is renamed; the rules
+# can be saved as a CSV rule set and reloaded in other projects.
+
 import clr
 
 clr.AddReference("RevitAPI")
 import re
-import tempfile
-import os
 
 from Autodesk.Revit.DB import *
 from pyrevit import revit, forms, script
 
+import renamer
+import stylerename
+
 doc = revit.doc
 output = script.get_output()
+config = script.get_config()
 
-# ---------------------------------------
-# 1. Collect all TextNoteTypes
-text_types = list(FilteredElementCollector(doc).OfClass(TextNoteType).ToElements())
-if not text_types:
-    forms.alert("No Text Styles found.")
-    script.exit()
+NEW_RULES = "New rule set"
+LOAD_RULES = "Load rule set (CSV)"
+UNIQUE = "Add _1, _2 to colliding names"
 
-# Build name map
-name_map = {}
-all_names = []
-for t in text_types:
-    name = t.get_Parameter(BuiltInParameter.SYMBOL_NAME_PARAM).AsString()
-    if name:
-        name_map[name] = t
-        all_names.append(name)
 
 # ---------------------------------------
-# 2. Show all names in a copyable file
-temp_path = os.path.join(tempfile.gettempdir(), "text_styles_list.txt")
-with open(temp_path, "w") as f:
-    f.write("Current Text Styles:\n\n")
-    for n in sorted(all_names):
-        f.write("  - {}\n".format(n))
-
-os.startfile(temp_path)
+def ask_rules():
+    rules = []
+    while True:
+        scope = forms.CommandSwitchWindow.show(
+            stylerename.SCOPES, message="Rule {}: rename which styles?".format(len(rules) + 1)
+        )
+        if not scope:
+            return rules
+        pattern = forms.ask_for_string(
+            title="Regex Rename", prompt="RegEx pattern to match in {} names:".format(scope), default=""
+        )
+        if not pattern:
+            return rules
+        replacement = forms.ask_for_string(
+            title="Regex Replace",
+            prompt="Replacement pattern (use \\1, \\2, etc.; empty removes the match):",
+            default="",
+        )
+        if replacement is None:
+            return rules
+        try:
+            rules.append(stylerename.Rule(scope, pattern, replacement))
+        except re.error as e:
+            forms.alert("Invalid pattern `{}`: {}".format(pattern, e))
+            continue
+        if not forms.alert("Add another rule?", yes=True, no=True):
+            return rules
+
+
+def load_rules():
+    path = forms.pick_file(
+        file_ext="csv",
+        init_dir=getattr(config, "rules_folder", "") or "",
+        title="Rule set: " + ", ".join(stylerename.CSV_COLUMNS),
+    )
+    if not path:
+        return []
+    config.rules_folder = path.rsplit("\\", 1)[0]
+    script.save_config()
+    try:
+        return stylerename.read_rules(path)
+    except (ValueError, IOError) as e:
+        forms.alert("Could not read the rule set.\n\n{}".format(e))
+        return []
 
 
 # ---------------------------------------
-# 3. Select styles to rename
-selected_names = forms.SelectFromList.show(
-    sorted(all_names),
-    multiselect=True,
-    title="Select Text Styles to Rename (see text list for help)",
-    button_name="Next",
+# 1. Rules
+selected_option, switches = forms.CommandSwitchWindow.show(
+    [NEW_RULES, LOAD_RULES], switches=[UNIQUE], message="Rename styles:"
 )
+if not selected_option:
+    script.exit()
 
-if not selected_names:
-    script.exit("Nothing selected.")
-
-# ---------------------------------------
-# 4. Ask for RegEx pattern + replacement
-pattern = forms.ask_for_string(
-    title="Regex Rename", prompt="RegEx pattern to match in style names:", default=""
-)
+rules = ask_rules() if selected_option == NEW_RULES else load_rules()
+if not rules:
+    script.exit("No rules.")
 
-replacement = forms.ask_for_string(
-    title="Regex Replace",
-    prompt="Replacement pattern (use \\1, \\2, etc.):",
-    default="",
+output.print_table(
+    [[i + 1, r.scope, r.pattern, r.replacement] for i, r in enumerate(rules)],
+    columns=["#", "Scope", "Pattern", "Replacement"],
+    title="Rules (applied in order)",
 )
 
-if not (pattern and replacement):
-    script.exit("No pattern or replacement entered.")
-
 # ---------------------------------------
-# 5. Prepare renaming
-renamed = []
-skipped = []
-existing_names = [n.lower() for n in all_names]
-notes = list(
-    FilteredElementCollector(doc)
-    .OfClass(TextNote)
-    .WhereElementIsNotElementType()
-    .ToElements()
-)
-
-with revit.Transaction("Rename Text Styles (Regex)"):
-
-    for old_name in selected_names:
-        try:
-            new_name = re.sub(pattern, replacement, old_name)
-        except Exception as e:
-            skipped.append((old_name, "Regex failed: {}".format(e)))
-            continue
-
-        if new_name == old_name:
-            skipped.append((old_name, "No change"))
-            continue
-        if new_name.lower() in existing_names:
-            skipped.append((old_name, "Name already exists"))
-            continue
-
+# 2. Dry run
+plans = stylerename.build_plans(doc, rules, unique=switches[UNIQUE])
+rows = stylerename.preview_rows(plans)
+renames = sum(len(p.renames) for p in plans.values())
+output.print_table(rows, columns=["Scope", "Old", "New", "Status", "Note"],
+                   title="Dry run: {} of {} changes apply".format(renames, len(rows)))
+
+if selected_option == NEW_RULES and forms.alert("Save these rules as a rule set?", yes=True, no=True):
+    path = forms.save_file(file_ext="csv", title="Save Rule Set")
+    if path:
         try:
-            old_type = name_map[old_name]
-            dup = old_type.Duplicate(new_name)
-            new_id = dup if isinstance(dup, ElementId) else dup.Id
+            stylerename.write_rules(path, rules)
+        except IOError as e:
+            forms.alert("Could not save the file.\n\n{}\n\nClose the file if it is open.".format(e))
 
-            # Reassign notes
-            for note in notes:
-                if note.GetTypeId() == old_type.Id:
-                    note.ChangeTypeId(new_id)
-
-            doc.Delete(old_type.Id)
-            renamed.append((old_name, new_name))
-            existing_names.append(new_name.lower())
+if not renames:
+    forms.alert("Nothing to rename.")
+    script.exit()
 
-        except Exception as e:
-            skipped.append((old_name, str(e)))
+if not forms.alert("Rename {} style(s)?".format(renames), yes=True, no=True):
+    script.exit()
 
 # ---------------------------------------
-# 6. Print summary
-if renamed:
-    output.print_md("### ✅ Renamed:")
-    for oldn, newn in renamed:
-        output.print_md("* `{}` ➜ `{}`".format(oldn, newn))
-
-if skipped:
-    output.print_md("### ⚠️ Skipped:")
-    for oldn, msg in skipped:
-        output.print_md("* `{}` – {}".format(oldn, msg))
+# 3. Apply in one transaction
+with revit.Transaction("Rename Styles (Regex)"):
+    done = stylerename.apply_plans(plans)
+
+output.print_md("### ✅ Renamed:")
+for scope in stylerename.SCOPES:
+    if scope in done:
+        output.print_md("* {}: **{}**".format(scope, done[scope]))
+
+failed = [[scope] + [e.old, e.new, e.note] for scope in stylerename.SCOPES if scope in plans
+          for e in plans[scope].by_status(renamer.FAILED)]
+if failed:
+    output.print_table(failed, columns=["Scope", "Old", "New", "Error"], title="Not renamed")
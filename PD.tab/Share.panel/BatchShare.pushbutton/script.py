@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""Prepare several models for share in one go (issue days).
+
+Pick a share profile (lib/profiles or any YAML file), the models and a
+target folder. Each model is opened DETACHED (worksets preserved, the
+central file is never touched), cleaned with the same plan as Prepare for
+Share (lib/shareplan.py), saved as <model><save_suffix>.rvt in the target
+folder and closed. The health metrics run in-process (lib/healthmetrics.py).
+
+Models run one after the other and memory is released between them. Next
+to each saved copy a <model><save_suffix>.json report records the
+profile, counts, stage timings, health metrics, the before/after content
+profile (lib/modelprofile.py, when the profile asks for it) and any error.
+
+IronPython 2.7 - no f-strings, use .format(); except Exception.
+"""
+import gc
+import json
+import os
+import time
+
+import System
+from Autodesk.Revit.DB import (
+    BasicFileInfo,
+    DetachFromCentralOption,
+    ModelPathUtils,
+    OpenOptions,
+    SaveAsOptions,
+    WorksharingSaveAsOptions,
+)
+from pyrevit import revit, forms, script
+
+import healthmetrics
+from modelprofile import ATTRIBUTION_COLUMNS, attribution, profile_model
+from shareplan import StageTimer, build_plan, execute
+from shareprofile import ProfileError, list_profiles, load_profile
+
+app = revit.uidoc.Application.Application
+output = script.get_output()
+config = script.get_config()
+
+OTHER_PROFILE = "Other profile file..."
+
+
+def pick_profile():
+    by_name = dict((os.path.splitext(os.path.basename(p))[0], p) for p in list_profiles())
+    chosen = forms.SelectFromList.show(sorted(by_name) + [OTHER_PROFILE], title="Share Profile",
+                                       button_name="Use Profile")
+    if not chosen:
+        return None
+    if chosen == OTHER_PROFILE:
+        return forms.pick_file(file_ext="yaml", title="Share Profile")
+    return by_name[chosen]
+
+
+def open_detached(path):
+    model_path = ModelPathUtils.ConvertUserVisiblePathToModelPath(path)
+    options = OpenOptions()
+    if BasicFileInfo.Extract(path).IsWorkshared:
+        options.DetachFromCentralOption = DetachFromCentralOption.DetachAndPreserveWorksets
+    return app.OpenDocumentFile(model_path, options)
+
+
+def save_copy(doc, path):
+    options = SaveAsOptions()
+    options.OverwriteExistingFile = True
+    if doc.IsWorkshared:
+        ws_options = WorksharingSaveAsOptions()
+        ws_options.SaveAsCentral = True
+        options.SetWorksharingOptions(ws_options)
+    doc.SaveAs(path, options)
+
+
+def release_memory():
+    gc.collect()
+    System.GC.Collect()
+    System.GC.WaitForPendingFinalizers()
+
+
+def process(path, profile, target):
+    """Clean one model; returns its report (errors are recorded, not raised)."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    out_path = os.path.join(target, name + profile.save_suffix + ".rvt")
+    report = {"model": path, "saved_as": None, "profile": profile.as_dict(),
+              "counts": {}, "results": {}, "timings": [], "metrics": {}, "content": None,
+              "error": None}
+    timer = StageTimer()
+    doc = None
+    try:
+        with timer.stage("open"):
+            doc = open_detached(path)
+        before = None
+        if profile.profile_content:
+            with timer.stage("profile before"):
+                before = profile_model(doc)
+                before.file_bytes = os.path.getsize(path)  # the opened file, not the copy
+        with timer.stage("plan"):
+            plan = build_plan(doc, profile.keep_rules())
+        report["counts"] = plan.counts()
+        report["results"] = execute(doc, plan, timer, steps=profile.steps(),
+                                    purge=profile.purge, refresh_health=profile.refresh_health)
+        with timer.stage("metrics"):
+            report["metrics"] = healthmetrics.metrics(doc)
+        with timer.stage("save"):
+            save_copy(doc, out_path)
+        report["saved_as"] = out_path
+        if before is not None:
+            with timer.stage("profile after"):
+                after = profile_model(doc)  # saved: sizes the share copy on disk
+            report["content"] = {"before": before.as_dict(), "after": after.as_dict(),
+                                 "attribution": attribution(before, after)}
+    except Exception as ex:
+        report["error"] = str(ex)
+    finally:
+        if doc is not None:
+            try:
+                doc.Close(False)
+            except Exception as ex:
+                report["error"] = report["error"] or "close failed: {}".format(ex)
+        doc = None
+        release_memory()
+    report["timings"] = [[n, round(s, 2)] for n, s in timer.rows()]
+    report["total_seconds"] = round(timer.total(), 2)
+    try:
+        with open(os.path.join(target, name + profile.save_suffix + ".json"), "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    except IOError as ex:
+        report["error"] = report["error"] or "report not written: {}".format(ex)
+    return report
+
+
+# ------------------------------------------------------------------- inputs ----
+profile_path = pick_profile()
+if not profile_path:
+    script.exit()
+try:
+    profile = load_profile(profile_path)
+except (IOError, ProfileError) as ex:
+    forms.alert("Could not read the share profile.\n\n{}".format(ex), title="Batch Share")
+    script.exit()
+
+models = forms.pick_file(file_ext="rvt", multi_file=True,
+                         init_dir=getattr(config, "model_folder", "") or "", title="Models to Share")
+if not models:
+    script.exit()
+config.model_folder = models[0].rsplit("\\", 1)[0]
+
+target = forms.pick_folder(title="Target Folder for the Share Copies")
+if not target:
+    script.exit()
+script.save_config()
+
+source_dirs = set(os.path.normcase(os.path.dirname(os.path.abspath(m))) for m in models)
+if os.path.normcase(os.path.abspath(target)) in source_dirs:
+    forms.alert("The target folder must not be a source model folder.", title="Batch Share")
+    script.exit()
+
+open_titles = set(d.Title for d in app.Documents)
+already_open = [m for m in models if os.path.splitext(os.path.basename(m))[0] in open_titles]
+if already_open:
+    forms.alert("Close these models first:\n\n{}".format(
+        "\n".join(os.path.basename(m) for m in already_open)), title="Batch Share")
+    script.exit()
+
+if not forms.alert(
+    "Prepare {} model(s) for share with profile '{}'?\n\n"
+    "Each model is opened detached, stripped (sheets, views, links, point clouds, "
+    "groups, purge as the profile says) and saved to:\n{}\n\n"
+    "The source models are not changed.".format(len(models), profile.name, target),
+    title="Batch Share", yes=True, no=True, warn_icon=True,
+):
+    script.exit()
+
+# -------------------------------------------------------------------- run ----
+start = time.time()
+rows = []
+for index, model in enumerate(models, 1):
+    output.update_progress(index - 1, len(models))
+    output.print_md("Processing **{}** ({}/{})".format(os.path.basename(model), index, len(models)))
+    report = process(model, profile, target)
+    if report["content"]:
+        output.print_table(report["content"]["attribution"], columns=ATTRIBUTION_COLUMNS,
+                           title="Content removed - {}".format(os.path.basename(model)))
+    results = report["results"]
+    rows.append([
+        os.path.basename(model),
+        "FAILED: {}".format(report["error"]) if report["error"] else "saved",
+        results.get("sheets", 0),
+        results.get("views", 0),
+        results.get("link_types", 0) + results.get("link_insts", 0),
+        results.get("purged", 0),
+        "{:.1f}".format(report["total_seconds"]),
+    ])
+output.update_progress(len(models), len(models))
+
+output.print_table(
+    rows,
+    columns=["Model", "Status", "Sheets", "Views", "Links", "Purged", "Seconds"],
+    title="Batch Share - profile '{}' ({:.1f} s)".format(profile.name, time.time() - start),
+)
+output.print_md("Share copies and JSON reports are in `{}`.".format(target))
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""Model content profile: what a model is made of, before and after Prepare for Share.
+
+    before = profile_model(doc)
+    ... execute(doc, plan, timer) ...
+    after = profile_model(doc)
+    rows = attribution(before, after)    # one row per bucket, for print_table
+
+ONE streaming pass over every element (types and instances) counts:
+  - elements per category,
+  - instances and types per family,
+  - view-specific (detail) elements per owner view,
+  - the buckets below, each tied to the Prepare for Share stage that
+    removes it, so the before/after table shows whether view deletion,
+    link removal or the purge gave the savings.
+Linked RVT/CAD files and raster images are sized on disk (each path once),
+and so is the model itself when it has been saved.
+
+Revit does not report bytes per element, so element counts stand in for
+size inside the file; the disk sizes are measured.
+
+IronPython 2.7 - no f-strings, use .format(); except Exception.
+"""
+import os
+import time
+
+from Autodesk.Revit.DB import (
+    BuiltInCategory,
+    ElementId,
+    ElementIsElementTypeFilter,
+    ElementType,
+    Family,
+    FamilyInstance,
+    FamilySymbol,
+    FillPatternElement,
+    FilteredElementCollector,
+    Group,
+    GroupType,
+    ImportInstance,
+    LinePatternElement,
+    LogicalOrFilter,
+    Material,
+    ModelPathUtils,
+    ParameterFilterElement,
+    PointCloudInstance,
+    PointCloudType,
+    RevitLinkInstance,
+    RevitLinkType,
+    View,
+)
+
+from shareplan import gname
+
+
+# (bucket, stage of Prepare for Share that removes it), in table order
+BUCKETS = [
+    ("Views and sheets", "views / sheets"),
+    ("Detail elements", "views / sheets"),
+    ("RVT links", "links"),
+    ("CAD imports and links", "views / purge"),
+    ("Raster images", "views / purge"),
+    ("Point clouds", "point clouds"),
+    ("Groups", "groups"),
+    ("Families and types", "purge"),
+    ("Materials and patterns", "purge"),
+    ("Model elements", "-"),
+    ("Other", "-"),
+]
+BUCKET_NAMES = [b for b, _ in BUCKETS]
+
+_RASTER_CAT = int(BuiltInCategory.OST_RasterImages)
+_STYLE_CLASSES = (Material, FillPatternElement, LinePatternElement, ParameterFilterElement)
+_INVALID = ElementId.InvalidElementId
+
+
+def _file_bytes(path):
+    try:
+        return os.path.getsize(path) if path and os.path.isfile(path) else None
+    except Exception:
+        return None
+
+
+def _external_path(el):
+    """Absolute path of a linked file or image type, or None."""
+    try:
+        ref = el.GetExternalFileReference()
+        if ref is not None:
+            return ModelPathUtils.ConvertModelPathToUserVisiblePath(ref.GetAbsolutePath())
+    except Exception:
+        pass
+    try:
+        return el.Path  # ImageType
+    except Exception:
+        return None
+
+
+class ModelProfile(object):
+    def __init__(self):
+        self.categories = {}   # category name -> elements
+        self.families = {}     # family name -> [instances, types]
+        self.view_detail = {}  # view name -> view-specific elements
+        self.buckets = dict((b, 0) for b in BUCKET_NAMES)
+        self.external = {}     # path -> [bucket, name, bytes or None]
+        self.file_bytes = None
+        self.elements = 0
+        self.seconds = 0.0
+
+    def external_bytes(self, bucket):
+        return sum(e[2] or 0 for e in self.external.values() if e[0] == bucket)
+
+    def as_dict(self):
+        return {
+            "elements": self.elements,
+            "seconds": round(self.seconds, 2),
+            "file_bytes": self.file_bytes,
+            "buckets": self.buckets,
+            "categories": self.categories,
+            "families": self.families,
+            "view_detail": self.view_detail,
+            "external": [[path] + e for path, e in sorted(self.external.items())],
+        }
+
+
+def _bucket(el, cat_id):
+    if isinstance(el, View):
+        return "Views and sheets"
+    if isinstance(el, (RevitLinkInstance, RevitLinkType)):
+        return "RVT links"
+    if cat_id == _RASTER_CAT:
+        return "Raster images"
+    if isinstance(el, ImportInstance) or type(el).__name__ == "CADLinkType":
+        return "CAD imports and links"
+    if isinstance(el, (PointCloudInstance, PointCloudType)):
+        return "Point clouds"
+    if isinstance(el, (Group, GroupType)):
+        return "Groups"
+    if el.OwnerViewId != _INVALID:
+        return "Detail elements"
+    if isinstance(el, (Family, ElementType)):
+        return "Families and types"
+    if isinstance(el, _STYLE_CLASSES):
+        return "Materials and patterns"
+    if cat_id is not None:
+        return "Model elements"
+    return "Other"
+
+
+def profile_model(doc):
+    """Profile every element of `doc` in one collector pass."""
+    start = time.time()
+    prof = ModelProfile()
+    per_view = {}  # owner view id -> count (named at the end)
+    everything = LogicalOrFilter(ElementIsElementTypeFilter(False), ElementIsElementTypeFilter(True))
+    for el in FilteredElementCollector(doc).WherePasses(everything):
+        prof.elements += 1
+        cat = el.Category
+        cat_id = cat.Id.IntegerValue if cat is not None else None
+        if cat is not None:
+            prof.categories[cat.Name] = prof.categories.get(cat.Name, 0) + 1
+
+        bucket = _bucket(el, cat_id)
+        prof.buckets[bucket] += 1
+        if bucket == "Detail elements":
+            owner = el.OwnerViewId.IntegerValue
+            per_view[owner] = per_view.get(owner, 0) + 1
+
+        if isinstance(el, FamilyInstance):
+            try:
+                prof.families.setdefault(el.Symbol.FamilyName, [0, 0])[0] += 1
+            except Exception:
+                pass
+        elif isinstance(el, FamilySymbol):
+            prof.families.setdefault(el.FamilyName, [0, 0])[1] += 1
+
+        if bucket in ("RVT links", "CAD imports and links", "Raster images") \
+                and isinstance(el, ElementType):
+            path = _external_path(el)
+            if path and path not in prof.external:
+                prof.external[path] = [bucket, gname(el), _file_bytes(path)]
+
+    for owner, count in per_view.items():
+        view = doc.GetElement(ElementId(owner))
+        name = gname(view) if view is not None else "<view {}>".format(owner)
+        prof.view_detail[name] = prof.view_detail.get(name, 0) + count
+    prof.file_bytes = _file_bytes(doc.PathName)
+    prof.seconds = time.time() - start
+    return prof
+
+
+# ------------------------------------------------------------------ tables ----
+def _mb(value):
+    return "{:.1f}".format(value / 1048576.0) if value is not None else "-"
+
+
+def attribution(before, after):
+    """[bucket, stage, before, after, removed, % of removed, disk MB before, disk MB after]."""
+    removed_total = sum(max(before.buckets[b] - after.buckets[b], 0) for b in BUCKET_NAMES)
+    rows = []
+    for bucket, stage in BUCKETS:
+        removed = before.buckets[bucket] - after.buckets[bucket]
+        disk = bucket in ("RVT links", "CAD imports and links", "Raster images")
+        rows.append([
+            bucket, stage, before.buckets[bucket], after.buckets[bucket], removed,
+            "{:.0f}%".format(100.0 * max(removed, 0) / removed_total) if removed_total else "-",
+            _mb(before.external_bytes(bucket)) if disk else "",
+            _mb(after.external_bytes(bucket)) if disk else "",
+        ])
+    rows.append(["Model file", "", before.elements, after.elements,
+                 before.elements - after.elements, "", _mb(before.file_bytes), _mb(after.file_bytes)])
+    return rows
+
+
+ATTRIBUTION_COLUMNS = ["Content", "Removed by", "Before", "After", "Removed", "Share",
+                       "Disk MB before", "Disk MB after"]
+
+
+def top_changes(before_map, after_map, limit=15):
+    """[name, before, after, removed] for the names that lost the most elements.
+
+    Values are counts, or [instances, types] lists (families: both summed).
+    """
+    def total(value):
+        return sum(value) if isinstance(value, list) else value or 0
+
+    rows = []
+    for name, value in before_map.items():
+        b, a = total(value), total(after_map.get(name))
+        if b != a:
+            rows.append([name, b, a, b - a])
+    rows.sort(key=lambda r: (-r[3], r[0]))
+    return rows[:limit]
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""Delete plan and measured purge for Prepare for Share.
+
+    timer = StageTimer()
+    with timer.stage("plan"):
+        plan = build_plan(doc, KeepRules(...))
+    res = execute(doc, plan, timer, steps=profile.steps())
+    timer.rows()   # [(stage, seconds)] for the summary
+
+The plan comes from ONE collector pass classified by element class:
+sheets, views, viewports and schedule instances (which view sits on which
+sheet), links, point clouds and group types. Deletion goes in batches:
+a batch the API refuses is split in half until the refusing ids are
+isolated (each attempt in a sub-transaction), instead of retrying every
+id one by one. execute() is shared by the Prepare for Share button and the
+batch share runner.
+
+IronPython 2.7 - no f-strings, use .format(); except Exception.
+"""
+import time
+
+import clr
+clr.AddReference("System.Core")  # HashSet<T> lives here, not preloaded by IronPython
+from System.Collections.Generic import HashSet, List
+from Autodesk.Revit.DB import (
+    ElementId,
+    Element,
+    ElementMulticlassFilter,
+    FilteredElementCollector,
+    GroupType,
+    Grid,
+    Level,
+    PointCloudInstance,
+    RevitLinkInstance,
+    RevitLinkType,
+    ScheduleSheetInstance,
+    SubTransaction,
+    Transaction,
+    TransactionGroup,
+    View,
+    ViewSheet,
+    Viewport,
+)
+from System import Type
+
+import healthmetrics
+
+
+SKIP_VIEWTYPES = ("ProjectBrowser", "SystemBrowser", "Internal", "Undefined")
+
+
+def gname(el):
+    try:
+        return Element.Name.GetValue(el)
+    except Exception:
+        try:
+            return el.Name
+        except Exception:
+            return "<unnamed>"
+
+
+# ------------------------------------------------------------------ timing ----
+class StageTimer(object):
+    def __init__(self):
+        self.stages = []
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def rows(self):
+        return list(self.stages)
+
+    def total(self):
+        return sum(s for _, s in self.stages)
+
+    def text(self):
+        return "\n".join("  {:<22} {:>7.2f} s".format(n, s) for n, s in self.stages)
+
+
+class _Stage(object):
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.stages.append((self.name, time.time() - self.start))
+        return False
+
+
+# -------------------------------------------------------------------- plan ----
+class KeepRules(object):
+    def __init__(self, sheet_numbers, view_names, coord_template_name):
+        self.sheet_numbers = set(sheet_numbers)
+        self.view_names = set(view_names)
+        self.coord_template_name = coord_template_name
+
+
+class SharePlan(object):
+    def __init__(self):
+        self.coord_tpl = None
+        self.keep_sheets = []
+        self.del_sheets = []
+        self.del_views = []
+        self.link_insts = []
+        self.link_types = []
+        self.pc_insts = []
+        self.del_groups = []
+
+    def counts(self):
+        return {
+            "sheets": len(self.del_sheets),
+            "views": len(self.del_views),
+            "link_insts": len(self.link_insts),
+            "link_types": len(self.link_types),
+            "point_clouds": len(self.pc_insts),
+            "groups": len(self.del_groups),
+        }
+
+
+PLAN_CLASSES = [View, Viewport, ScheduleSheetInstance, RevitLinkInstance, RevitLinkType,
+                PointCloudInstance, GroupType]
+
+
+def build_plan(doc, keep):
+    """Classify everything the clean-up touches in one collector pass."""
+    plan = SharePlan()
+    views, sheets = [], []
+    on_sheet = {}  # sheet id -> [view ids placed on it]
+    classes = List[Type]([clr.GetClrType(c) for c in PLAN_CLASSES])
+    for el in FilteredElementCollector(doc).WherePasses(ElementMulticlassFilter(classes)):
+        if isinstance(el, ViewSheet):
+            sheets.append(el)
+        elif isinstance(el, View):
+            if el.IsTemplate:
+                if plan.coord_tpl is None and gname(el) == keep.coord_template_name:
+                    plan.coord_tpl = el
+            else:
+                views.append(el)
+        elif isinstance(el, Viewport):
+            on_sheet.setdefault(el.SheetId.IntegerValue, []).append(el.ViewId.IntegerValue)
+        elif isinstance(el, ScheduleSheetInstance):
+            on_sheet.setdefault(el.OwnerViewId.IntegerValue, []).append(el.ScheduleId.IntegerValue)
+        elif isinstance(el, RevitLinkInstance):
+            plan.link_insts.append(el)
+        elif isinstance(el, RevitLinkType):
+            plan.link_types.append(el)
+        elif isinstance(el, PointCloudInstance):
+            plan.pc_insts.append(el)
+        elif isinstance(el, GroupType):
+            try:
+                if el.Groups.Size == 0:
+                    plan.del_groups.append(el)
+            except Exception:
+                pass
+
+    # Sheets: keep only the named ones; views placed on them are protected.
+    placed_on_keep = set()
+    for s in sheets:
+        if s.SheetNumber in keep.sheet_numbers:
+            plan.keep_sheets.append(s)
+            placed_on_keep.update(on_sheet.get(s.Id.IntegerValue, ()))
+        else:
+            plan.del_sheets.append(s)
+
+    # Views to delete: every browsable view that is not a keeper.
+    coord_id = plan.coord_tpl.Id if plan.coord_tpl is not None else None
+    for v in views:
+        if v.ViewType.ToString() in SKIP_VIEWTYPES:
+            continue
+        if gname(v) in keep.view_names:
+            continue
+        if coord_id is not None and v.ViewTemplateId == coord_id:
+            continue
+        if v.Id.IntegerValue in placed_on_keep:
+            continue
+        plan.del_views.append(v)
+    return plan
+
+
+# ---------------------------------------------------------------- deletion ----
+def _try_delete(doc, ids):
+    """Delete ids in a sub-transaction; True if the API accepted the batch."""
+    st = SubTransaction(doc)
+    st.Start()
+    try:
+        doc.Delete(List[ElementId](ids))
+        st.Commit()
+        return True
+    except Exception:
+        st.RollBack()
+        return False
+
+
+def delete_ids(doc, ids):
+    """Delete ids, bisecting refused batches (call inside a transaction).
+
+    Returns (deleted, [refused ids]). Ids already removed as dependents of
+    an earlier deletion are skipped.
+    """
+    deleted, refused = 0, []
+    pending = [list(ids)]
+    while pending:
+        batch = [eid for eid in pending.pop() if doc.GetElement(eid) is not None]
+        if not batch:
+            continue
+        if _try_delete(doc, batch):
+            deleted += len(batch)
+        elif len(batch) == 1:
+            refused.append(batch[0])
+        else:
+            half = len(batch) // 2
+            pending.append(batch[half:])
+            pending.append(batch[:half])
+    return deleted, refused
+
+
+def delete_elements(doc, elems):
+    return delete_ids(doc, [e.Id for e in elems if e.IsValidObject])
+
+
+def purge_unused(doc, protect, max_rounds=15):
+    """Purge unused elements until stable (call inside a transaction).
+
+    `protect` is a set of integer ids never deleted; levels and grids are
+    kept too. Returns {"purged", "rounds", "refused", "error"}.
+    """
+    protect = set(protect)
+    result = {"purged": 0, "rounds": 0, "refused": 0, "error": None}
+    while result["rounds"] < max_rounds:
+        result["rounds"] += 1
+        try:
+            unused = doc.GetUnusedElements(HashSet[ElementId]())
+        except Exception as ex:
+            result["error"] = str(ex)
+            break
+        ids = []
+        for eid in unused:
+            if eid.IntegerValue in protect:
+                continue
+            el = doc.GetElement(eid)
+            if el is None or isinstance(el, (Level, Grid)):  # never drop a datum
+                continue
+            ids.append(eid)
+        if not ids:
+            break
+        deleted, refused = delete_ids(doc, ids)
+        result["purged"] += deleted
+        result["refused"] += len(refused)
+        protect.update(eid.IntegerValue for eid in refused)  # never retried
+        if not deleted:
+            break
+    return result
+
+
+# --------------------------------------------------------------- execution ----
+# (result key, timer label, plan attribute), in deletion order: sheets first
+# (removes viewports, not the views), link types before their instances.
+STAGES = [
+    ("sheets", "sheets", "del_sheets"),
+    ("views", "views", "del_views"),
+    ("link_types", "link types", "link_types"),
+    ("link_insts", "link instances", "link_insts"),
+    ("point_clouds", "point clouds", "pc_insts"),
+    ("groups", "groups", "del_groups"),
+]
+
+
+def execute(doc, plan, timer, steps=None, purge=True, refresh_health=True):
+    """Run the plan as ONE transaction group (one undo step); the file is not saved.
+
+    `steps` limits the delete stages (result keys of STAGES, all by default).
+    Returns {stage: deleted, stage_skipped: refused, purged, purge_rounds,
+    purge_refused, hc_status}. On failure the group is rolled back and the
+    exception re-raised.
+    """
+    res = {}
+    tg = TransactionGroup(doc, "Prepare Model for Share")
+    tg.Start()
+    try:
+        for name, label, attr in STAGES:
+            if steps is not None and name not in steps:
+                continue
+            with timer.stage(label):
+                t = Transaction(doc, "PrepShare: " + label); t.Start()
+                res[name], refused = delete_elements(doc, getattr(plan, attr))
+                t.Commit()
+            res[name + "_skipped"] = len(refused)
+
+        # purge unused - repeat until stable (cascades as families free materials etc.)
+        if purge:
+            protect = set()
+            if plan.coord_tpl is not None:
+                protect.add(plan.coord_tpl.Id.IntegerValue)
+            with timer.stage("purge unused"):
+                t = Transaction(doc, "PrepShare: purge unused"); t.Start()
+                result = purge_unused(doc, protect)
+                t.Commit()
+            res["purged"] = result["purged"]; res["purge_rounds"] = result["rounds"]
+            res["purge_refused"] = result["refused"]
+            if result["error"]:
+                res["purge_error"] = result["error"]
+
+        # refresh the Dashboard health gauges inside the group (still one undo step)
+        res["hc_status"] = "not run"
+        if refresh_health:
+            with timer.stage("health check"):
+                t = Transaction(doc, "PrepShare: health check"); t.Start()
+                try:
+                    updated, _ = healthmetrics.update_gauges(doc)
+                    t.Commit()
+                    res["hc_status"] = "refreshed ({} gauges)".format(updated)
+                except Exception as hcex:
+                    t.RollBack()
+                    res["hc_status"] = "skipped ({})".format(hcex)
+
+        tg.Assimilate()
+    except Exception:
+        try:
+            tg.RollBack()
+        except Exception:
+            pass
+        raise
+    return res
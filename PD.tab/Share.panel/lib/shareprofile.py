@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""Share profiles: the keep rules and steps of Prepare for Share, per project.
+
+A profile is a small YAML file in lib/profiles (or anywhere, for the batch
+runner):
+
+    name: PD coordination
+    coord_template: PD_354000-05_SetUp_(coordinates)_v1
+    keep_sheets:
+      - E-00001
+    keep_views: [Dashboard]
+    delete_links: true
+    purge: true
+    refresh_health: true
+    profile_content: true
+    save_suffix: _shared
+
+Only this subset of YAML is read (text, quoted text, booleans, inline and
+block lists, # comments), so no YAML package is needed under IronPython.
+
+IronPython 2.7 - no f-strings, use .format(); except Exception.
+"""
+import os
+
+from shareplan import KeepRules
+
+
+PROFILE_DIR = os.path.join(os.path.dirname(__file__), "profiles")
+
+DEFAULTS = {
+    "name": "",
+    "coord_template": "",
+    "keep_sheets": [],
+    "keep_views": [],
+    "delete_sheets": True,
+    "delete_views": True,
+    "delete_links": True,
+    "delete_point_clouds": True,
+    "delete_groups": True,
+    "purge": True,
+    "refresh_health": True,
+    "profile_content": True,
+    "save_suffix": "_shared",
+}
+
+BOOL_KEYS = [k for k, v in sorted(DEFAULTS.items()) if isinstance(v, bool)]
+TEXT_KEYS = [k for k, v in sorted(DEFAULTS.items()) if isinstance(v, str)]
+LIST_KEYS = [k for k, v in sorted(DEFAULTS.items()) if isinstance(v, list)]
+
+
+class ProfileError(Exception):
+    pass
+
+
+# -------------------------------------------------------------- yaml subset ----
+def _scalar(text):
+    text = text.strip()
+    if text[:1] in ("\"", "'"):
+        end = text.find(text[0], 1)
+        if end < 0:
+            raise ProfileError("unbalanced quote in {}".format(text))
+        return text[1:end]
+    text = text.split(" #", 1)[0].rstrip()
+    low = text.lower()
+    if low in ("true", "yes", "on"):
+        return True
+    if low in ("false", "no", "off"):
+        return False
+    if low in ("", "null", "~"):
+        return None
+    return text  # numbers stay text: sheet numbers such as 001 keep their zeros
+
+
+def _inline_list(text):
+    r"""Items of an inline [a, b] list; commas inside quotes stay in the item.
+
+    >>> _inline_list("['A-1, Site', B-2, \"C, 3\"]")
+    ['A-1, Site', 'B-2', 'C, 3']
+    >>> _inline_list("[]")
+    []
+    >>> _inline_list("['A-1, Site]")
+    Traceback (most recent call last):
+    ProfileError: unbalanced quote in 'A-1, Site
+    """
+    inner = text.strip()[1:-1].strip()
+    if not inner:
+        return []
+    parts, start, quote = [], 0, None
+    for pos, char in enumerate(inner):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in ("\"", "'") and not inner[start:pos].strip():
+            quote = char  # only a quote opening an item starts quoted text
+        elif char == ",":
+            parts.append(inner[start:pos])
+            start = pos + 1
+    parts.append(inner[start:])
+    return [_scalar(part) for part in parts]
+
+
+def _line_value(number, parse, text):
+    try:
+        return parse(text)
+    except ProfileError as ex:
+        raise ProfileError("line {}: {}".format(number, ex))
+
+
+def parse_yaml(text):
+    r"""Mapping of `key: value` lines; values may be [inline] or block `- item` lists.
+
+    >>> parse_yaml("keep_sheets: ['A-1, Site', A-2]\npurge: no")["keep_sheets"]
+    ['A-1, Site', 'A-2']
+    """
+    data = {}
+    current = None
+    for number, raw in enumerate(text.splitlines(), 1):
+        line = raw.rstrip()
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- "):
+            if current is None or not isinstance(data.get(current), list):
+                raise ProfileError("line {}: list item without a key".format(number))
+            data[current].append(_line_value(number, _scalar, stripped[2:]))
+            continue
+        if ":" not in stripped or line[0] in " \t":
+            raise ProfileError("line {}: expected 'key: value'".format(number))
+        key, value = stripped.split(":", 1)
+        key, value = key.strip(), value.strip()
+        current = key
+        if not value or value.startswith("#"):
+            data[key] = []  # a block list follows (or stays empty)
+        elif value.startswith("["):
+            if "]" not in value:
+                raise ProfileError("line {}: missing ']'".format(number))
+            data[key] = _line_value(number, _inline_list, value[:value.rindex("]") + 1])
+        else:
+            data[key] = _line_value(number, _scalar, value)
+    return data
+
+
+# ------------------------------------------------------------------ profile ----
+class Profile(object):
+    def __init__(self, data, path=None):
+        unknown = sorted(set(data) - set(DEFAULTS))
+        if unknown:
+            raise ProfileError("unknown setting(s): {}".format(", ".join(unknown)))
+        self.path = path
+        values = dict(DEFAULTS)
+        values.update(data)
+        for key in BOOL_KEYS:
+            if not isinstance(values[key], bool):
+                raise ProfileError("{}: expected true or false, got {!r}".format(key, values[key]))
+        for key in TEXT_KEYS:
+            value = values[key]
+            if value is None or value == []:
+                values[key] = ""  # `key:` with nothing after it
+            elif not isinstance(value, basestring):  # noqa: F821
+                raise ProfileError("{}: expected text, got {!r} (quote it)".format(key, value))
+        for key in LIST_KEYS:
+            value = values[key]
+            items = [v for v in (value if isinstance(value, list) else [value]) if v is not None]
+            for item in items:
+                if not isinstance(item, basestring):  # noqa: F821
+                    raise ProfileError("{}: expected text, got {!r} (quote it)".format(key, item))
+            values[key] = items
+        self.__dict__.update(values)
+        if not self.name:
+            self.name = os.path.splitext(os.path.basename(path or "profile"))[0]
+
+    def keep_rules(self):
+        return KeepRules(self.keep_sheets, self.keep_views, self.coord_template or "")
+
+    def steps(self):
+        """Delete stages of shareplan.execute() this profile runs."""
+        wanted = []
+        if self.delete_sheets:
+            wanted.append("sheets")
+        if self.delete_views:
+            wanted.append("views")
+        if self.delete_links:
+            wanted.extend(["link_types", "link_insts"])
+        if self.delete_point_clouds:
+            wanted.append("point_clouds")
+        if self.delete_groups:
+            wanted.append("groups")
+        return wanted
+
+    def as_dict(self):
+        return dict((key, getattr(self, key)) for key in DEFAULTS)
+
+
+def load_profile(path):
+    with open(path, "r") as f:
+        text = f.read()
+    try:
+        return Profile(parse_yaml(text), path)
+    except ProfileError as ex:
+        raise ProfileError("{}: {}".format(os.path.basename(path), ex))
+
+
+def list_profiles(folder=PROFILE_DIR):
+    """Profile paths in `folder`, sorted by file name."""
+    if not os.path.isdir(folder):
+        return []
+    return sorted(
+        os.path.join(folder, f) for f in os.listdir(folder)
+        if f.lower().endswith((".yaml", ".yml"))
+    )
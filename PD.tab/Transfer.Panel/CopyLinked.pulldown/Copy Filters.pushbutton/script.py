@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 __title__   = "Copy: Copy Filters"
-__doc__     = """Version = 1.1
-Date    = 12.07.2026
+__doc__     = """Version = 1.2
+Date    = 19.10.2026
 ________________________________________________________________
 Description:
 
@@ -12,12 +12,21 @@ If a target view has a view template applied that controls
 V/G Overrides Filters, the filters are applied to that view
 template instead (updating every view that uses it) - filters
 added to the view itself would be ignored.
+
+When the same filter comes from several sources with different
+visibility / overrides, a conflict policy decides the result:
+  KEEP      - first source wins; filters already on a target are untouched
+  OVERWRITE - last source wins; filters already on a target are rewritten
+  MERGE     - per override property, the first source that sets it wins;
+              filters already on a target keep what no source sets
 ________________________________________________________________
 How-To:
 
 1. Select source views/templates to copy filters from.
 2. Select target views/templates to copy filters to.
-3. Review the report - it lists any redirects to view templates.
+3. Pick the conflict policy.
+4. Review the report - a target x filter matrix, conflicts and any
+   redirects to view templates.
 
 ________________________________________________________________
 Get Free:
@@ -31,12 +40,19 @@ from Autodesk.Revit.DB import (
     Element,
     ElementId,
     BuiltInParameter,
+    OverrideGraphicSettings,
 )
-from pyrevit import revit, forms
+from pyrevit import revit, forms, script
+
+from filtermatrix import OVERRIDE_PROPS
 
 # Get the current document
 doc = revit.doc
+out = script.get_output()
 
+KEEP = "KEEP: first source wins, existing target filters untouched"
+OVERWRITE = "OVERWRITE: last source wins, existing target filters rewritten"
+MERGE = "MERGE: combine overrides property by property"
 
 # Select views and view templates from the current model
 def select_views(prompt_title="Select Views"):
@@ -96,12 +112,82 @@ def resolve_target(view):
     return view, None
 
 
+# Hashable value of one override property (colors / ids are .NET objects)
+def _sig_value(v):
+    if hasattr(v, "Red") and hasattr(v, "IsValid"):
+        return (v.Red, v.Green, v.Blue) if v.IsValid else None
+    if isinstance(v, ElementId):
+        return v.IntegerValue
+    return str(v)
+
+
+# Signature of a filter state: visibility + every readable override property
+def override_signature(visible, overrides):
+    sig = [bool(visible)]
+    for getter, _, _ in OVERRIDE_PROPS:
+        try:
+            sig.append(_sig_value(getattr(overrides, getter)))
+        except Exception:
+            sig.append(None)
+    return tuple(sig)
+
+
+# Fill every property that `base` leaves unset from `extra` (MERGE policy)
+def merge_overrides(base, extra):
+    merged = OverrideGraphicSettings(base)
+    for getter, setter, is_set in OVERRIDE_PROPS:
+        try:
+            if is_set(getattr(merged, getter)):
+                continue
+            value = getattr(extra, getter)
+            if is_set(value):
+                getattr(merged, setter)(value)
+        except Exception:
+            pass
+    return merged
+
+
+# Read visibility + overrides of every filter on every source once.
+# Returns {filter id int: [(source name, filter id, visible, overrides, signature), ...]}
+# in source selection order.
+def read_source_states(source_views):
+    states = {}
+    for source_view in source_views:
+        try:
+            filter_ids = list(source_view.GetFilters())
+        except Exception:
+            continue
+        for filter_id in filter_ids:
+            visible = source_view.GetFilterVisibility(filter_id)
+            overrides = source_view.GetFilterOverrides(filter_id)
+            states.setdefault(filter_id.IntegerValue, []).append(
+                (source_view.Name, filter_id, visible, overrides, override_signature(visible, overrides))
+            )
+    return states
+
+
+# Collapse the source states of one filter according to the policy.
+# Returns (visible, overrides, conflicting).
+def resolve_state(entries, policy):
+    conflicting = len(set(e[4] for e in entries)) > 1
+    if not conflicting or policy == KEEP:
+        first = entries[0]
+        return first[2], first[3], conflicting
+    if policy == OVERWRITE:
+        last = entries[-1]
+        return last[2], last[3], conflicting
+    overrides = entries[0][3]
+    for entry in entries[1:]:
+        overrides = merge_overrides(overrides, entry[3])
+    return any(e[2] for e in entries), overrides, conflicting
+
+
 # Copy filters from source views to target views
-def transfer_filters(source_views, target_views):
+def transfer_filters(source_views, target_views, policy=KEEP):
     skipped_filters = []  # Track skipped filters
-    copied_filters = []  # Track successfully copied filters
     redirect_notes = []  # Track view -> template redirects
     failed_targets = []  # Track targets that do not accept filters
+    matrix = {}  # target name -> {filter id int: mark}
 
     # Resolve real targets first, deduplicated by element id so a template
     # shared by several selected views is only processed once
@@ -116,62 +202,92 @@ def transfer_filters(source_views, target_views):
         seen_ids.add(target.Id.IntegerValue)
         resolved.append(target)
 
+    # Source states are read once, then collapsed once per filter
+    source_ids = set(v.Id.IntegerValue for v in source_views)
+    states = read_source_states(source_views)
+    plan = {}
+    conflicts = []
+    for fid, entries in states.items():
+        plan[fid] = resolve_state(entries, policy)
+        if plan[fid][2]:
+            conflicts.append((fid, [e[0] for e in entries]))
+
+    # Filter names resolved once
+    names = {}
+    for fid, entries in states.items():
+        try:
+            names[fid] = Element.Name.GetValue(doc.GetElement(entries[0][1]))
+        except Exception:
+            names[fid] = str(fid)
+
     with Transaction(doc, "Transfer View Filters") as trans:
         trans.Start()
 
         for target_view in resolved:
-            for source_view in source_views:
-                if source_view.Id.IntegerValue == target_view.Id.IntegerValue:
+            target_name = target_view.Name
+            row = matrix.setdefault(target_name, {})
+            try:
+                existing = set(f.IntegerValue for f in target_view.GetFilters())
+            except Exception:
+                # Target does not accept filters at all (e.g. schedules)
+                failed_targets.append(target_name)
+                continue
+            is_source = target_view.Id.IntegerValue in source_ids
+
+            for fid, (visible, overrides, _) in plan.items():
+                filter_id = states[fid][0][1]
+                present = fid in existing
+                if present and (policy == KEEP or is_source):
+                    row[fid] = "="
                     continue
-                for filter_id in source_view.GetFilters():
-                    # Add the filter to the target if not already present
-                    try:
-                        if filter_id not in target_view.GetFilters():
-                            target_view.AddFilter(filter_id)
-                            target_view.SetFilterVisibility(
-                                filter_id, source_view.GetFilterVisibility(filter_id)
-                            )
-
-                            # Copy override settings
-                            override_settings = source_view.GetFilterOverrides(filter_id)
-                            try:
-                                target_view.SetFilterOverrides(filter_id, override_settings)
-                            except Exception:
-                                # If override fails, skip this filter
-                                skipped_filters.append(Element.Name.GetValue(doc.GetElement(filter_id)))
-                                continue
-
-                            copied_filters.append(Element.Name.GetValue(doc.GetElement(filter_id)))
-                    except Exception:
-                        # Target does not accept filters at all (e.g. schedules)
-                        try:
-                            failed_name = target_view.Name
-                        except Exception:
-                            failed_name = str(target_view.Id)
-                        if failed_name not in failed_targets:
-                            failed_targets.append(failed_name)
-                        break
+                try:
+                    if present and policy == MERGE:
+                        overrides = merge_overrides(overrides, target_view.GetFilterOverrides(filter_id))
+                    if not present:
+                        target_view.AddFilter(filter_id)
+                        existing.add(fid)
+                    target_view.SetFilterVisibility(filter_id, visible)
+                    target_view.SetFilterOverrides(filter_id, overrides)
+                    row[fid] = "+" if not present else ("M" if policy == MERGE else "~")
+                except Exception:
+                    skipped_filters.append(names[fid])
+                    row[fid] = "!"
 
         trans.Commit()
 
-    # Output results
+    report(matrix, names, conflicts, redirect_notes, skipped_filters, failed_targets, policy)
+
+
+# Target x filter summary matrix plus notes
+def report(matrix, names, conflicts, redirect_notes, skipped_filters, failed_targets, policy):
+    fids = sorted(names.keys(), key=lambda f: names[f])
+    out.print_md("### Filter transfer ({})".format(policy.split(":")[0]))
+    out.print_md("`+` added · `~` overwritten · `M` merged · `=` already present · `!` failed")
+    rows = []
+    for target_name in sorted(matrix.keys()):
+        row = matrix[target_name]
+        rows.append([target_name] + [row.get(fid, "") for fid in fids])
+    if rows:
+        out.print_table(rows, columns=["Target"] + [names[f] for f in fids])
+
+    added = sum(1 for r in matrix.values() for m in r.values() if m in ("+", "~", "M"))
+    out.print_md("* Filter assignments written: **{}** across **{}** targets".format(added, len(matrix)))
+    if conflicts:
+        out.print_md("\n**Conflicting sources (resolved by {}):**".format(policy.split(":")[0]))
+        for fid, sources in conflicts:
+            out.print_md("- {} - {}".format(names[fid], ", ".join(sources)))
     if redirect_notes:
-        print("View template redirects:")
+        out.print_md("\n**View template redirects:**")
         for note in redirect_notes:
-            print("- {}".format(note))
-        print("")
-    if copied_filters:
-        print("The following filters were successfully copied:")
-        for filter_name in set(copied_filters):
-            print("- {}".format(filter_name))
+            out.print_md("- {}".format(note))
     if skipped_filters:
-        print("The following filters were skipped due to incompatibility:")
-        for filter_name in set(skipped_filters):
-            print("- {}".format(filter_name))
+        out.print_md("\n**Skipped due to incompatibility:**")
+        for filter_name in sorted(set(skipped_filters)):
+            out.print_md("- {}".format(filter_name))
     if failed_targets:
-        print("The following targets do not accept filters and were skipped:")
+        out.print_md("\n**Targets that do not accept filters (skipped):**")
         for target_name in failed_targets:
-            print("- {}".format(target_name))
+            out.print_md("- {}".format(target_name))
     print("Filter transfer completed.")
 
 
@@ -189,8 +305,14 @@ def transfer_filters_from_views():
         forms.alert("No target views selected. Exiting.")
         return
 
+    policy = forms.SelectFromList.show(
+        [KEEP, OVERWRITE, MERGE], multiselect=False, title="Conflict Policy", button_name="Transfer"
+    )
+    if not policy:
+        return
+
     # Transfer filters
-    transfer_filters(source_views, target_views)
+    transfer_filters(source_views, target_views, policy)
 
 
 # Execute the function
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 __title__   = "Copy: Cable Trays"
-__doc__     = """Version = 1.0
-Date    = 20.12.2025
+__doc__     = """Version = 1.1
+Date    = 19.10.2026
 ________________________________________________________________
 Description:
 
@@ -9,6 +9,11 @@ Copy Cable Trays and Cable Tray Fittings from a selected Revit Link into this mo
   preserving coordinates via the link transform. Optionally remap each source type to a
   host type after copy.
 
+Every copied element is stamped with its source UniqueId. Run again in SYNC mode
+  against a new link revision to create / move / retype / delete only what changed
+  (shared stamp with "Copy: Trays by Level", lib/linksync.py). COPY skips source
+  elements already copied from the link; SYNC removes duplicate copies.
+
 Relative Path:
 ...\
 ________________________________________________________________
@@ -28,11 +33,13 @@ clr.AddReference('System')
 from Autodesk.Revit.DB import (
     FilteredElementCollector, BuiltInCategory, RevitLinkInstance, ElementId,
     Transaction, ElementTransformUtils, CopyPasteOptions,
-    IDuplicateTypeNamesHandler, BuiltInParameter, StorageType, Category
+    IDuplicateTypeNamesHandler, BuiltInParameter, StorageType, Category, Line
 )
 from System.Collections.Generic import List
 from pyrevit import revit, forms, script
 
+from linksync import get_or_create_sync_schema, stamp, collect_stamped, geom_hash
+
 # ------------------------------------------------------------------------------
 # Context
 # ------------------------------------------------------------------------------
@@ -217,6 +224,66 @@ def build_type_label(eltype, is_fitting, sample_elem=None):
         "-" if w is None else w, "-" if h is None else h, idv)
     return label, part
 
+# ------------------------------------------------------------------------------
+# Sync stamp (schema + geometry hash shared with CopyTrayByLevel, lib/linksync.py)
+# ------------------------------------------------------------------------------
+def loc_points(el):
+    loc = el.Location
+    crv = getattr(loc, "Curve", None)
+    if crv is not None:
+        return [crv.GetEndPoint(0), crv.GetEndPoint(1)]
+    pt = getattr(loc, "Point", None)
+    return [pt] if pt is not None else []
+
+def src_geom(el):
+    """Shared geom_hash: straights by end points, fittings by point + connector origins."""
+    pts = loc_points(el)
+    if len(pts) == 1:
+        pts += [c.Origin for c in get_connectors(el)]
+    w, h = get_w_h_ft(el)
+    return geom_hash([(p.X, p.Y, p.Z) for p in pts], w, h)
+
+def source_type_uid(srcdoc, el):
+    t = srcdoc.GetElement(el.GetTypeId())
+    return t.UniqueId if t else ""
+
+def stamp_copied(srcdoc, new_ids, src_ids, schema, link_key):
+    """Stamp copies in CopyElements return order (one copy per source). Returns count.
+    If the counts differ nothing is paired by guesswork - the run reports it."""
+    news = [doc.GetElement(nid) for nid in new_ids]
+    news = [el for el in news if el is not None and el.Category is not None]
+    if len(news) != len(src_ids):
+        return 0
+    n = 0
+    for el, sid in zip(news, src_ids):
+        se = srcdoc.GetElement(sid)
+        if se is None or se.Category is None or se.Category.Id != el.Category.Id:
+            continue
+        stamp(el, schema, se.UniqueId, link_key, source_type_uid(srcdoc, se), src_geom(se))
+        n += 1
+    return n
+
+def diff_against_stamps(srcdoc, elems, stamped):
+    """Split source elements into new / geometry-changed / type-changed vs the last run.
+    Returns (new, moved, retyped, unchanged_count, gone_host_ids)."""
+    new, moved, retyped = [], [], []
+    unchanged = 0
+    seen = set()
+    for e in elems:
+        uid = e.UniqueId
+        seen.add(uid)
+        prev = stamped.get(uid)
+        if prev is None:
+            new.append(e)
+        elif prev[2] != src_geom(e):
+            moved.append(e)
+        elif prev[1] != source_type_uid(srcdoc, e):
+            retyped.append(e)
+        else:
+            unchanged += 1
+    gone = [prev[0].Id for uid, prev in stamped.items() if uid not in seen]
+    return new, moved, retyped, unchanged, gone
+
 # ------------------------------------------------------------------------------
 # Selection + grouping
 # ------------------------------------------------------------------------------
@@ -310,7 +377,7 @@ def ask_tray_mapping(linkdoc, tray_groups, host_tray_disp):
 # ------------------------------------------------------------------------------
 # Copy helpers
 # ------------------------------------------------------------------------------
-def copy_trays_with_mapping(srcdoc, dst_doc, transform, tray_groups, tray_map):
+def copy_trays_with_mapping(srcdoc, dst_doc, transform, tray_groups, tray_map, on_copied=None):
     copied = 0; retyped = 0; failed = []
     cpo = CopyPasteOptions()
     try: cpo.SetDuplicateTypeNamesHandler(_DupTypeRename())
@@ -334,12 +401,14 @@ def copy_trays_with_mapping(srcdoc, dst_doc, transform, tray_groups, tray_map):
                             if e: e.ChangeTypeId(host_type_id); retyped += 1
                         except Exception as rex:
                             failed.append(("Retype Tray '{}'".format(src_name), str(rex)))
+                if on_copied:
+                    on_copied(new_list, elem_ids)
                 t.Commit()
         except Exception as ex:
             failed.append(("Copy Tray '{}'".format(src_name), str(ex)))
     return copied, retyped, failed
 
-def copy_fittings_as_is(srcdoc, dst_doc, transform, fit_groups):
+def copy_fittings_as_is(srcdoc, dst_doc, transform, fit_groups, on_copied=None):
     """Copy ALL fitting elements as-is in a single pass (keeps connections best)."""
     all_ids = []
     for info in fit_groups.values():
@@ -360,6 +429,8 @@ def copy_fittings_as_is(srcdoc, dst_doc, transform, fit_groups):
             t.Start()
             new_ids = ElementTransformUtils.CopyElements(srcdoc, to_idlist(all_ids), dst_doc, transform, cpo)
             copied_ids = [nid for nid in new_ids]
+            if on_copied:
+                on_copied(copied_ids, all_ids)
             t.Commit()
     except Exception as ex:
         failed.append(("Copy Fittings", str(ex)))
@@ -485,12 +556,72 @@ link_inst = pick_link_instance()
 link_doc  = link_inst.GetLinkDocument()
 if link_doc is None:
     forms.alert("The selected link is unloaded or inaccessible.", exitscript=True)
+link_key = link_doc.Title
+xform    = link_inst.GetTransform()
+
+run = forms.SelectFromList.show(
+    ["COPY: copy all trays and fittings from the link",
+     "SYNC: update what was copied earlier from this link (changes only)"],
+    multiselect=False, title="Copy or Sync?", button_name="Continue"
+)
+if not run: script.exit()
+sync = run.startswith("SYNC")
 
 # Gather source elements
 trays, fits = collect_link_elems(link_doc)
 if not trays and not fits:
     forms.alert("No Cable Trays or Cable Tray Fittings found in the selected link.", exitscript=True)
 
+# SYNC: diff the link against the stamps of the last run
+known_tray_map = {}          # srcTypeUid -> host type id already used for it
+tray_moved, tray_retype = [], []
+gone_ids, replace_ids, dupe_ids = [], [], []
+unchanged = 0
+stamped_trays, dupes_t = collect_stamped(doc, link_key, CAT_TRAY)
+stamped_fits, dupes_f  = collect_stamped(doc, link_key, CAT_TRAY_FIT)
+if not sync:
+    # a second COPY would stamp a second copy of the same source: skip those
+    n_before = len(trays) + len(fits)
+    trays = [e for e in trays if e.UniqueId not in stamped_trays]
+    fits  = [e for e in fits if e.UniqueId not in stamped_fits]
+    if len(trays) + len(fits) < n_before and not forms.alert(
+            "{} element(s) were already copied from '{}' and are skipped.\n"
+            "Use SYNC to update them.\n\nCopy the remaining {}?".format(
+                n_before - len(trays) - len(fits), link_key, len(trays) + len(fits)),
+            title="Already Copied", yes=True, no=True):
+        script.exit()
+    if not trays and not fits:
+        script.exit()
+if sync:
+    if not stamped_trays and not stamped_fits:
+        forms.alert("Nothing copied from '{}' was found in this model.\nRun a COPY first.".format(link_key),
+                    exitscript=True)
+    for host_el, type_uid, _ in stamped_trays.values():
+        known_tray_map.setdefault(type_uid, host_el.GetTypeId())
+
+    trays, tray_moved, tray_retype, n_same_t, gone_t = diff_against_stamps(link_doc, trays, stamped_trays)
+    new_f, moved_f, retype_f, n_same_f, gone_f = diff_against_stamps(link_doc, fits, stamped_fits)
+    # a tray whose source type has no known host type is re-copied rather than retyped
+    for e in list(tray_retype):
+        if source_type_uid(link_doc, e) not in known_tray_map:
+            tray_retype.remove(e); trays.append(e)
+            replace_ids.append(stamped_trays[e.UniqueId][0].Id)
+    # fittings follow their connectors - any change means replace
+    fits = new_f + moved_f + retype_f
+    replace_ids += [stamped_fits[e.UniqueId][0].Id for e in moved_f + retype_f]
+    gone_ids = gone_t + gone_f
+    dupe_ids = [el.Id for el in dupes_t + dupes_f]
+    unchanged = n_same_t + n_same_f
+
+    if not forms.alert(
+            "SYNC against '{}':\n\n  new trays      {}\n  moved trays    {}\n  retyped trays  {}\n"
+            "  new/replaced fittings  {}\n  deleted (gone from link)  {}\n"
+            "  duplicate copies removed  {}\n  unchanged  {}\n\nApply?".format(
+                link_key, len(trays), len(tray_moved), len(tray_retype), len(fits), len(gone_ids),
+                len(dupe_ids), unchanged),
+            title="Sync Preview", yes=True, no=True):
+        script.exit()
+
 # Group by used types
 tray_groups = group_used_types(trays, link_doc)
 fit_groups  = group_used_types(fits,  link_doc)
@@ -498,8 +629,12 @@ fit_groups  = group_used_types(fits,  link_doc)
 # Host type choices (trays)
 host_tray_disp = collect_host_types(CAT_TRAY, is_fitting=False)
 
-# Tray mapping
-tray_map = ask_tray_mapping(link_doc, tray_groups, host_tray_disp)
+# Tray mapping (SYNC: only source types not seen on the last run)
+ask_groups = dict((k, v) for k, v in tray_groups.items() if k not in known_tray_map)
+tray_map = ask_tray_mapping(link_doc, ask_groups, host_tray_disp)
+for k in tray_groups:
+    if k in known_tray_map:
+        tray_map[k] = known_tray_map[k]
 
 # Fitting handling mode
 mode = forms.SelectFromList.show(
@@ -510,12 +645,59 @@ mode = forms.SelectFromList.show(
 if not mode: script.exit()
 mode_auto = mode.startswith("AUTO")
 
+# SYNC: in-place updates first (delete gone/replaced, move, retype) in one transaction
+sync_errors = []
+moved_n = retyped_n = deleted_n = deduped_n = 0
+if sync:
+    with Transaction(doc, "Sync Cable Trays (update)") as t:
+        t.Start()
+        schema = get_or_create_sync_schema()
+        if gone_ids or replace_ids or dupe_ids:
+            try:
+                doc.Delete(to_idlist(gone_ids + replace_ids + dupe_ids))
+                deleted_n = len(gone_ids)
+                deduped_n = len(dupe_ids)
+            except Exception as ex:
+                sync_errors.append(("Delete", str(ex)))
+        moved_uids = set(e.UniqueId for e in tray_moved)
+        for e in tray_moved + tray_retype:
+            is_move = e.UniqueId in moved_uids
+            host_el = stamped_trays[e.UniqueId][0]
+            tuid = source_type_uid(link_doc, e)
+            try:
+                if is_move:
+                    pts = [xform.OfPoint(p) for p in loc_points(e)]
+                    host_el.Location.Curve = Line.CreateBound(pts[0], pts[1])
+                    w, h = get_w_h_ft(e)
+                    for bip, val in ((BuiltInParameter.RBS_CABLETRAY_WIDTH_PARAM, w),
+                                     (BuiltInParameter.RBS_CABLETRAY_HEIGHT_PARAM, h)):
+                        p = host_el.get_Parameter(bip)
+                        if val is not None and p and not p.IsReadOnly:
+                            p.Set(val)
+                htid = known_tray_map.get(tuid)
+                if htid and host_el.GetTypeId() != htid:
+                    host_el.ChangeTypeId(htid)
+                    retyped_n += 1
+                if is_move:
+                    moved_n += 1
+                stamp(host_el, schema, e.UniqueId, link_key, tuid, src_geom(e))
+            except Exception as ex:
+                sync_errors.append(("Update Tray {}".format(host_el.Id.IntegerValue), str(ex)))
+        t.Commit()
+
+# Every copied element is stamped in the same transaction it is created in
+stamped_n = [0]
+def _stamp_new(new_ids, src_ids):
+    schema = get_or_create_sync_schema()
+    stamped_n[0] += stamp_copied(link_doc, new_ids, src_ids, schema, link_key)
+
 # Copy trays (per type group) with retype to mapped host types
-xform = link_inst.GetTransform()
-copied_trays, retyped_trays, tray_errors = copy_trays_with_mapping(link_doc, doc, xform, tray_groups, tray_map)
+copied_trays, retyped_trays, tray_errors = copy_trays_with_mapping(
+    link_doc, doc, xform, tray_groups, tray_map, on_copied=_stamp_new)
 
 # Copy fittings as-is (keeps connections/sizes from source)
-copied_fits, fit_copy_errors, new_fit_ids = copy_fittings_as_is(link_doc, doc, xform, fit_groups)
+copied_fits, fit_copy_errors, new_fit_ids = copy_fittings_as_is(
+    link_doc, doc, xform, fit_groups, on_copied=_stamp_new)
 
 # Optional: AUTO retype fittings to host tray type defaults
 retyped_fits = 0
@@ -528,12 +710,18 @@ if mode_auto and new_fit_ids:
 # ------------------------------------------------------------------------------
 # Report
 # ------------------------------------------------------------------------------
-out.print_md("### ✅ Copy complete")
+out.print_md("### ✅ {} complete".format("Sync" if sync else "Copy"))
+if sync:
+    out.print_md("* Moved trays: **{}**  ·  Retyped in place: **{}**  ·  Deleted (gone from link): **{}**  ·  Unchanged: **{}**".format(
+        moved_n, retyped_n, deleted_n, unchanged))
+    if deduped_n:
+        out.print_md("* Duplicate copies removed: **{}**".format(deduped_n))
 out.print_md("* Copied **Trays**: **{}**  (Retyped to host types: **{}**)".format(copied_trays, retyped_trays))
 out.print_md("* Copied **Fittings**: **{}**  ({} mode; Retyped after copy: **{}**)".format(
     copied_fits, "AUTO" if mode_auto else "AS‑IS", retyped_fits))
+out.print_md("* Stamped for future SYNC: **{}** of {} copied".format(stamped_n[0], copied_trays + copied_fits))
 
-issues = tray_errors + fit_copy_errors + auto_fit_errors
+issues = sync_errors + tray_errors + fit_copy_errors + auto_fit_errors
 if issues:
     out.print_md("\n### ⚠️ Notes / Skips")
     for what, reason in issues:
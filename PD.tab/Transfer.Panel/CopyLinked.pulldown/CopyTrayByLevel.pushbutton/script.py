@@ -1,46 +1,62 @@
 # -*- coding: utf-8 -*-
 __title__ = "Copy: Trays by Level"
-__doc__   = """Version = 1.0
-Date    = 09.07.2026
+__doc__   = """Version = 1.1
+Date    = 19.10.2026
 ________________________________________________________________
 Description:
 
-Copy STRAIGHT cable trays (NO fittings) from a selected Revit Link,
-filtered to the link levels you choose.
+Copy cable tray STRAIGHTS from a selected Revit Link, filtered to the
+link levels you choose, and optionally rebuild the FITTINGS between them.
 
 For each run it will:
-  - copy only OST_CableTray straight segments (fittings are ignored)
+  - copy OST_CableTray straight segments on the chosen levels
   - remap every source tray TYPE to a host type from THIS project
   - preserve each segment's own Width / Height
   - keep the exact position via the link transform (0 mm drift)
   - HOME each straight to the matching host level (nearest elevation),
     so schedules / view filters by level pick them up
+  - optionally re-create elbows / tees / crosses / transitions where the
+    copied straight ends meet at a link fitting (within 1 mm), using the
+    host tray type's default fittings
+  - stamp every copied straight with its source UniqueId, so a later
+    SYNC run against a new link revision only creates / moves / retypes /
+    deletes what changed (shared stamp with "Copy: Cable Trays",
+    lib/linksync.py); COPY skips straights already copied from the link
 
 Built to mirror the manual API workflow used on 26183 (LG_FFL / 00_FFL
 -> LEVEL LG / LEVEL 00).
 ________________________________________________________________
 How-To:
 
-1. Pick the Revit Link to copy FROM.
+1. Pick the Revit Link to copy FROM, then COPY (new) or SYNC.
 2. Tick the link levels to copy (e.g. LG_FFL, 00_FFL).
 3. Map each source tray type to a host type (or Skip).
-4. Confirm the level mapping. Done.
+   In SYNC mode only source types not seen on the last run are asked.
+4. Choose whether to rebuild fittings.
+5. Confirm the level mapping. Done.
 ________________________________________________________________
 Author: Jarek Wityk"""
 
 import clr
 clr.AddReference('RevitAPI')
+clr.AddReference('System')
 
+from bisect import bisect_left
 from Autodesk.Revit.DB import (
     FilteredElementCollector, BuiltInCategory, RevitLinkInstance, ElementId,
-    Transaction, BuiltInParameter, StorageType, Line, Level
+    Transaction, BuiltInParameter, StorageType, Line, Level, XYZ, ConnectorType
 )
 from Autodesk.Revit.DB.Electrical import CableTray
+from System.Collections.Generic import List
 from pyrevit import revit, forms, script
 
+from linksync import get_or_create_sync_schema, stamp, collect_stamped, geom_hash
+
 doc = revit.doc
 out = script.get_output()
 MM  = 304.8
+TOL = 1.0 / MM     # 1 mm - endpoint coincidence for fitting reconnection
+BATCH = 250        # straights created per batch before the grouped size writes
 
 if doc is None:
     forms.alert("No active Revit document.", exitscript=True)
@@ -52,7 +68,8 @@ def _bic(*names):
         except Exception: pass
     return None
 
-CAT_TRAY = _bic('OST_CableTray', 'OST_CableTrays')
+CAT_TRAY     = _bic('OST_CableTray', 'OST_CableTrays')
+CAT_TRAY_FIT = _bic('OST_CableTrayFitting', 'OST_CableTrayFittings')
 if CAT_TRAY is None:
     forms.alert("Could not resolve the Cable Tray category.", exitscript=True)
 
@@ -105,6 +122,105 @@ def src_level_id(el):
     except Exception: pass
     return None
 
+def affine_of(tf):
+    """Flatten a Transform into plain floats so endpoints map without XYZ churn."""
+    o, bx, by, bz = tf.Origin, tf.BasisX, tf.BasisY, tf.BasisZ
+    return (o.X, o.Y, o.Z, bx.X, bx.Y, bx.Z, by.X, by.Y, by.Z, bz.X, bz.Y, bz.Z)
+
+def map_points(aff, pts):
+    """Apply a flattened transform to a list of (x, y, z) tuples in one pass."""
+    ox, oy, oz, xx, xy, xz, yx, yy, yz, zx, zy, zz = aff
+    return [(ox + x * xx + y * yx + z * zx,
+             oy + x * xy + y * yy + z * zy,
+             oz + x * xz + y * yz + z * zz) for (x, y, z) in pts]
+
+def to_idlist(py_ids):
+    idlist = List[ElementId]()
+    for i in py_ids: idlist.Add(i)
+    return idlist
+
+def chunks(seq, n):
+    for i in range(0, len(seq), n):
+        yield seq[i:i + n]
+
+# spatial hash: cell = TOL, a lookup probes the 27 neighbouring cells
+def _cell(pt):
+    return (int(round(pt[0] / TOL)), int(round(pt[1] / TOL)), int(round(pt[2] / TOL)))
+
+def hash_add(grid, pt, item):
+    grid.setdefault(_cell(pt), []).append((pt, item))
+
+def hash_near(grid, pt):
+    cx, cy, cz = _cell(pt)
+    hits = []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            for dz in (-1, 0, 1):
+                for q, item in grid.get((cx + dx, cy + dy, cz + dz), ()):
+                    if (q[0]-pt[0])**2 + (q[1]-pt[1])**2 + (q[2]-pt[2])**2 <= TOL * TOL:
+                        hits.append(item)
+    return hits
+
+def end_connectors(el):
+    conns = []
+    try:
+        cm = getattr(el, "ConnectorManager", None)
+        if cm is None:
+            mm = getattr(el, "MEPModel", None)
+            cm = getattr(mm, "ConnectorManager", None) if mm else None
+        if cm:
+            for c in cm.Connectors:
+                if c.ConnectorType == ConnectorType.End:
+                    conns.append(c)
+    except Exception: pass
+    return conns
+
+def _owner_dir(c):
+    try:
+        crv = c.Owner.Location.Curve
+        return (crv.GetEndPoint(1) - crv.GetEndPoint(0)).Normalize()
+    except Exception:
+        return None
+
+def _parallel(c1, c2):
+    d1, d2 = _owner_dir(c1), _owner_dir(c2)
+    if d1 is None or d2 is None:
+        return False
+    return abs(d1.DotProduct(d2)) > 0.999
+
+def _split_run(conns):
+    """Order connectors as (run_a, run_b, rest...) - the collinear pair first."""
+    n = len(conns)
+    for i in range(n):
+        for j in range(i + 1, n):
+            if _parallel(conns[i], conns[j]):
+                rest = [c for k, c in enumerate(conns) if k not in (i, j)]
+                return [conns[i], conns[j]] + rest
+    return None
+
+def build_fitting(conns):
+    """Create the fitting that joins the given host tray end connectors."""
+    n = len(conns)
+    if n == 2:
+        a, b = conns
+        if not _parallel(a, b):
+            return doc.Create.NewElbowFitting(a, b), "Elbow"
+        try:
+            same = abs(a.Width - b.Width) < 1e-6 and abs(a.Height - b.Height) < 1e-6
+        except Exception:
+            same = False
+        if same:
+            return doc.Create.NewUnionFitting(a, b), "Union"
+        return doc.Create.NewTransitionFitting(a, b), "Transition"
+    ordered = _split_run(conns)
+    if ordered is None:
+        raise Exception("no collinear run among {} connectors".format(n))
+    if n == 3:
+        return doc.Create.NewTeeFitting(ordered[0], ordered[1], ordered[2]), "Tee"
+    if n == 4:
+        return doc.Create.NewCrossFitting(ordered[0], ordered[1], ordered[2], ordered[3]), "Cross"
+    raise Exception("{} connectors - unsupported fitting".format(n))
+
 # ------------------------------------------------------------------ pick link
 links = list(FilteredElementCollector(doc).OfClass(RevitLinkInstance))
 if not links:
@@ -126,6 +242,23 @@ link_doc  = link_inst.GetLinkDocument()
 if link_doc is None:
     forms.alert("The selected link is unloaded or inaccessible.", exitscript=True)
 xform = link_inst.GetTotalTransform()
+link_key = link_doc.Title
+
+MODE_COPY = "COPY: create new straights for the chosen levels"
+MODE_SYNC = "SYNC: update straights copied earlier from this link (changes only)"
+mode = forms.SelectFromList.show([MODE_COPY, MODE_SYNC], multiselect=False,
+        title="Copy or Sync?", button_name="Continue")
+if not mode:
+    script.exit()
+sync = mode == MODE_SYNC
+stamped, dupes = collect_stamped(doc, link_key, CAT_TRAY)
+copied_before = set()
+if not sync:
+    # a second COPY would stamp a second copy of the same source: skip those
+    copied_before, stamped, dupes = set(stamped), {}, []
+if sync and not stamped:
+    forms.alert("No straights copied from '{}' were found in this model.\n"
+                "Run a COPY first.".format(link_key), exitscript=True)
 
 # ------------------------------------------------------------------ link levels + straights
 link_levels = {}   # id(int) -> (name, elevation_ft)
@@ -136,11 +269,15 @@ straights = list(FilteredElementCollector(link_doc).OfCategory(CAT_TRAY).WhereEl
 if not straights:
     forms.alert("No cable tray straights found in the selected link.", exitscript=True)
 
+# read each straight's reference level once and reuse it for grouping + homing
+sid_of = {}        # src element id(int) -> src level id(int) or None
 levels_with = {}   # level name -> id(int)   (only levels that actually carry straights)
 for e in straights:
     sid = src_level_id(e)
-    if sid and sid.IntegerValue in link_levels:
-        levels_with[link_levels[sid.IntegerValue][0]] = sid.IntegerValue
+    lid = sid.IntegerValue if sid else None
+    sid_of[e.Id.IntegerValue] = lid
+    if lid in link_levels:
+        levels_with[link_levels[lid][0]] = lid
 if not levels_with:
     forms.alert("Cable tray straights in the link have no reference level assigned.", exitscript=True)
 
@@ -151,11 +288,7 @@ if not lvl_sel:
 sel_level_ids = set(levels_with[n] for n in lvl_sel)
 
 # straights on the chosen levels, grouped by source type
-chosen = []
-for e in straights:
-    sid = src_level_id(e)
-    if sid and sid.IntegerValue in sel_level_ids:
-        chosen.append(e)
+chosen = [e for e in straights if sid_of[e.Id.IntegerValue] in sel_level_ids]
 if not chosen:
     forms.alert("No straights on the selected levels.", exitscript=True)
 
@@ -182,12 +315,17 @@ if not host_types:
 SKIP = u"<< Skip this type (don't copy) >>"
 
 # ------------------------------------------------------------------ type mapping
-forms.alert("Map each SOURCE tray type (found on the chosen levels) to a host "
-            "type in this project.\nChoose Skip to leave a type out.",
-            title="Tray Type Mapping", warn_icon=False)
+if not sync:
+    forms.alert("Map each SOURCE tray type (found on the chosen levels) to a host "
+                "type in this project.\nChoose Skip to leave a type out.",
+                title="Tray Type Mapping", warn_icon=False)
 
 type_map = {}   # typeUid -> host ElementId or None(skip)
+for host_el, type_uid, _ in stamped.values():   # SYNC: reuse the mapping of the last run
+    type_map.setdefault(type_uid, host_el.GetTypeId())
 for k in sorted(groups.keys(), key=lambda x: groups[x]['name']):
+    if k in type_map:
+        continue
     g = groups[k]
     title = u"Map source type:  {}   ({} straights)".format(g['name'], len(g['elems']))
     pick = forms.SelectFromList.show([SKIP] + sorted(host_types.keys()),
@@ -196,17 +334,28 @@ for k in sorted(groups.keys(), key=lambda x: groups[x]['name']):
         script.exit()
     type_map[k] = None if pick == SKIP else host_types[pick].Id
 
+with_fittings = False
+if CAT_TRAY_FIT is not None:
+    with_fittings = forms.alert("Also rebuild the fittings between the copied straights?\n\n"
+                                "Elbows / tees / crosses / transitions are re-created where straight "
+                                "ends meet at a link fitting (1 mm tolerance), using the host tray "
+                                "type's default fittings.",
+                                title="Fittings", yes=True, no=True)
+
 # ------------------------------------------------------------------ level mapping (nearest elevation)
-host_levels = list(FilteredElementCollector(doc).OfClass(Level))
+host_levels = sorted(FilteredElementCollector(doc).OfClass(Level), key=lambda l: l.Elevation)
 if not host_levels:
     forms.alert("No levels in the current project.", exitscript=True)
+host_elevs = [hl.Elevation for hl in host_levels]
 
 def nearest_host_level(elev_ft):
+    i = bisect_left(host_elevs, elev_ft)
     best, bestd = None, None
-    for hl in host_levels:
-        d = abs(hl.Elevation - elev_ft)
-        if bestd is None or d < bestd:
-            best, bestd = hl, d
+    for j in (i - 1, i):
+        if 0 <= j < len(host_levels):
+            d = abs(host_elevs[j] - elev_ft)
+            if bestd is None or d < bestd:
+                best, bestd = host_levels[j], d
     return best, bestd
 
 level_map = {}   # src level id(int) -> host Level
@@ -221,64 +370,207 @@ if not forms.alert("Each straight will be homed to its floor:\n\n" + "\n".join(s
                    "\n\nProceed?", title="Confirm Level Mapping", yes=True, no=True):
     script.exit()
 
-# ------------------------------------------------------------------ create
-created = skipped_type = skipped_geo = 0
+# ------------------------------------------------------------------ plan (one pass over the chosen straights)
+created = skipped_type = skipped_geo = skipped_copied = 0
+moved = retyped = deleted = unchanged = 0
 per = {}
 errors = []
 
-with Transaction(doc, "Copy Tray Straights by Level") as tx:
-    tx.Start()
-    for k in groups:
-        htid = type_map.get(k)
-        if htid is None:
-            skipped_type += len(groups[k]['elems'])
+plan = []     # (group key, host type id, host Level, w, h, src uid) - parallel to raw_pts
+raw_pts = []  # link-space endpoints, two per planned straight
+for k in groups:
+    htid = type_map.get(k)
+    if htid is None:
+        skipped_type += len(groups[k]['elems'])
+        continue
+    for e in groups[k]['elems']:
+        if e.UniqueId in copied_before:
+            skipped_copied += 1
             continue
-        htype = doc.GetElement(htid)
-        for e in groups[k]['elems']:
+        crv = getattr(e.Location, "Curve", None)
+        hl = level_map.get(sid_of[e.Id.IntegerValue])
+        if crv is None or not isinstance(crv, Line) or hl is None:
+            skipped_geo += 1
+            continue
+        a, b = crv.GetEndPoint(0), crv.GetEndPoint(1)
+        raw_pts.append((a.X, a.Y, a.Z))
+        raw_pts.append((b.X, b.Y, b.Z))
+        plan.append((k, htid, hl, tray_w(e), tray_h(e), e.UniqueId))
+
+host_pts = map_points(affine_of(xform), raw_pts)
+
+# diff against the stamps of the last run: (row, p0, p1, geom) per bucket
+to_create, to_move, to_retype = [], [], []
+for n, row in enumerate(plan):
+    p0, p1 = host_pts[2 * n], host_pts[2 * n + 1]
+    if (p0[0]-p1[0])**2 + (p0[1]-p1[1])**2 + (p0[2]-p1[2])**2 < 1e-12:
+        skipped_geo += 1
+        continue
+    geom = geom_hash([raw_pts[2 * n], raw_pts[2 * n + 1]], row[3], row[4])
+    prev = stamped.get(row[5])
+    if prev is None:
+        to_create.append((row, p0, p1, geom))
+        continue
+    host_el, old_type, old_geom = prev
+    if old_geom != geom:
+        lvl = getattr(host_el, "ReferenceLevel", None)
+        if lvl is not None and lvl.Id != row[2].Id:
+            to_create.append((row, p0, p1, geom))   # re-homed: replace the straight
+            continue
+        to_move.append((row, p0, p1, geom))
+    elif old_type != row[0] or host_el.GetTypeId() != row[1]:
+        to_retype.append((row, p0, p1, geom))
+    else:
+        unchanged += 1
+
+replaced = set(r[0][5] for r in to_create if r[0][5] in stamped)
+all_src = set(e.UniqueId for e in straights)
+to_delete = [stamped[u][0].Id for u in stamped if u not in all_src or u in replaced]
+dupe_ids = [el.Id for el in dupes]   # second copies of one source: merged into the first
+
+if sync:
+    if not forms.alert("SYNC against '{}':\n\n"
+                       "  create   {}\n  move     {}\n  retype   {}\n  delete   {}\n"
+                       "  duplicates removed {}\n  unchanged {}\n\n"
+                       "Apply?".format(link_key, len(to_create) - len(replaced), len(to_move),
+                                       len(to_retype), len(to_delete) - len(replaced),
+                                       len(dupe_ids), unchanged),
+                       title="Sync Preview", yes=True, no=True):
+        script.exit()
+
+# ------------------------------------------------------------------ create / update
+def _set_sizes(made, bip, idx, label):
+    """Grouped write of one size parameter across a batch; skips unchanged values.
+    A refused write is logged against its tray and the batch goes on."""
+    for nt, row in made:
+        val = row[idx]
+        if val is None:
+            continue
+        try:
+            p = nt.get_Parameter(bip)
+            if p and not p.IsReadOnly and abs(p.AsDouble() - val) > 1e-9:
+                p.Set(val)
+        except Exception as ex:
+            errors.append((u"Tray {}".format(nt.Id.IntegerValue), "{}: {}".format(label, ex)))
+
+def _grouped_sizes(made):
+    _set_sizes(made, BuiltInParameter.RBS_CABLETRAY_WIDTH_PARAM, 3, "width")
+    _set_sizes(made, BuiltInParameter.RBS_CABLETRAY_HEIGHT_PARAM, 4, "height")
+
+new_trays = []
+with Transaction(doc, "Sync Tray Straights by Level" if sync else "Copy Tray Straights by Level") as tx:
+    tx.Start()
+    schema = get_or_create_sync_schema()
+
+    if to_delete or dupe_ids:
+        try:
+            doc.Delete(to_idlist(to_delete + dupe_ids))
+            deleted = len(to_delete) - len(replaced)
+        except Exception as ex:
+            errors.append(("Delete", str(ex)))
+
+    for batch in chunks(to_create, BATCH):
+        made = []
+        for row, p0, p1, geom in batch:
+            k, htid, hl = row[0], row[1], row[2]
             try:
-                loc = e.Location
-                crv = getattr(loc, "Curve", None)
-                if crv is None or not isinstance(crv, Line):
-                    skipped_geo += 1
-                    continue
-                p0 = xform.OfPoint(crv.GetEndPoint(0))
-                p1 = xform.OfPoint(crv.GetEndPoint(1))
-                if p0.DistanceTo(p1) < 1e-6:
-                    skipped_geo += 1
-                    continue
-                sid = src_level_id(e)
-                hl = level_map.get(sid.IntegerValue) if sid else None
-                if hl is None:
-                    skipped_geo += 1
-                    continue
-
-                nt = CableTray.Create(doc, htid, p0, p1, hl.Id)
-
-                w = tray_w(e)
-                if w is not None:
-                    pw = nt.get_Parameter(BuiltInParameter.RBS_CABLETRAY_WIDTH_PARAM)
-                    if pw and not pw.IsReadOnly:
-                        pw.Set(w)
-                h = tray_h(e)
-                if h is not None:
-                    ph = nt.get_Parameter(BuiltInParameter.RBS_CABLETRAY_HEIGHT_PARAM)
-                    if ph and not ph.IsReadOnly:
-                        ph.Set(h)
-
-                created += 1
-                key = u"{} | {}".format(safe_type_name(htype), hl.Name)
-                per[key] = per.get(key, 0) + 1
+                nt = CableTray.Create(doc, htid, XYZ(*p0), XYZ(*p1), hl.Id)
+                stamp(nt, schema, row[5], link_key, k, geom)
+                made.append((nt, row))
             except Exception as ex:
                 errors.append((groups[k]['name'], str(ex)))
+        _grouped_sizes(made)
+        for nt, row in made:
+            created += 1
+            key = u"{} | {}".format(safe_type_name(doc.GetElement(row[1])), row[2].Name)
+            per[key] = per.get(key, 0) + 1
+        new_trays.extend(nt for nt, _ in made)
+
+    made = []
+    for row, p0, p1, geom in to_move:
+        host_el = stamped[row[5]][0]
+        try:
+            host_el.Location.Curve = Line.CreateBound(XYZ(*p0), XYZ(*p1))
+            if host_el.GetTypeId() != row[1]:
+                host_el.ChangeTypeId(row[1])
+            stamp(host_el, schema, row[5], link_key, row[0], geom)
+            made.append((host_el, row))
+        except Exception as ex:
+            errors.append((groups[row[0]]['name'], "move: " + str(ex)))
+    _grouped_sizes(made)
+    moved = len(made)
+    new_trays.extend(el for el, _ in made)
+
+    for row, p0, p1, geom in to_retype:
+        host_el = stamped[row[5]][0]
+        try:
+            host_el.ChangeTypeId(row[1])
+            stamp(host_el, schema, row[5], link_key, row[0], geom)
+            retyped += 1
+        except Exception as ex:
+            errors.append((groups[row[0]]['name'], "retype: " + str(ex)))
     tx.Commit()
 
+# ------------------------------------------------------------------ fittings (reconnect coincident ends)
+fit_made = {}
+fit_skipped = 0
+if with_fittings and new_trays:
+    grid = {}
+    for nt in new_trays:
+        for c in end_connectors(nt):
+            o = c.Origin
+            hash_add(grid, (o.X, o.Y, o.Z), c)
+
+    aff = affine_of(xform)
+    src_fits = FilteredElementCollector(link_doc).OfCategory(CAT_TRAY_FIT).WhereElementIsNotElementType()
+    with Transaction(doc, "Rebuild Tray Fittings") as tx:
+        tx.Start()
+        for f in src_fits:
+            fconns = end_connectors(f)
+            if len(fconns) < 2:
+                continue
+            pts = map_points(aff, [(c.Origin.X, c.Origin.Y, c.Origin.Z) for c in fconns])
+            matched = []
+            for pt in pts:
+                hits = [c for c in hash_near(grid, pt) if not c.IsConnected]
+                if hits:
+                    matched.append(hits[0])
+            if not matched:
+                continue   # fitting not touching any copied straight
+            if len(matched) != len(fconns):
+                fit_skipped += 1
+                continue
+            try:
+                _, kind = build_fitting(matched)
+                fit_made[kind] = fit_made.get(kind, 0) + 1
+            except Exception as ex:
+                fit_skipped += 1
+                errors.append((u"Fitting {}".format(f.Id.IntegerValue), str(ex)))
+        tx.Commit()
+
 # ------------------------------------------------------------------ report
-out.print_md("### Copy complete - straights only, no fittings")
+out.print_md("### {} complete - straights{}".format(
+    "Sync" if sync else "Copy", " + fittings" if with_fittings else " only, no fittings"))
 out.print_md("* Created: **{}**".format(created))
+if sync:
+    out.print_md("* Moved / resized: **{}**".format(moved))
+    out.print_md("* Retyped: **{}**".format(retyped))
+    out.print_md("* Deleted (gone from link): **{}**".format(deleted))
+    out.print_md("* Unchanged: **{}**".format(unchanged))
+    if dupe_ids:
+        out.print_md("* Duplicate copies removed: **{}**".format(len(dupe_ids)))
+if skipped_copied:
+    out.print_md("* Skipped (already copied from this link - use SYNC): **{}**".format(skipped_copied))
 if skipped_type:
     out.print_md("* Skipped (type set to Skip): **{}**".format(skipped_type))
 if skipped_geo:
     out.print_md("* Skipped (non-line / zero length / no level): **{}**".format(skipped_geo))
+if with_fittings:
+    out.print_md("* Fittings rebuilt: **{}**{}".format(
+        sum(fit_made.values()),
+        "  ({})".format(", ".join("{} {}".format(v, k) for k, v in sorted(fit_made.items()))) if fit_made else ""))
+    if fit_skipped:
+        out.print_md("* Fittings skipped (partially copied run / no default fitting): **{}**".format(fit_skipped))
 if per:
     out.print_md("\n**Breakdown (host type | level):**")
     for key in sorted(per.keys()):
@@ -289,4 +581,5 @@ if errors:
         out.print_md("* {} - {}".format(nm, r))
 out.print_md("\n---")
 out.print_md("*Position preserved via the link transform; each straight homed to the "
-             "nearest host level; per-segment sizes copied. Fittings are intentionally skipped.*")
+             "nearest host level; per-segment sizes copied. Fittings are re-created only where "
+             "every end of the link fitting meets a copied straight.*")
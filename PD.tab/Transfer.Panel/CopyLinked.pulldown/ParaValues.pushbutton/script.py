@@ -1,12 +1,16 @@
 # -*- coding: utf-8 -*-
 __title__   = "Copy: Parameters from linked models"
-__doc__     = """Version = 1.0
-Date    = 20.12.2025
+__doc__     = """Version = 1.1
+Date    = 19.10.2026
 ________________________________________________________________
 Description:
 
 Transfers specific parameters and values from parameters from cloud-based linked models to the main model.
 
+ALL LINKS mode reads ProjectInformation from every loaded link into one table,
+shows a link x parameter grid with conflicting values highlighted, creates all
+missing bindings in one pass and writes the chosen values in a single transaction.
+
 Relative Path:
 ...\
 ________________________________________________________________
@@ -28,10 +32,15 @@ from Autodesk.Revit.DB import (
     StorageType,
     Transaction,
 )
-from pyrevit import revit, forms
+from pyrevit import revit, forms, script
 
 doc = revit.doc
 app = doc.Application
+out = script.get_output()
+
+SINGLE_LINK = "One link: pick parameters from a single linked model"
+ALL_LINKS = "All links: compare every loaded link and sync in one pass"
+SKIP = "<< Skip this parameter >>"
 
 
 def select_linked_model():
@@ -75,20 +84,48 @@ def get_project_info_parameters(linked_doc):
     return list(set(param_list)), param_groups
 
 
-def parameter_exists_in_main_doc(param_name):
+def parameter_map(element):
+    """Map definition name -> Parameter for one element, built in a single pass."""
+    pmap = {}
+    for p in element.Parameters:
+        pmap.setdefault(p.Definition.Name, p)
+    return pmap
+
+
+def load_shared_definitions():
+    """
+    Read the shared parameter file once.
+    Returns:
+        Dict mapping definition name -> ExternalDefinition, or None if no file is set.
+    """
+    sp_file = app.OpenSharedParameterFile()
+    if sp_file is None:
+        return None
+    defs = {}
+    for group in sp_file.Groups:
+        for ext_def in group.Definitions:
+            defs.setdefault(ext_def.Name, ext_def)
+    return defs
+
+
+def parameter_exists_in_main_doc(param_name, main_map=None):
     """Check if a parameter with this name exists in main doc's ProjectInfo."""
+    if main_map is not None:
+        return param_name in main_map
     main_pi = doc.ProjectInformation
     p = main_pi.LookupParameter(param_name)
     return p is not None
 
 
-def create_project_parameter(param_name, param_group):
+def create_project_parameter(param_name, param_group, shared_defs=None):
     """
     Attempt to create a project parameter with given param_name from the shared parameter file,
     assigning it to the provided param_group (BuiltInParameterGroup).
+    Pass shared_defs (from load_shared_definitions) to avoid re-reading the file per parameter.
     """
-    sp_file = app.OpenSharedParameterFile()
-    if sp_file is None:
+    if shared_defs is None:
+        shared_defs = load_shared_definitions()
+    if shared_defs is None:
         forms.alert(
             "No shared parameter file is set. Cannot create parameter '{}'.".format(
                 param_name
@@ -96,14 +133,7 @@ def create_project_parameter(param_name, param_group):
         )
         return False
 
-    param_def = None
-    for group in sp_file.Groups:
-        for ext_def in group.Definitions:
-            if ext_def.Name == param_name:
-                param_def = ext_def
-                break
-        if param_def:
-            break
+    param_def = shared_defs.get(param_name)
 
     if not param_def:
         forms.alert(
@@ -140,15 +170,15 @@ def create_project_parameter(param_name, param_group):
 
 
 def transfer_parameter_values(linked_doc, param_names):
-    linked_pi = linked_doc.ProjectInformation
-    main_pi = doc.ProjectInformation
+    linked_map = parameter_map(linked_doc.ProjectInformation)
+    main_map = parameter_map(doc.ProjectInformation)
 
     for name in param_names:
-        source_param = linked_pi.LookupParameter(name)
+        source_param = linked_map.get(name)
         if source_param is None:
             print("Parameter '{}' not found in linked ProjectInformation.".format(name))
             continue
-        target_param = main_pi.LookupParameter(name)
+        target_param = main_map.get(name)
         if target_param is None:
             print(
                 "Parameter '{}' not found in main ProjectInformation after creation. Skipping.".format(
@@ -190,7 +220,205 @@ def transfer_parameter_values(linked_doc, param_names):
             print("Failed to set parameter '{}': {}".format(name, e))
 
 
+def read_value(param):
+    """Return (storage type, value) for a transferable parameter, or None."""
+    st = param.StorageType
+    if st == StorageType.String:
+        return st, param.AsString() or ""
+    if st == StorageType.Integer:
+        return st, param.AsInteger()
+    if st == StorageType.Double:
+        return st, param.AsDouble()
+    return None
+
+
+def write_value(param, value):
+    if param.IsReadOnly:
+        return False
+    param.Set(value)
+    return True
+
+
+def loaded_link_docs():
+    """Title -> linked Document for every loaded link (one entry per link file)."""
+    docs = {}
+    for link in FilteredElementCollector(doc).OfClass(RevitLinkInstance):
+        ldoc = link.GetLinkDocument()
+        if ldoc is not None:
+            docs.setdefault(ldoc.Title, ldoc)
+    return docs
+
+
+def read_link_table(link_docs):
+    """
+    Read writable ProjectInformation values from all links in one pass.
+    Returns:
+        table: Dict param_name -> {link_title: (storage type, value)}
+        param_groups: Dict param_name -> BuiltInParameterGroup
+    """
+    table = {}
+    param_groups = {}
+    for title, ldoc in link_docs.items():
+        for name, p in parameter_map(ldoc.ProjectInformation).items():
+            if p.IsReadOnly:
+                continue
+            val = read_value(p)
+            if val is None:
+                continue
+            table.setdefault(name, {})[title] = val
+            param_groups.setdefault(name, p.Definition.ParameterGroup)
+    return table, param_groups
+
+
+def distinct_values(row):
+    """Distinct non-empty values in one table row -> {value: [link titles]}."""
+    seen = {}
+    for title, (_, val) in sorted(row.items()):
+        if val == "" or val is None:
+            continue
+        seen.setdefault(val, []).append(title)
+    return seen
+
+
+def _html(val):
+    return u"{}".format(val).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def print_grid(table, names, titles, main_map):
+    """Print the link x parameter grid, highlighting rows whose links disagree."""
+    head = "".join(u"<th>{}</th>".format(_html(t)) for t in titles)
+    rows = []
+    for name in names:
+        row = table[name]
+        conflict = len(distinct_values(row)) > 1
+        cells = []
+        for t in titles:
+            val = row.get(t)
+            cells.append(u"<td>{}</td>".format("" if val is None else _html(val[1])))
+        host_p = main_map.get(name)
+        host_val = read_value(host_p) if host_p is not None else None
+        host_txt = "(missing)" if host_p is None else ("" if host_val is None else host_val[1])
+        style = ' style="background:#ffd6d6"' if conflict else ""
+        rows.append(u"<tr{}><td><b>{}</b></td>{}<td><i>{}</i></td></tr>".format(
+            style, _html(name), "".join(cells), _html(host_txt)))
+    out.print_html(
+        '<table border="1" cellpadding="3"><tr><th>Parameter</th>{}<th>Host</th></tr>{}</table>'.format(
+            head, "".join(rows)
+        )
+    )
+
+
+def sync_all_links():
+    link_docs = loaded_link_docs()
+    if not link_docs:
+        forms.alert("No loaded linked models found in the project.")
+        return
+    titles = sorted(link_docs.keys())
+
+    table, param_groups = read_link_table(link_docs)
+    if not table:
+        forms.alert("No parameters found in linked ProjectInformation.")
+        return
+
+    selected = forms.SelectFromList.show(
+        sorted(table.keys()),
+        multiselect=True,
+        title="Select Parameters to Sync ({} links)".format(len(titles)),
+        button_name="Compare",
+    )
+    if not selected:
+        return
+    selected = sorted(selected)
+
+    main_map = parameter_map(doc.ProjectInformation)
+    out.print_md("### ProjectInformation across {} links".format(len(titles)))
+    print_grid(table, selected, titles, main_map)
+    out.print_md("*Highlighted rows: the links disagree - you will be asked which value to keep.*")
+
+    # pick the value per parameter (conflicts are asked, agreements taken as-is)
+    chosen = {}
+    for name in selected:
+        values = distinct_values(table[name])
+        if not values:
+            continue
+        if len(values) == 1:
+            chosen[name] = list(values.keys())[0]
+            continue
+        labels = {}
+        for val, links in values.items():
+            labels[u"{}   <-  {}".format(val, ", ".join(links))] = val
+        pick = forms.SelectFromList.show(
+            [SKIP] + sorted(labels.keys()),
+            multiselect=False,
+            title="Conflict: {}".format(name),
+            button_name="Use Value",
+        )
+        if pick and pick != SKIP:
+            chosen[name] = labels[pick]
+    if not chosen:
+        forms.alert("Nothing to write.")
+        return
+
+    missing = [n for n in chosen if n not in main_map]
+    create_missing = False
+    if missing:
+        create_missing = forms.alert(
+            "{} parameter(s) are missing in this model:\n\n{}\n\nCreate them from the shared parameter file?".format(
+                len(missing), "\n".join(sorted(missing))
+            ),
+            yes=True,
+            no=True,
+        )
+
+    created, written, skipped = [], [], []
+    with Transaction(doc, "Sync Project Parameters from All Links") as t:
+        t.Start()
+        if missing and create_missing:
+            shared_defs = load_shared_definitions()
+            if shared_defs is None:
+                forms.alert("No shared parameter file is set. Missing parameters are skipped.")
+            else:
+                for name in missing:
+                    group = param_groups.get(name, BuiltInParameterGroup.PG_TEXT)
+                    if create_project_parameter(name, group, shared_defs):
+                        created.append(name)
+            main_map = parameter_map(doc.ProjectInformation)
+
+        for name, value in sorted(chosen.items()):
+            target = main_map.get(name)
+            if target is None:
+                skipped.append((name, "missing in this model"))
+                continue
+            try:
+                if write_value(target, value):
+                    written.append((name, value))
+                else:
+                    skipped.append((name, "read-only"))
+            except Exception as e:
+                skipped.append((name, str(e)))
+        t.Commit()
+
+    out.print_md("### Result")
+    out.print_md("* Parameters created: **{}**".format(len(created)))
+    out.print_md("* Values written: **{}**".format(len(written)))
+    for name, value in written:
+        out.print_md("  * {} = {}".format(name, value))
+    if skipped:
+        out.print_md("* Skipped: **{}**".format(len(skipped)))
+        for name, why in skipped:
+            out.print_md("  * {} - {}".format(name, why))
+
+
 def main():
+    mode = forms.SelectFromList.show(
+        [SINGLE_LINK, ALL_LINKS], multiselect=False, title="Transfer Mode", button_name="Continue"
+    )
+    if not mode:
+        return
+    if mode == ALL_LINKS:
+        sync_all_links()
+        return
+
     linked_doc = select_linked_model()
     if linked_doc is None:
         return
@@ -219,14 +447,17 @@ def main():
     with Transaction(doc, "Transfer Project Parameters and Values") as t:
         t.Start()
 
+        main_map = parameter_map(doc.ProjectInformation)
+        shared_defs = load_shared_definitions() if create_missing else None
+
         # Check and create missing parameters if requested
         for p_name in selected_params[:]:
-            if not parameter_exists_in_main_doc(p_name):
+            if not parameter_exists_in_main_doc(p_name, main_map):
                 if create_missing:
                     param_group = param_groups.get(
                         p_name, BuiltInParameterGroup.PG_TEXT
                     )
-                    success = create_project_parameter(p_name, param_group)
+                    success = create_project_parameter(p_name, param_group, shared_defs)
                     if not success:
                         print(
                             "Skipping parameter '{}' because it couldn't be created.".format(
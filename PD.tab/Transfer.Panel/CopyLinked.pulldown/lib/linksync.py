@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Source stamps shared by "Copy: Cable Trays" and "Copy: Trays by Level".
+
+Every copied element carries one Extensible Storage entity:
+
+    SourceUniqueId   the element in the link it was copied from
+    SourceLink       the link document title
+    SourceTypeUid    the UniqueId of the source type
+    GeomHash         geom_hash() of the source's link-space geometry
+
+Both tools write this one schema with this one hash, so either tool can
+SYNC what the other copied.
+"""
+import hashlib
+
+from Autodesk.Revit.DB import FilteredElementCollector
+from Autodesk.Revit.DB.ExtensibleStorage import (
+    Schema, SchemaBuilder, Entity, AccessLevel, ExtensibleStorageFilter
+)
+from System import Guid, String
+
+MM_PER_FT = 304.8
+
+SYNC_GUID = Guid("3F0A5D2E-9C41-4E7B-A6D3-52B1C8E07F94")
+SYNC_NAME = "PD_LinkCopySource"
+F_SRC_UID  = "SourceUniqueId"
+F_SRC_LINK = "SourceLink"
+F_TYPE_UID = "SourceTypeUid"
+F_GEOM     = "GeomHash"
+
+
+def get_or_create_sync_schema():
+    s = Schema.Lookup(SYNC_GUID)
+    if s:
+        return s
+    sb = SchemaBuilder(SYNC_GUID)
+    sb.SetSchemaName(SYNC_NAME)
+    sb.SetReadAccessLevel(AccessLevel.Public)
+    sb.SetWriteAccessLevel(AccessLevel.Public)
+    for f in (F_SRC_UID, F_SRC_LINK, F_TYPE_UID, F_GEOM):
+        sb.AddSimpleField(f, String)
+    return sb.Finish()
+
+
+def stamp(el, schema, src_uid, link_key, type_uid, geom):
+    ent = Entity(schema)
+    ent.Set[String](schema.GetField(F_SRC_UID),  src_uid)
+    ent.Set[String](schema.GetField(F_SRC_LINK), link_key)
+    ent.Set[String](schema.GetField(F_TYPE_UID), type_uid)
+    ent.Set[String](schema.GetField(F_GEOM),     geom)
+    el.SetEntity(ent)
+
+
+def collect_stamped(doc, link_key, cat):
+    """Stamped host elements of one link and category.
+
+    Returns ({source UniqueId: (host element, source type uid, geom hash)},
+    [duplicate host elements]). A source stamped on more than one host element
+    (copied twice) keeps its oldest copy (lowest id); the others are returned
+    as duplicates so SYNC can remove them instead of losing track of them.
+    """
+    found, dupes = {}, []
+    schema = Schema.Lookup(SYNC_GUID)
+    if schema is None:
+        return found, dupes
+    col = (FilteredElementCollector(doc).OfCategory(cat).WhereElementIsNotElementType()
+           .WherePasses(ExtensibleStorageFilter(SYNC_GUID)))
+    for el in sorted(col, key=lambda e: e.Id.IntegerValue):
+        ent = el.GetEntity(schema)
+        if not ent.IsValid() or ent.Get[String](schema.GetField(F_SRC_LINK)) != link_key:
+            continue
+        uid = ent.Get[String](schema.GetField(F_SRC_UID))
+        if uid in found:
+            dupes.append(el)
+            continue
+        found[uid] = (el, ent.Get[String](schema.GetField(F_TYPE_UID)),
+                      ent.Get[String](schema.GetField(F_GEOM)))
+    return found, dupes
+
+
+def geom_hash(points, w, h):
+    """Link-space points (x, y, z feet) + width / height (feet or None), 0.1 mm, hashed.
+
+    Straights hash their two end points; fittings their location point and
+    connector origins.
+    """
+    vals = [round(v * MM_PER_FT, 1) for p in points for v in p]
+    vals += [None if v is None else round(v * MM_PER_FT, 1) for v in (w, h)]
+    return hashlib.md5(repr(vals).encode("utf-8")).hexdigest()
@@ -1,18 +1,22 @@
 # -*- coding: utf-8 -*-
 __title__   = "Reassign: Filled Regions"
-__doc__     = """Version = 1.0
-Date    = 20.12.2025
+__doc__     = """Version = 1.1
+Date    = 19.10.2026
 ________________________________________________________________
 Description:
 
 Reassign existing filled regions to a different Filled Region Type.
 
+Instances are indexed by type in one collector pass and moved with one
+bulk ChangeTypeId per source type (lib/typeusage.py).
+
 Relative Path:
 ...\
 ________________________________________________________________
 How-To:
 
-1. Click on
+1. Select the Filled Region Types to replace.
+2. Select the target Filled Region Type.
 
 ________________________________________________________________
 Get Free:
@@ -25,38 +29,19 @@ clr.AddReference("RevitAPI")
 from Autodesk.Revit.DB import *
 from pyrevit import revit, forms, script
 
+from typeusage import TypeUsage, FILLED_REGION, type_name
+
 doc = revit.doc
 output = script.get_output()
 
-# ---------------------------------------
-# 1. Collect all FilledRegionTypes
-type_elements = list(
-    FilteredElementCollector(doc).OfClass(FilledRegionType).ToElements()
-)
-type_name_map = {}
-for t in type_elements:
-    name = t.get_Parameter(BuiltInParameter.SYMBOL_NAME_PARAM).AsString()
-    if name:
-        type_name_map[name] = t
-
-# 2. Collect placed FilledRegions and find used types
-regions = list(
-    FilteredElementCollector(doc)
-    .OfClass(FilledRegion)
-    .WhereElementIsNotElementType()
-    .ToElements()
-)
-used_type_ids = set(r.GetTypeId().IntegerValue for r in regions)
-
-# Map used types to names
-used_type_names = [
-    n for n, t in type_name_map.items() if t.Id.IntegerValue in used_type_ids
-]
-used_type_names_sorted = sorted(used_type_names)
+# -----------------------------------
+# 1. Index types and their instances
+usage = TypeUsage(doc, [FILLED_REGION])
+type_name_map = usage.by_name(FILLED_REGION)
 
-# 3. Prompt user: select type(s) to reassign
+# 2. Ask user: which types to replace (in use only)
 selected_sources = forms.SelectFromList.show(
-    used_type_names_sorted,
+    [type_name(t) for t in usage.used(FILLED_REGION)],
     multiselect=True,
     title="Select Filled Region Types to Replace",
     button_name="Next",
@@ -65,31 +50,28 @@ selected_sources = forms.SelectFromList.show(
 if not selected_sources:
     script.exit("Nothing selected.")
 
-# 4. Prompt user: target type
+# 3. Ask user: what type to switch to
 available_targets = sorted([n for n in type_name_map if n not in selected_sources])
-target_type_name = forms.SelectFromList.show(
+target_name = forms.SelectFromList.show(
     available_targets,
     multiselect=False,
     title="Select Target Filled Region Type",
     button_name="Reassign To",
 )
 
-if not target_type_name:
+if not target_name:
     script.exit("No target selected.")
 
-# Resolve ElementIds
-source_ids = [type_name_map[n].Id for n in selected_sources]
-target_id = type_name_map[target_type_name].Id
+target_id = type_name_map[target_name].Id
+mapping = dict((type_name_map[name].Id, target_id) for name in selected_sources)
 
-# ---------------------------------------
-# 5. Perform reassignment
-count = 0
+# -----------------------------------
+# 4. Reassign all instances in one transaction
 with Transaction(doc, "Reassign Filled Region Types") as t:
     t.Start()
-    for r in regions:
-        if r.GetTypeId() in source_ids:
-            r.ChangeTypeId(target_id)
-            count += 1
+    moved = usage.swap(mapping)
     t.Commit()
 
-forms.alert("✅ Reassigned {} filled region(s) to: {}".format(count, target_type_name))
+forms.alert(
+    "✅ Reassigned {} filled region(s) to {}".format(sum(moved.values()), target_name)
+)
@@ -1,18 +1,22 @@
 # -*- coding: utf-8 -*-
 __title__   = "Reassign: Text Styles"
-__doc__     = """Version = 1.0
-Date    = 20.12.2025
+__doc__     = """Version = 1.1
+Date    = 19.10.2026
 ________________________________________________________________
 Description:
 
 Switch all notes using selected text styles to a target style.
 
+Instances are indexed by type in one collector pass and moved with one
+bulk ChangeTypeId per source type (lib/typeusage.py).
+
 Relative Path:
 ...\
 ________________________________________________________________
 How-To:
 
-1. Click on
+1. Select the Text Styles to replace.
+2. Select the target Text Style.
 
 ________________________________________________________________
 Get Free:
@@ -25,36 +29,19 @@ clr.AddReference("RevitAPI")
 from Autodesk.Revit.DB import *
 from pyrevit import revit, forms, script
 
+from typeusage import TypeUsage, TEXT, type_name
+
 doc = revit.doc
 output = script.get_output()
 
 # -----------------------------------
-# 1. Collect all text styles (TextNoteTypes)
-text_types = list(FilteredElementCollector(doc).OfClass(TextNoteType).ToElements())
-type_name_map = {}
-for t in text_types:
-    name = t.get_Parameter(BuiltInParameter.SYMBOL_NAME_PARAM).AsString()
-    if name:
-        type_name_map[name] = t
-
-# 2. Collect all text notes and map styles in use
-notes = list(
-    FilteredElementCollector(doc)
-    .OfClass(TextNote)
-    .WhereElementIsNotElementType()
-    .ToElements()
-)
-used_type_ids = set(note.GetTypeId().IntegerValue for note in notes)
-
-# Build in-use style list
-used_styles = [
-    name for name, t in type_name_map.items() if t.Id.IntegerValue in used_type_ids
-]
-used_styles_sorted = sorted(used_styles)
+# 1. Index types and their instances
+usage = TypeUsage(doc, [TEXT])
+type_name_map = usage.by_name(TEXT)
 
-# 3. Ask user: which styles to replace
+# 2. Ask user: which types to replace (in use only)
 selected_sources = forms.SelectFromList.show(
-    used_styles_sorted,
+    [type_name(t) for t in usage.used(TEXT)],
     multiselect=True,
     title="Select Text Styles to Replace",
     button_name="Next",
@@ -63,34 +50,28 @@ selected_sources = forms.SelectFromList.show(
 if not selected_sources:
     script.exit("Nothing selected.")
 
-# 4. Ask user: what style to switch to
+# 3. Ask user: what type to switch to
 available_targets = sorted([n for n in type_name_map if n not in selected_sources])
-target_style_name = forms.SelectFromList.show(
+target_name = forms.SelectFromList.show(
     available_targets,
     multiselect=False,
     title="Select Target Text Style",
     button_name="Reassign To",
 )
 
-if not target_style_name:
+if not target_name:
     script.exit("No target selected.")
 
-# Resolve IDs
-source_type_ids = [type_name_map[name].Id for name in selected_sources]
-target_type = type_name_map[target_style_name]
-target_id = target_type.Id
+target_id = type_name_map[target_name].Id
+mapping = dict((type_name_map[name].Id, target_id) for name in selected_sources)
 
 # -----------------------------------
-# 5. Reassign all matching notes
-count = 0
+# 4. Reassign all instances in one transaction
 with Transaction(doc, "Reassign Text Styles") as t:
     t.Start()
-    for note in notes:
-        if note.GetTypeId() in source_type_ids:
-            note.ChangeTypeId(target_id)
-            count += 1
+    moved = usage.swap(mapping)
     t.Commit()
 
 forms.alert(
-    "✅ Reassigned {} text note(s) to style: {}".format(count, target_style_name)
+    "✅ Reassigned {} text note(s) to style: {}".format(sum(moved.values()), target_name)
 )
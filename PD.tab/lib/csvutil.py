@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""CSV helpers for the IronPython 2.7 tools (the csv module reads and writes bytes).
+
+    with open(path, "wb") as csvfile:
+        csv.writer(csvfile).writerow(enc_row([u"Name", name]))
+
+    with open(path, "rb") as csvfile:
+        for row in read_rows(csvfile):      # {header: text}
+            ...
+"""
+import csv
+
+
+def enc(value):
+    """UTF-8 bytes for unicode cells; anything else is left to the csv module."""
+    return value.encode("utf-8") if isinstance(value, unicode) else value  # noqa: F821
+
+
+def enc_row(row):
+    return [enc(v) for v in row]
+
+
+def clean_key(key):
+    # Excel writes a byte order mark in front of the first header
+    return key.replace("\xef\xbb\xbf", "").replace(u"\ufeff", "").strip()
+
+
+def read_rows(csvfile, strip=True):
+    """Rows of an open CSV as {clean header: text}; cells without a header are dropped."""
+    for row in csv.DictReader(csvfile):
+        yield dict((clean_key(k), (v or "").strip() if strip else (v or ""))
+                   for k, v in row.items() if k)
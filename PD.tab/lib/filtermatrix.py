@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""Views / templates x filters usage matrix shared by the filter report tools.
+
+One pass over all views reads, per applied filter, its visibility, enabled
+state and an override signature. Identical override sets share one short
+code (S1, S2, ...) with a readable legend, so a matrix cell stays small:
+"V S3" = visible with overrides S3, "H" = hidden, "V/off" = filter disabled.
+Filter names are resolved once through a cache. Filters applied nowhere
+(in any view or template) are reported as unused and can be purged.
+"""
+
+import csv
+
+from System.Collections.Generic import List
+from pyrevit import DB
+
+from csvutil import enc_row
+
+
+# (getter, setter, "is set" test) for every OverrideGraphicSettings property;
+# the signature here and Copy Filters' compare / merge both use this table
+OVERRIDE_PROPS = [
+    ("ProjectionLineColor", "SetProjectionLineColor", lambda v: v.IsValid),
+    ("ProjectionLineWeight", "SetProjectionLineWeight", lambda v: v != -1),
+    ("ProjectionLinePatternId", "SetProjectionLinePatternId", lambda v: v != DB.ElementId.InvalidElementId),
+    ("CutLineColor", "SetCutLineColor", lambda v: v.IsValid),
+    ("CutLineWeight", "SetCutLineWeight", lambda v: v != -1),
+    ("CutLinePatternId", "SetCutLinePatternId", lambda v: v != DB.ElementId.InvalidElementId),
+    ("SurfaceForegroundPatternId", "SetSurfaceForegroundPatternId", lambda v: v != DB.ElementId.InvalidElementId),
+    ("SurfaceForegroundPatternColor", "SetSurfaceForegroundPatternColor", lambda v: v.IsValid),
+    ("SurfaceForegroundPatternVisible", "SetSurfaceForegroundPatternVisible", lambda v: not v),
+    ("SurfaceBackgroundPatternId", "SetSurfaceBackgroundPatternId", lambda v: v != DB.ElementId.InvalidElementId),
+    ("SurfaceBackgroundPatternColor", "SetSurfaceBackgroundPatternColor", lambda v: v.IsValid),
+    ("SurfaceBackgroundPatternVisible", "SetSurfaceBackgroundPatternVisible", lambda v: not v),
+    ("CutForegroundPatternId", "SetCutForegroundPatternId", lambda v: v != DB.ElementId.InvalidElementId),
+    ("CutForegroundPatternColor", "SetCutForegroundPatternColor", lambda v: v.IsValid),
+    ("CutForegroundPatternVisible", "SetCutForegroundPatternVisible", lambda v: not v),
+    ("CutBackgroundPatternId", "SetCutBackgroundPatternId", lambda v: v != DB.ElementId.InvalidElementId),
+    ("CutBackgroundPatternColor", "SetCutBackgroundPatternColor", lambda v: v.IsValid),
+    ("CutBackgroundPatternVisible", "SetCutBackgroundPatternVisible", lambda v: not v),
+    ("Halftone", "SetHalftone", lambda v: bool(v)),
+    ("Transparency", "SetSurfaceTransparency", lambda v: v != 0),
+    ("DetailLevel", "SetDetailLevel", lambda v: str(v) != "Undefined"),
+]
+
+
+class NameCache(object):
+    """Element id -> name, resolved once per id."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._names = {}
+
+    def __call__(self, element_id):
+        key = element_id.IntegerValue
+        if key not in self._names:
+            el = self.doc.GetElement(element_id)
+            self._names[key] = DB.Element.Name.GetValue(el) if el else "<{}>".format(key)
+        return self._names[key]
+
+
+def _describe(value, names):
+    if hasattr(value, "Red") and hasattr(value, "IsValid"):
+        return "{},{},{}".format(value.Red, value.Green, value.Blue)
+    if isinstance(value, DB.ElementId):
+        return names(value)
+    return str(value)
+
+
+def override_summary(overrides, names):
+    """Readable 'Property=value; ...' of the properties that are set ('' if none)."""
+    parts = []
+    for prop, _, is_set in OVERRIDE_PROPS:
+        try:
+            value = getattr(overrides, prop)
+            if is_set(value):
+                parts.append("{}={}".format(prop, _describe(value, names)))
+        except Exception:
+            continue
+    return "; ".join(parts)
+
+
+class FilterMatrix(object):
+    """cells[(view id, filter id)] = (visible, enabled, signature code or '')"""
+
+    def __init__(self, doc, views=None):
+        self.doc = doc
+        self.names = NameCache(doc)
+        self.filters = dict(
+            (f.Id.IntegerValue, f) for f in DB.FilteredElementCollector(doc).OfClass(DB.FilterElement)
+        )
+        self.views = {}        # view id -> view (only views with filters)
+        self.by_view = {}      # view id -> [filter ids] in the view's order
+        self.cells = {}
+        self.signatures = {}   # summary -> code
+        self.used = set()
+        if views is None:
+            views = DB.FilteredElementCollector(doc).OfClass(DB.View)
+        for view in views:
+            try:
+                filter_ids = view.GetFilters()
+            except Exception:
+                continue  # views that do not support filters
+            if not filter_ids.Count:
+                continue
+            vid = view.Id.IntegerValue
+            self.views[vid] = view
+            self.by_view[vid] = [fid.IntegerValue for fid in filter_ids]
+            for fid in filter_ids:
+                self.used.add(fid.IntegerValue)
+                self.cells[(vid, fid.IntegerValue)] = self._read(view, fid)
+
+    def _read(self, view, fid):
+        visible = view.GetFilterVisibility(fid)
+        try:
+            enabled = view.GetIsFilterEnabled(fid)
+        except Exception:
+            enabled = True  # before Revit 2021 every applied filter is enabled
+        summary = override_summary(view.GetFilterOverrides(fid), self.names)
+        code = ""
+        if summary:
+            code = self.signatures.get(summary)
+            if code is None:
+                code = "S{}".format(len(self.signatures) + 1)
+                self.signatures[summary] = code
+        return visible, enabled, code
+
+    # -- queries
+    def filter_name(self, fid):
+        return self.names(DB.ElementId(fid))
+
+    def rows(self, templates_only=True):
+        """View ids (sorted by name) to show as matrix rows."""
+        vids = [vid for vid, v in self.views.items() if v.IsTemplate or not templates_only]
+        return sorted(vids, key=lambda vid: self.views[vid].Name)
+
+    def columns(self, vids):
+        """Filter ids used by the given rows, sorted by name."""
+        wanted = set(vids)
+        fids = set(fid for (vid, fid) in self.cells if vid in wanted)
+        return sorted(fids, key=self.filter_name)
+
+    def cell_text(self, vid, fid):
+        cell = self.cells.get((vid, fid))
+        if cell is None:
+            return ""
+        visible, enabled, code = cell
+        text = "V" if visible else "H"
+        if not enabled:
+            text += "/off"
+        return "{} {}".format(text, code) if code else text
+
+    def unused(self):
+        """Filter elements applied in no view or template, sorted by name."""
+        fids = [fid for fid in self.filters if fid not in self.used]
+        return sorted(fids, key=self.filter_name)
+
+    def legend(self):
+        return sorted(((code, summary) for summary, code in self.signatures.items()),
+                      key=lambda cs: int(cs[0][1:]))
+
+    # -- output
+    def write_csv(self, path, vids):
+        fids = self.columns(vids)
+        with open(path, "wb") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(enc_row(["View / Template", "Template?"] + [self.filter_name(f) for f in fids]))
+            for vid in vids:
+                view = self.views[vid]
+                writer.writerow(enc_row(
+                    [view.Name, "yes" if view.IsTemplate else ""]
+                    + [self.cell_text(vid, f) for f in fids]
+                ))
+            writer.writerow([])
+            writer.writerow(["Signature", "Overrides"])
+            for code, summary in self.legend():
+                writer.writerow(enc_row([code, summary]))
+            writer.writerow([])
+            writer.writerow(["Unused filters"])
+            for fid in self.unused():
+                writer.writerow(enc_row([self.filter_name(fid)]))
+
+    def purge_unused(self):
+        """Delete the unused filters (call inside a transaction). Returns the count."""
+        ids = [DB.ElementId(fid) for fid in self.unused()]
+        if ids:
+            self.doc.Delete(List[DB.ElementId](ids))
+        return len(ids)
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""Model health metrics and the Dashboard gauge update (HealthCheck > Status).
+
+    values = metrics(doc)                    # {metric name: value}
+    with Transaction(doc, "Update Health Check Values") as t:
+        t.Start()
+        update_gauges(doc)
+        t.Commit()
+
+Shared by the Status button, Prepare for Share and the batch share runner,
+so the metrics run in-process instead of executing the button's script.
+"""
+from Autodesk.Revit.DB import (
+    FilteredElementCollector,
+    BuiltInCategory,
+    DesignOption,
+    View,
+    ImportInstance,
+    Material,
+    Family,
+    FilteredWorksetCollector,
+    ViewSheet,
+    LinePatternElement,
+    FillPatternElement,
+    WorksetKind,
+    View3D,
+    ViewSchedule,
+)
+
+GAUGE_FAMILY = "PD_GAN_ModelHealth-Gauge"
+
+# Health metrics read from the "Metric name" parameter, excluding "FILE SIZE (MB)"
+TARGET_METRICS = [
+    "WARNINGS",
+    "WORKSETS",
+    "DESIGN OPTIONS",
+    "UNPLACED VIEWS",
+    "CAD LINKS",
+    "CAD IMPORTS",
+    "RASTER IMAGES",
+    "INVALID ROOMS",
+    "IMPORT PATTERNS",
+    "INPLACE FAMILIES",
+    "MATERIALS",
+    "LINE STYLES",
+    "FILL PATTERNS",
+    "LINE PATTERNS",
+    "LOADED FAMILIES",
+]
+
+# Normalization ranges for each metric (excluding "PDF DOCUMENTS")
+NORMALIZATION_RANGES = {
+    "WARNINGS": (0, 100),
+    "WORKSETS": (0, 50),
+    "DESIGN OPTIONS": (0, 20),
+    "UNPLACED VIEWS": (0, 500),
+    "CAD LINKS": (0, 50),
+    "CAD IMPORTS": (0, 50),
+    "RASTER IMAGES": (0, 50),
+    "INVALID ROOMS": (0, 100),
+    "IMPORT PATTERNS": (0, 50),
+    "INPLACE FAMILIES": (0, 100),
+    "MATERIALS": (0, 50000),
+    "LINE STYLES": (0, 200),
+    "FILL PATTERNS": (0, 200),
+    "LINE PATTERNS": (0, 200),
+    "LOADED FAMILIES": (0, 1000),
+}
+FILE_SIZE_RANGE = (0, 500)
+
+
+def _count(doc, cls):
+    return FilteredElementCollector(doc).OfClass(cls).GetElementCount()
+
+
+def calculate_metric_value(doc, metric_name):
+    if metric_name == "DESIGN OPTIONS":
+        return _count(doc, DesignOption)
+    elif metric_name == "WARNINGS":
+        return len(doc.GetWarnings())
+    elif metric_name == "WORKSETS":
+        return len([
+            ws
+            for ws in FilteredWorksetCollector(doc).ToWorksets()
+            if ws.Kind == WorksetKind.UserWorkset
+        ])
+    elif metric_name == "UNPLACED VIEWS":
+        return len([
+            v
+            for v in FilteredElementCollector(doc).OfClass(View)
+            if not isinstance(v, (ViewSheet, View3D, ViewSchedule))
+            and not v.IsTemplate
+            and v.CanBePrinted
+        ])
+    elif metric_name == "CAD LINKS":
+        return _count(doc, ImportInstance)
+    elif metric_name == "RASTER IMAGES":
+        raster_images = FilteredElementCollector(doc).OfCategory(BuiltInCategory.OST_RasterImages)
+        return len([
+            img
+            for img in raster_images
+            if hasattr(img, "Name") and ".png" in img.Name.lower()
+        ])
+    elif metric_name == "MATERIALS":
+        return _count(doc, Material)
+    elif metric_name == "INPLACE FAMILIES":
+        return len([f for f in FilteredElementCollector(doc).OfClass(Family) if f.IsInPlace])
+    elif metric_name == "LINE STYLES":
+        return doc.Settings.Categories.get_Item(BuiltInCategory.OST_Lines).SubCategories.Size
+    elif metric_name == "FILL PATTERNS":
+        return _count(doc, FillPatternElement)
+    elif metric_name == "LINE PATTERNS":
+        return _count(doc, LinePatternElement)
+    elif metric_name == "LOADED FAMILIES":
+        return _count(doc, Family)
+    else:
+        return 0.0
+
+
+def normalize_value(value, min_value, max_value):
+    if max_value - min_value != 0:
+        return float(value - min_value) / (max_value - min_value)
+    return 0
+
+
+def metrics(doc, names=None):
+    """{metric name: value} for every target metric (no gauges needed)."""
+    return dict((name, calculate_metric_value(doc, name)) for name in (names or TARGET_METRICS))
+
+
+def gauge_instances(doc):
+    def _is_gauge(inst):
+        try:
+            return hasattr(inst, "Symbol") and inst.Symbol.Family.Name == GAUGE_FAMILY
+        except Exception:
+            return False
+
+    return [
+        inst
+        for inst in FilteredElementCollector(doc)
+        .OfCategory(BuiltInCategory.OST_GenericAnnotation)
+        .WhereElementIsNotElementType()
+        if _is_gauge(inst)
+    ]
+
+
+def update_gauges(doc):
+    """Write every gauge's value and the OVERALL average (call inside a transaction).
+
+    Returns (number of gauges updated, overall value or None). Each metric is
+    calculated once even when several gauges show it.
+    """
+    values = {}
+    normalized_values = []
+    overall_instance = None
+    file_size_value = 0.0  # the manually entered "FILE SIZE (MB)" value
+    updated = 0
+
+    for instance in gauge_instances(doc):
+        metric_param = instance.LookupParameter("Metric name")
+        value_param = instance.LookupParameter("Value")
+        if not (metric_param and value_param):
+            continue
+        metric_name = metric_param.AsString()
+        if metric_name == "FILE SIZE (MB)":
+            file_size_value = value_param.AsDouble()  # read, never overwritten
+        elif metric_name in TARGET_METRICS:
+            if metric_name not in values:
+                values[metric_name] = calculate_metric_value(doc, metric_name)
+                if metric_name in NORMALIZATION_RANGES:
+                    min_val, max_val = NORMALIZATION_RANGES[metric_name]
+                    normalized_values.append(normalize_value(values[metric_name], min_val, max_val))
+            value_param.Set(values[metric_name])
+            updated += 1
+        elif metric_name == "OVERALL":
+            overall_instance = instance
+
+    overall = None
+    if overall_instance and normalized_values:
+        if file_size_value > 0:
+            normalized_values.append(normalize_value(file_size_value, *FILE_SIZE_RANGE))
+        overall = sum(normalized_values) / len(normalized_values)
+        overall_value_param = overall_instance.LookupParameter("Value")
+        if overall_value_param:
+            overall_value_param.Set(overall)
+    return updated, overall
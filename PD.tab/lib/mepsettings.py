@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""Electrical MEP settings and where they are used, shared by the MEP tools.
+
+Every setting kind is gathered with a class-filtered collector (never by
+scanning all elements and comparing type names). Usage is cross-referenced
+in one pass over circuits, wires, electrical equipment, family instances
+with electrical connectors, distribution systems and load classifications:
+
+    load classification  <- circuits (by name), instance / type parameter
+                            and electrical connectors of family instances
+    demand factor        <- load classifications
+    wire type            <- wires, circuits
+    voltage type         <- distribution systems
+    distribution system  <- electrical equipment (panels)
+"""
+
+from pyrevit import DB
+from Autodesk.Revit.DB.Electrical import (
+    DistributionSysType,
+    ElectricalDemandFactorDefinition,
+    ElectricalLoadClassification,
+    ElectricalSystem,
+    VoltageType,
+    Wire,
+    WireType,
+)
+
+
+LOAD_CLASSIFICATION = "Load Classification"
+DEMAND_FACTOR = "Demand Factor"
+WIRE_TYPE = "Wire Type"
+VOLTAGE_TYPE = "Voltage Type"
+DISTRIBUTION_SYSTEM = "Distribution System"
+
+KINDS = [
+    (LOAD_CLASSIFICATION, ElectricalLoadClassification),
+    (DEMAND_FACTOR, ElectricalDemandFactorDefinition),
+    (WIRE_TYPE, WireType),
+    (VOLTAGE_TYPE, VoltageType),
+    (DISTRIBUTION_SYSTEM, DistributionSysType),
+]
+
+
+def collect(doc, kind):
+    """Elements of one setting kind via a class filter."""
+    cls = dict(KINDS)[kind]
+    return list(DB.FilteredElementCollector(doc).OfClass(cls).ToElements())
+
+
+def load_classification_names(doc):
+    return [lc.Name for lc in collect(doc, LOAD_CLASSIFICATION)]
+
+
+def _id_param(el, bip):
+    param = el.Parameter[bip]
+    if param is None or param.StorageType != DB.StorageType.ElementId:
+        return None
+    value = param.AsElementId()
+    return None if value == DB.ElementId.InvalidElementId else value.IntegerValue
+
+
+def _lc_param(param, lc_by_name):
+    """Load classification id held by a parameter (by id or by name), or None."""
+    if param is None or not param.HasValue:
+        return None
+    if param.StorageType == DB.StorageType.ElementId:
+        value = param.AsElementId()
+        return None if value == DB.ElementId.InvalidElementId else value.IntegerValue
+    if param.StorageType == DB.StorageType.String:
+        return lc_by_name.get((param.AsString() or "").strip())
+    return None
+
+
+def _connector_lc(connector, lc_by_name):
+    """Load classification set on an electrical connector of a family instance."""
+    try:
+        info = connector.GetMEPConnectorInfo()
+        value = info.GetConnectorParameterValue(
+            DB.ElementId(DB.BuiltInParameter.RBS_ELEC_LOAD_CLASSIFICATION))
+    except Exception:
+        return None  # not a family connector, or no such connector parameter
+    if isinstance(value, DB.ElementIdParameterValue):
+        return None if value.Value == DB.ElementId.InvalidElementId else value.Value.IntegerValue
+    if isinstance(value, DB.StringParameterValue):
+        return lc_by_name.get((value.Value or "").strip())
+    return None
+
+
+class MEPSettings(object):
+    """All electrical settings of a document with usage counts per setting."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.settings = {}   # id -> (kind, element)
+        for kind, _ in KINDS:
+            for el in collect(doc, kind):
+                self.settings[el.Id.IntegerValue] = (kind, el)
+        self.usage = {}      # id -> {referrer label: count}
+        self._cross_reference()
+
+    def _use(self, setting_id, referrer):
+        if setting_id is None or setting_id not in self.settings:
+            return
+        counts = self.usage.setdefault(setting_id, {})
+        counts[referrer] = counts.get(referrer, 0) + 1
+
+    def _cross_reference(self):
+        doc = self.doc
+        lc_by_name = {}
+        for sid, (kind, el) in self.settings.items():
+            if kind == LOAD_CLASSIFICATION:
+                lc_by_name[el.Name] = sid
+                try:
+                    self._use(el.DemandFactorId.IntegerValue, "load classifications")
+                except Exception:
+                    pass
+            elif kind == DISTRIBUTION_SYSTEM:
+                for voltage in (el.VoltageLineToLine, el.VoltageLineToGround):
+                    if voltage is not None:
+                        self._use(voltage.Id.IntegerValue, "distribution systems")
+
+        for circuit in DB.FilteredElementCollector(doc).OfClass(ElectricalSystem):
+            names = getattr(circuit, "LoadClassifications", "") or ""
+            for name in set(n.strip() for n in names.split(";") if n.strip()):
+                self._use(lc_by_name.get(name), "circuits")
+            self._use(_id_param(circuit, DB.BuiltInParameter.RBS_ELEC_CIRCUIT_WIRE_TYPE_PARAM), "circuits")
+
+        for wire in DB.FilteredElementCollector(doc).OfClass(Wire):
+            self._use(wire.GetTypeId().IntegerValue, "wires")
+
+        for panel in (
+            DB.FilteredElementCollector(doc)
+            .OfCategory(DB.BuiltInCategory.OST_ElectricalEquipment)
+            .WhereElementIsNotElementType()
+        ):
+            self._use(
+                _id_param(panel, DB.BuiltInParameter.RBS_FAMILY_CONTENT_DISTRIBUTION_SYSTEM),
+                "equipment",
+            )
+
+        lc_bip = DB.BuiltInParameter.RBS_ELEC_LOAD_CLASSIFICATION
+        for inst in DB.FilteredElementCollector(doc).OfClass(DB.FamilyInstance):
+            self._use(_lc_param(inst.Parameter[lc_bip], lc_by_name), "instances")
+            symbol = inst.Symbol
+            if symbol is not None:
+                self._use(_lc_param(symbol.Parameter[lc_bip], lc_by_name), "instance types")
+            mep = inst.MEPModel
+            manager = mep.ConnectorManager if mep is not None else None
+            if manager is None:
+                continue
+            for connector in manager.Connectors:
+                if connector.Domain == DB.Domain.DomainElectrical:
+                    self._use(_connector_lc(connector, lc_by_name), "connectors")
+
+    # -- queries
+    def kind(self, setting_id):
+        return self.settings[setting_id][0]
+
+    def element(self, setting_id):
+        return self.settings[setting_id][1]
+
+    def name(self, setting_id):
+        return DB.Element.Name.GetValue(self.element(setting_id))
+
+    def use_count(self, setting_id):
+        return sum(self.usage.get(setting_id, {}).values())
+
+    def describe_usage(self, setting_id):
+        counts = self.usage.get(setting_id, {})
+        return ", ".join("{} {}".format(n, ref) for ref, n in sorted(counts.items()))
+
+    def ids(self, kinds=None):
+        """Setting ids of the given kinds, sorted by kind then name."""
+        wanted = set(kinds or dict(KINDS).keys())
+        found = [sid for sid, (kind, _) in self.settings.items() if kind in wanted]
+        return sorted(found, key=lambda sid: (self.kind(sid), self.name(sid)))
+
+    def unused(self, kinds=None):
+        return [sid for sid in self.ids(kinds) if not self.use_count(sid)]
@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+"""Bulk rename engine shared by the rename tools (views, templates, sheets).
+
+A rename is fully planned before anything is written:
+
+    plan = build_plan(doc, elements, VIEW_NAME, template_rule("{Level}-{Sequence:03}"))
+    plan.rows()           # preview: old -> new, status
+    with revit.Transaction("Rename"):
+        apply_plan(plan)
+
+The plan holds the old -> new map for every element. Collisions are found
+against a hash index of the names already taken in each uniqueness group
+(view names per view type, sheet numbers across all sheets), ignoring
+case like Revit does (name_key). Invalid characters are rejected up front.
+Shifts (A -> B while B -> C) are applied in order, C first; only swaps and
+longer cycles send one element through a temporary name. A set Revit
+still refuses marks that entry FAILED and the rest of the plan goes on.
+
+Rules can be combined per element with first_match([(condition(...), rule)]),
+e.g. renumbering only the sheets whose Discipline matches, with a
+sequence_rule counting per restart key.
+"""
+
+import fnmatch
+import re
+import string
+
+from pyrevit import DB
+
+
+RENAME = "rename"
+UNCHANGED = "unchanged"
+COLLISION = "collision"
+INVALID = "invalid"
+FAILED = "failed"
+
+# characters Revit refuses in view names and sheet numbers
+INVALID_CHARS = set('\\:{}[]|;<>?`~')
+TEMP_PREFIX = "zz_rename_tmp_"
+
+
+# ---------------------------------------------------------------- fields
+class Field(object):
+    """How one kind of name is read, written and kept unique."""
+
+    def __init__(self, label, getter, setter, group=None, collect=None):
+        self.label = label
+        self.get = getter
+        self.set = setter
+        self.group = group        # element -> uniqueness group, None: no uniqueness
+        self.collect = collect    # doc -> iterable of elements sharing the namespace
+
+    def taken(self, doc):
+        """{group: set(names)} currently in use."""
+        index = {}
+        if self.group is None:
+            return index
+        for el in self.collect(doc):
+            index.setdefault(self.group(el), set()).add(self.get(el))
+        return index
+
+
+def _set_name(el, value):
+    el.Name = value
+
+
+def _set_number(el, value):
+    el.SheetNumber = value
+
+
+def _all_views(doc):
+    return [v for v in DB.FilteredElementCollector(doc).OfClass(DB.View)
+            if not isinstance(v, DB.ViewSheet)]
+
+
+def _all_sheets(doc):
+    return DB.FilteredElementCollector(doc).OfClass(DB.ViewSheet)
+
+
+VIEW_NAME = Field("View Name", lambda el: el.Name, _set_name,
+                  group=lambda el: str(el.ViewType), collect=_all_views)
+SHEET_NUMBER = Field("Sheet Number", lambda el: el.SheetNumber, _set_number,
+                     group=lambda el: "sheets", collect=_all_sheets)
+SHEET_NAME = Field("Sheet Name", lambda el: el.Name, _set_name)
+
+
+# ---------------------------------------------------------------- rules
+# A rule is a callable (element, current value, sequence index) -> new value.
+
+def case_rule(func):
+    return lambda el, old, index: func(old)
+
+
+def regex_rule(pattern, replacement, ignore_case=False):
+    """re.sub with the pattern compiled once."""
+    compiled = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+    return lambda el, old, index: compiled.sub(replacement, old)
+
+
+def param_text(el, name):
+    """Display value of a parameter by name, or None if the element lacks it."""
+    param = el.LookupParameter(name)
+    if param is None or not param.HasValue:
+        return None if param is None else ""
+    if param.StorageType == DB.StorageType.String:
+        return param.AsString() or ""
+    return param.AsValueString() or ""
+
+
+def builtin_tokens(el, old, index, start):
+    level = getattr(el, "GenLevel", None)
+    return {
+        "Old": old,
+        "Name": el.Name,
+        "Number": getattr(el, "SheetNumber", ""),
+        "Level": level.Name if level else "",
+        "ViewType": str(getattr(el, "ViewType", "")),
+        "Sequence": start + index,
+    }
+
+
+class _TokenFormatter(string.Formatter):
+    """Resolves {Token} from the built-ins first, then from element parameters."""
+
+    def __init__(self, el, builtins):
+        string.Formatter.__init__(self)
+        self.el = el
+        self.builtins = builtins
+
+    def get_value(self, key, args, kwargs):
+        if not isinstance(key, basestring):
+            raise KeyError(key)  # positional {} / {0}: only named tokens exist
+        if key in self.builtins:
+            return self.builtins[key]
+        value = param_text(self.el, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+
+def template_rule(template, start=1):
+    """Parameter-token template, e.g. '{Level}-{Discipline}-{Sequence:03}'.
+
+    Tokens: Old, Name, Number, Level, ViewType, Sequence, or any parameter name.
+    """
+    def rule(el, old, index):
+        return _TokenFormatter(el, builtin_tokens(el, old, index, start)).format(template)
+    return rule
+
+
+def natural_key(text):
+    return [int(t) if t.isdigit() else t.lower() for t in re.split(r"(\d+)", text or "")]
+
+
+def sequence_rule(template, start=1, step=1, restart=None):
+    """Template whose {Sequence} counts only the elements the rule is applied to.
+
+    `restart` is a token template (e.g. '{Discipline}'); the count starts
+    again at `start` for every new value of it. Build a fresh rule per plan.
+    """
+    counters = {}
+
+    def rule(el, old, index):
+        key = _TokenFormatter(el, builtin_tokens(el, old, 0, 0)).format(restart) if restart else None
+        seq = counters.get(key, 0)
+        counters[key] = seq + 1
+        tokens = builtin_tokens(el, old, 0, start + seq * step)
+        return _TokenFormatter(el, tokens).format(template)
+    return rule
+
+
+def prefix_rule(prefix):
+    return lambda el, old, index: prefix + old
+
+
+CONDITION_RE = re.compile(r"^\s*(?P<param>[^=!~]+?)\s*(?P<op>!=|=|~)\s*(?P<value>.*?)\s*$")
+
+
+def condition(text):
+    """'Sheet Name=*Plan*; Discipline~^Arch' -> predicate(element).
+
+    Terms are joined by ';' and must all hold: '=' / '!=' glob (case
+    insensitive), '~' regex search, on any parameter by name.
+    Raises ValueError for a term it cannot read.
+    """
+    tests = []
+    for term in (text or "").split(";"):
+        if not term.strip():
+            continue
+        m = CONDITION_RE.match(term)
+        if not m:
+            raise ValueError("cannot read condition '{}'".format(term.strip()))
+        param, op, value = m.group("param"), m.group("op"), m.group("value")
+        if op == "~":
+            try:
+                test = re.compile(value, re.IGNORECASE).search
+            except re.error as ex:
+                raise ValueError("bad regex '{}': {}".format(value, ex))
+        else:
+            pattern = value.lower()
+            test = (lambda p: lambda v: fnmatch.fnmatchcase(v.lower(), p))(pattern)
+        tests.append((param, op == "!=", test))
+
+    def predicate(el):
+        for param, negate, test in tests:
+            value = param_text(el, param)
+            hit = value is not None and bool(test(value))
+            if hit == negate:
+                return False
+        return True
+    return predicate
+
+
+def first_match(branches):
+    """Rule from [(predicate or None, rule)]: the first branch whose predicate holds."""
+    def rule(el, old, index):
+        for predicate, branch in branches:
+            if predicate is None or predicate(el):
+                return branch(el, old, index)
+        return old
+    return rule
+
+
+# ---------------------------------------------------------------- plan
+class Entry(object):
+    __slots__ = ("element", "group", "old", "new", "status", "note", "temp")
+
+    def __init__(self, element, group, old, new, status, note=""):
+        self.element = element
+        self.group = group
+        self.old = old
+        self.new = new
+        self.status = status
+        self.note = note
+        self.temp = None
+
+
+class Plan(object):
+    def __init__(self, field, entries):
+        self.field = field
+        self.entries = entries
+
+    def by_status(self, status):
+        return [e for e in self.entries if e.status == status]
+
+    @property
+    def renames(self):
+        return self.by_status(RENAME)
+
+    def counts(self):
+        result = {}
+        for e in self.entries:
+            result[e.status] = result.get(e.status, 0) + 1
+        return result
+
+    def rows(self, changes_only=True):
+        """[old, new, status, note] for the preview table."""
+        return [[e.old, e.new, e.status, e.note] for e in self.entries
+                if not changes_only or e.status != UNCHANGED]
+
+
+def name_key(name):
+    """What two names must differ in to be distinct: Revit ignores case."""
+    return name.lower()
+
+
+def name_problem(name):
+    """Why Revit would reject `name` as an element name, or None."""
+    if not name or not name.strip():
+        return "empty"
+    bad = sorted(set(name) & INVALID_CHARS)
+    return "invalid characters: {}".format(" ".join(bad)) if bad else None
+
+
+def build_plan(doc, elements, field, rule):
+    """Compute and validate old -> new for every element (nothing is written)."""
+    entries = []
+    for index, el in enumerate(elements):
+        old = field.get(el)
+        group = field.group(el) if field.group else None
+        try:
+            new = rule(el, old, index)
+        except KeyError as ex:
+            entries.append(Entry(el, group, old, old, INVALID, "unknown token {}".format(ex)))
+            continue
+        except (ValueError, IndexError, TypeError, AttributeError, re.error) as ex:
+            # bad format spec, {Token.attr} / {Token[0]} lookups, bad regex
+            entries.append(Entry(el, group, old, old, INVALID, str(ex)))
+            continue
+        if new == old:
+            entries.append(Entry(el, group, old, new, UNCHANGED))
+            continue
+        problem = name_problem(new)
+        entries.append(Entry(el, group, old, new, INVALID if problem else RENAME, problem or ""))
+
+    if field.group is not None:
+        taken = field.taken(doc)
+        _resolve_collisions(entries, taken)
+        _assign_temps(entries, taken)
+    return Plan(field, entries)
+
+
+def _resolve_collisions(entries, taken):
+    """Drop renames whose target stays taken, until the rest is consistent."""
+    taken = dict((g, set(name_key(n) for n in names)) for g, names in taken.items())
+    while True:
+        changing = [e for e in entries if e.status == RENAME]
+        released = {}
+        for e in changing:
+            released.setdefault(e.group, set()).add(name_key(e.old))
+        staying = dict((g, names - released.get(g, set())) for g, names in taken.items())
+        claimed = {}
+        clashes = 0
+        for e in changing:
+            key = (e.group, name_key(e.new))
+            if key[1] in staying.get(e.group, ()):
+                e.status, e.note = COLLISION, "name already in use"
+                clashes += 1
+            elif key in claimed:
+                e.status, e.note = COLLISION, "same new name as '{}'".format(claimed[key].old)
+                clashes += 1
+            else:
+                claimed[key] = e
+        if not clashes:
+            return
+
+
+def _blocker(by_old, e):
+    """The other rename that currently holds e's new name, or None."""
+    other = by_old.get((e.group, name_key(e.new)))
+    return other if other is not e else None
+
+
+def _assign_temps(entries, taken):
+    """Give one rename of every cycle (swap, rotation) a temporary name."""
+    changing = [e for e in entries if e.status == RENAME]
+    by_old = dict(((e.group, name_key(e.old)), e) for e in changing)
+    used = set()
+    for names in taken.values():
+        used.update(name_key(n) for n in names)
+    used.update(name_key(e.new) for e in changing)
+    counter = 0
+    seen = set()
+    for e in changing:
+        path = []
+        cur = e
+        while cur is not None and id(cur) not in seen:
+            seen.add(id(cur))
+            path.append(cur)
+            cur = _blocker(by_old, cur)
+        if cur is None or cur not in path:
+            continue  # a chain, or one already handled
+        temp = "{}{}".format(TEMP_PREFIX, counter)
+        while name_key(temp) in used:
+            counter += 1
+            temp = "{}{}".format(TEMP_PREFIX, counter)
+        used.add(name_key(temp))
+        cur.temp = temp
+        counter += 1
+
+
+def _fail(e, ex):
+    e.status, e.note = FAILED, str(ex) or type(ex).__name__
+
+
+def apply_plan(plan):
+    """Write the plan (call inside a transaction). Returns the number renamed.
+
+    Entries Revit refuses are marked FAILED with its message as the note;
+    plan.by_status(FAILED) lists them afterwards.
+    """
+    renames = plan.renames
+    setter = plan.field.set
+    by_old = dict(((e.group, name_key(e.old)), e) for e in renames)
+    for e in renames:
+        if e.temp:
+            try:
+                setter(e.element, e.temp)
+            except Exception as ex:
+                _fail(e, ex)
+    done = set()
+    renamed = 0
+    for e in renames:
+        # the holder of a new name goes first: walk the chain, apply it backwards
+        path = []
+        cur = e
+        while cur is not None and id(cur) not in done:
+            done.add(id(cur))
+            path.append(cur)
+            cur = _blocker(by_old, cur)
+            if cur is not None and cur.temp:
+                cur = None  # already moved out of the way
+        for x in reversed(path):
+            if x.status != RENAME:
+                continue
+            try:
+                setter(x.element, x.new)
+                renamed += 1
+            except Exception as ex:
+                _fail(x, ex)
+                if x.temp:
+                    try:
+                        setter(x.element, x.old)
+                    except Exception:
+                        x.note += " (left as '{}')".format(x.temp)
+    return renamed
@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+"""Project standards snapshots and the comparison of a model against them.
+
+A snapshot lists, per kind (view templates, filters, line styles, line and
+fill patterns, text, dimension and filled region types), every style with
+its defining properties and an md5 of them:
+
+    reference = snapshot(standards_doc)        # or read_snapshot(path)
+    result = compare(reference, snapshot(doc))
+    result[kind].missing / .extra / .divergent / .renamed / .collisions
+
+Styles are matched by normalized name (case and spacing ignored; dimension
+styles by style type and name, as Revit only keeps names unique per type)
+through dictionaries, and by content hash to spot renamed copies, so comparing
+thousands of styles is a few dictionary lookups each. Missing styles can
+be copied from an open standards document in one CopyElements batch.
+"""
+
+import hashlib
+import json
+import time
+
+from System.Collections.Generic import List
+from pyrevit import DB
+
+
+VIEW_TEMPLATES = "View Templates"
+FILTERS = "Filters"
+LINE_STYLES = "Line Styles"
+LINE_PATTERNS = "Line Patterns"
+FILL_PATTERNS = "Fill Patterns"
+TEXT_TYPES = "Text Types"
+DIMENSION_TYPES = "Dimension Styles"
+FILLED_REGION_TYPES = "Filled Region Types"
+
+# line styles are subcategories: Transfer Project Standards only, not CopyElements
+NOT_COPYABLE = set([LINE_STYLES])
+
+# identity / documentation parameters that do not define how a style looks
+_SKIP_PARAMS = [
+    "SYMBOL_NAME_PARAM", "ALL_MODEL_TYPE_NAME", "ALL_MODEL_FAMILY_NAME", "SYMBOL_FAMILY_NAME_PARAM",
+    "SYMBOL_FAMILY_AND_TYPE_NAMES_PARAM", "ELEM_FAMILY_PARAM", "ELEM_TYPE_PARAM",
+    "ELEM_FAMILY_AND_TYPE_PARAM", "ELEM_CATEGORY_PARAM", "ELEM_CATEGORY_PARAM_MT",
+    "ALL_MODEL_TYPE_COMMENTS", "ALL_MODEL_DESCRIPTION", "ALL_MODEL_URL", "ALL_MODEL_TYPE_IMAGE",
+    "ALL_MODEL_IMAGE", "ALL_MODEL_MANUFACTURER", "ALL_MODEL_MODEL", "ALL_MODEL_COST",
+    "KEYNOTE_PARAM", "UNIFORMAT_CODE", "DESIGN_OPTION_ID", "VIEW_NAME", "VIEW_TEMPLATE",
+    "EDITED_BY",
+]
+SKIP_PARAMS = set(int(getattr(DB.BuiltInParameter, n)) for n in _SKIP_PARAMS
+                  if hasattr(DB.BuiltInParameter, n))
+
+
+def normalize(name):
+    return " ".join((name or "").split()).lower()
+
+
+def content_hash(props):
+    return hashlib.md5(json.dumps(props, sort_keys=True)).hexdigest()
+
+
+# ---------------------------------------------------------------- properties
+class _Names(object):
+    """Element id -> name, resolved once per id (built-in ids stay numbers)."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self._names = {}
+
+    def __call__(self, element_id):
+        key = element_id.IntegerValue
+        if key not in self._names:
+            el = self.doc.GetElement(element_id) if key > 0 else None
+            self._names[key] = DB.Element.Name.GetValue(el) if el else key
+        return self._names[key]
+
+
+def _param_value(param, names):
+    storage = param.StorageType
+    if storage == DB.StorageType.String:
+        return param.AsString() or ""
+    if storage == DB.StorageType.ElementId:
+        return names(param.AsElementId())
+    if storage == DB.StorageType.Double:
+        return round(param.AsDouble(), 6)
+    return param.AsInteger()
+
+
+def param_props(el, names):
+    """{parameter name: value} of the parameters that define the element."""
+    props = {}
+    for param in el.Parameters:
+        if not param.HasValue:
+            continue
+        definition = param.Definition
+        bip = getattr(definition, "BuiltInParameter", None)
+        if bip is not None and int(bip) in SKIP_PARAMS:
+            continue
+        props[definition.Name] = _param_value(param, names)
+    return props
+
+
+def _rule_text(rule, names):
+    parts = [type(rule).__name__]
+    evaluator = getattr(rule, "GetEvaluator", None)
+    if evaluator:
+        parts.append(type(evaluator()).__name__)
+    for attr in ("RuleString", "RuleValue"):
+        value = getattr(rule, attr, None)
+        if value is not None:
+            parts.append(names(value) if isinstance(value, DB.ElementId) else value)
+    try:
+        parts.insert(0, names(rule.GetRuleParameter()))
+    except Exception:
+        pass
+    inner = getattr(rule, "GetInnerRule", None)
+    if inner:
+        parts.append(_rule_text(inner(), names))
+    return parts
+
+
+def _filter_text(element_filter, names):
+    if element_filter is None:
+        return None
+    kind = type(element_filter).__name__
+    if hasattr(element_filter, "GetFilters"):
+        return [kind] + [_filter_text(f, names) for f in element_filter.GetFilters()]
+    if hasattr(element_filter, "GetRules"):
+        return [kind] + [_rule_text(r, names) for r in element_filter.GetRules()]
+    return kind
+
+
+def _template_props(view, names):
+    props = param_props(view, names)
+    props["View Type"] = str(view.ViewType)
+    filters = []
+    try:
+        for fid in view.GetFilters():
+            filters.append("{}:{}".format(names(fid), "V" if view.GetFilterVisibility(fid) else "H"))
+    except Exception:
+        pass
+    props["Filters"] = sorted(filters)
+    return props
+
+
+def _filter_props(f, names):
+    doc = f.Document
+    categories = []
+    for cid in f.GetCategories():
+        cat = DB.Category.GetCategory(doc, cid)
+        categories.append(cat.Name if cat else cid.IntegerValue)
+    props = {"Categories": sorted(categories)}
+    try:
+        props["Rules"] = _filter_text(f.GetElementFilter(), names)
+    except Exception:
+        pass
+    return props
+
+
+def _line_style_props(cat, names):
+    projection = DB.GraphicsStyleType.Projection
+    color = cat.LineColor
+    return {
+        "Color": [color.Red, color.Green, color.Blue] if color.IsValid else None,
+        "Weight": cat.GetLineWeight(projection),
+        "Pattern": names(cat.GetLinePatternId(projection)),
+    }
+
+
+def _line_pattern_props(lp, names):
+    segments = lp.GetLinePattern().GetSegments()
+    return {"Segments": [[str(s.Type), round(s.Length, 6)] for s in segments]}
+
+
+def _fill_pattern_props(fp, names):
+    pattern = fp.GetFillPattern()
+    grids = []
+    for i in range(pattern.GridCount):
+        g = pattern.GetFillGrid(i)
+        grids.append([round(g.Angle, 6), round(g.Origin.U, 6), round(g.Origin.V, 6),
+                      round(g.Offset, 6), round(g.Shift, 6),
+                      [round(s, 6) for s in g.GetSegments()]])
+    return {"Target": str(pattern.Target), "Solid": pattern.IsSolidFill, "Grids": grids}
+
+
+def _dimension_props(el, names):
+    props = param_props(el, names)
+    props["Style Type"] = str(el.StyleType)
+    return props
+
+
+def _templates(doc):
+    return [v for v in DB.FilteredElementCollector(doc).OfClass(DB.View) if v.IsTemplate]
+
+
+def _of_class(cls):
+    return lambda doc: DB.FilteredElementCollector(doc).OfClass(cls)
+
+
+def _line_styles(doc):
+    return list(doc.Settings.Categories.get_Item(DB.BuiltInCategory.OST_Lines).SubCategories)
+
+
+# kind -> (collect(doc), name(element), props(element, names))
+KINDS = [
+    (VIEW_TEMPLATES, _templates, lambda v: v.Name, _template_props),
+    (FILTERS, _of_class(DB.ParameterFilterElement), DB.Element.Name.GetValue, _filter_props),
+    (LINE_STYLES, _line_styles, lambda c: c.Name, _line_style_props),
+    (LINE_PATTERNS, _of_class(DB.LinePatternElement), lambda e: e.Name, _line_pattern_props),
+    (FILL_PATTERNS, _of_class(DB.FillPatternElement), lambda e: e.Name, _fill_pattern_props),
+    (TEXT_TYPES, _of_class(DB.TextNoteType), DB.Element.Name.GetValue, param_props),
+    (DIMENSION_TYPES, _of_class(DB.DimensionType), DB.Element.Name.GetValue, _dimension_props),
+    (FILLED_REGION_TYPES, _of_class(DB.FilledRegionType), DB.Element.Name.GetValue, param_props),
+]
+KIND_NAMES = [k[0] for k in KINDS]
+
+
+# ---------------------------------------------------------------- snapshots
+def snapshot(doc, kinds=None):
+    """{"source", "created", "kinds": {kind: [{"name", "hash", "props", "id"}]}}"""
+    names = _Names(doc)
+    result = {"source": doc.Title, "created": time.strftime("%Y-%m-%d %H:%M"), "kinds": {}}
+    for kind, collect, get_name, get_props in KINDS:
+        if kinds and kind not in kinds:
+            continue
+        items = []
+        for el in collect(doc):
+            name = get_name(el)
+            if not name:
+                continue
+            try:
+                props = get_props(el, names)
+            except Exception as ex:
+                props = {"error": str(ex)}
+            items.append({"name": name, "hash": content_hash(props), "props": props,
+                          "id": el.Id.IntegerValue})
+        result["kinds"][kind] = items
+    return result
+
+
+def write_snapshot(path, snap):
+    with open(path, "wb") as f:
+        json.dump(snap, f, indent=1, sort_keys=True)
+
+
+def read_snapshot(path):
+    with open(path, "rb") as f:
+        snap = json.load(f)
+    if "kinds" not in snap:
+        raise ValueError("not a standards snapshot: {}".format(path))
+    return snap
+
+
+# ---------------------------------------------------------------- comparison
+class KindResult(object):
+    def __init__(self, kind):
+        self.kind = kind
+        self.missing = []     # reference items not in the model (by name or content)
+        self.extra = []       # model items not in the reference
+        self.divergent = []   # (reference item, model item, [differing properties])
+        self.renamed = []     # (reference item, model item) same content, other name
+        self.collisions = []  # (side, kept item, item with the same match key, not compared)
+        self.matching = 0
+
+    def counts(self):
+        return [len(self.missing), len(self.extra), len(self.divergent), len(self.renamed),
+                len(self.collisions), self.matching]
+
+
+def match_key(kind, item):
+    """Key two snapshots' items are paired by."""
+    if kind == DIMENSION_TYPES:
+        return (item["props"].get("Style Type"), normalize(item["name"]))
+    return normalize(item["name"])
+
+
+def _index(kind, items, side, res):
+    """{match key: item}; the lowest id wins a shared key, the others are collisions."""
+    by_key = {}
+    for item in sorted(items, key=lambda i: i.get("id")):
+        key = match_key(kind, item)
+        if key in by_key:
+            res.collisions.append((side, by_key[key], item))
+        else:
+            by_key[key] = item
+    return by_key
+
+
+def _diff_keys(a, b):
+    return sorted(k for k in set(a) | set(b) if a.get(k) != b.get(k))
+
+
+def compare(reference, current):
+    """{kind: KindResult} for every kind in both snapshots (one dictionary pass each)."""
+    results = {}
+    for kind in KIND_NAMES:
+        if kind not in reference["kinds"] or kind not in current["kinds"]:
+            continue
+        res = KindResult(kind)
+        ref_by_name = _index(kind, reference["kinds"][kind], "standard", res)
+        cur_by_name = _index(kind, current["kinds"][kind], "model", res)
+        for key, ref in ref_by_name.items():
+            cur = cur_by_name.get(key)
+            if cur is None:
+                res.missing.append(ref)
+            elif cur["hash"] == ref["hash"]:
+                res.matching += 1
+            else:
+                res.divergent.append((ref, cur, _diff_keys(ref["props"], cur["props"])))
+        extra = [cur for key, cur in cur_by_name.items() if key not in ref_by_name]
+        missing_by_hash = dict((i["hash"], i) for i in res.missing)
+        for cur in extra:
+            ref = missing_by_hash.pop(cur["hash"], None)
+            if ref is not None:
+                res.renamed.append((ref, cur))
+            else:
+                res.extra.append(cur)
+        renamed = set(id(ref) for ref, _ in res.renamed)
+        res.missing = [i for i in res.missing if id(i) not in renamed]
+        for key in ("missing", "extra"):
+            getattr(res, key).sort(key=lambda i: normalize(i["name"]))
+        res.divergent.sort(key=lambda d: normalize(d[0]["name"]))
+        res.renamed.sort(key=lambda d: normalize(d[0]["name"]))
+        res.collisions.sort(key=lambda d: (d[0], normalize(d[2]["name"])))
+        results[kind] = res
+    return results
+
+
+# ---------------------------------------------------------------- fix-up
+class _UseDestinationTypes(DB.IDuplicateTypeNamesHandler):
+    def OnDuplicateTypeNamesFound(self, args):
+        return DB.DuplicateTypeAction.UseDestinationTypes
+
+
+def copy_missing(source_doc, doc, results, kinds=None):
+    """Copy every missing item from `source_doc` in one CopyElements batch.
+
+    Call inside a transaction on `doc`. Returns the number of new elements.
+    """
+    ids = []
+    for kind, res in results.items():
+        if kind in NOT_COPYABLE or (kinds and kind not in kinds):
+            continue
+        ids.extend(DB.ElementId(item["id"]) for item in res.missing)
+    if not ids:
+        return 0
+    options = DB.CopyPasteOptions()
+    options.SetDuplicateTypeNamesHandler(_UseDestinationTypes())
+    copied = DB.ElementTransformUtils.CopyElements(
+        source_doc, List[DB.ElementId](ids), doc, DB.Transform.Identity, options
+    )
+    return copied.Count
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""Ordered multi-rule regex rename for annotation types and line styles.
+
+    rules = read_rules(path)                 # Scope, Pattern, Replacement, Ignore Case
+    plans = build_plans(doc, rules)          # one renamer.Plan per scope
+    with revit.Transaction("Rename Styles"):
+        apply_plans(plans)
+
+Every rule is compiled once and the rules of one scope are chained in
+order over each name. Collisions are checked by lib/renamer.py against a
+hash index of the names in use; with `unique=True` a colliding name gets
+a _1, _2, ... suffix instead. Types are renamed in place. Line styles
+(Lines subcategories) cannot be renamed through the API, so each one is
+replaced: a new subcategory with the same colour, weight and pattern,
+the same visibility / graphics overrides in every view and template, one
+pass moving the lines over from an index built once, then the old one is
+deleted. A line style used by lines inside groups is left alone (lines in
+groups cannot be moved) and reported as failed. View filters whose rules
+test Line Style keep pointing at the deleted style and must be re-picked.
+Rule sets are CSV files so they can be reused across projects.
+"""
+
+import csv
+import re
+
+from pyrevit import DB
+
+import renamer
+from csvutil import enc_row, read_rows
+from typeusage import type_name
+
+
+TEXT_TYPES = "Text Types"
+DIMENSION_TYPES = "Dimension Styles"
+FILLED_REGION_TYPES = "Filled Region Types"
+LINE_STYLES = "Line Styles"
+
+SCOPES = [TEXT_TYPES, DIMENSION_TYPES, FILLED_REGION_TYPES, LINE_STYLES]
+CSV_COLUMNS = ["Scope", "Pattern", "Replacement", "Ignore Case"]
+
+
+# ---------------------------------------------------------------- rules
+class Rule(object):
+    def __init__(self, scope, pattern, replacement, ignore_case=False):
+        if scope not in SCOPES:
+            raise ValueError("unknown scope '{}' (scopes: {})".format(scope, ", ".join(SCOPES)))
+        self.scope = scope
+        self.pattern = pattern
+        self.replacement = replacement
+        self.ignore_case = ignore_case
+        self.compiled = re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+
+    def apply(self, name):
+        return self.compiled.sub(self.replacement, name)
+
+
+def _truthy(text):
+    return (text or "").strip().lower() in ("1", "yes", "true", "y", "x")
+
+
+def read_rules(path):
+    """Rules of a rule set CSV in file order. Raises ValueError on a bad row."""
+    rules = []
+    with open(path, "rb") as csvfile:
+        for line, row in enumerate(read_rows(csvfile, strip=False), 2):
+            row = dict((k, v.decode("utf-8")) for k, v in row.items())
+            if not row.get("Pattern"):
+                continue
+            try:
+                rules.append(Rule(row.get("Scope", "").strip(), row["Pattern"],
+                                  row.get("Replacement", ""), _truthy(row.get("Ignore Case"))))
+            except (ValueError, re.error) as ex:
+                raise ValueError("row {}: {}".format(line, ex))
+    return rules
+
+
+def write_rules(path, rules):
+    with open(path, "wb") as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(CSV_COLUMNS)
+        for r in rules:
+            writer.writerow(enc_row([r.scope, r.pattern, r.replacement,
+                                     "yes" if r.ignore_case else ""]))
+
+
+# ---------------------------------------------------------------- line styles
+class LineStyle(object):
+    """A user line style. Renaming replaces the subcategory, so it is held by reference."""
+
+    def __init__(self, category):
+        self.category = category
+
+    @property
+    def name(self):
+        return self.category.Name
+
+
+def _lines_category(doc):
+    return doc.Settings.Categories.get_Item(DB.BuiltInCategory.OST_Lines)
+
+
+def line_styles(doc, user_only=True):
+    styles = [LineStyle(c) for c in _lines_category(doc).SubCategories]
+    if user_only:
+        styles = [s for s in styles if s.category.Id.IntegerValue > 0]
+    return styles
+
+
+class LineStyleSwapper(object):
+    """Replaces a line style by a renamed copy and moves its lines over."""
+
+    PROJECTION = DB.GraphicsStyleType.Projection
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.parent = _lines_category(doc)
+        self._curves = None
+        self._views = None
+
+    @property
+    def curves(self):
+        """graphics style id -> [curve elements], built once on first use."""
+        if self._curves is None:
+            self._curves = {}
+            for curve in DB.FilteredElementCollector(self.doc).OfClass(DB.CurveElement):
+                style = curve.LineStyle
+                if style is not None:
+                    self._curves.setdefault(style.Id.IntegerValue, []).append(curve)
+        return self._curves
+
+    @property
+    def views(self):
+        """Views and templates that take category overrides, collected once."""
+        if self._views is None:
+            self._views = [v for v in DB.FilteredElementCollector(self.doc).OfClass(DB.View)
+                           if v.AreGraphicsOverridesAllowed()]
+        return self._views
+
+    def _copy_overrides(self, old, new):
+        for view in self.views:
+            try:
+                view.SetCategoryOverrides(new.Id, view.GetCategoryOverrides(old.Id))
+                if view.GetCategoryHidden(old.Id):
+                    view.SetCategoryHidden(new.Id, True)
+            except Exception:
+                pass  # V/G controlled by the view's template, copied there
+
+    def rename(self, style, new_name):
+        old = style.category
+        old_style_id = old.GetGraphicsStyle(self.PROJECTION).Id.IntegerValue
+        grouped = [c for c in self.curves.get(old_style_id, [])
+                   if c.GroupId != DB.ElementId.InvalidElementId]
+        if grouped:
+            raise ValueError("used by {} lines in groups".format(len(grouped)))
+        new = self.doc.Settings.Categories.NewSubcategory(self.parent, new_name)
+        new.LineColor = old.LineColor
+        weight = old.GetLineWeight(self.PROJECTION)
+        if weight:
+            new.SetLineWeight(weight, self.PROJECTION)
+        new.SetLinePatternId(old.GetLinePatternId(self.PROJECTION), self.PROJECTION)
+        self._copy_overrides(old, new)
+        new_style = new.GetGraphicsStyle(self.PROJECTION)
+        moved = self.curves.pop(old_style_id, [])
+        for curve in moved:
+            curve.LineStyle = new_style
+        self.curves[new_style.Id.IntegerValue] = moved
+        self.doc.Delete(old.Id)
+        style.category = new
+
+
+# ---------------------------------------------------------------- fields
+def _set_name(el, value):
+    el.Name = value
+
+
+def _type_field(label, cls, group=None):
+    return renamer.Field(
+        label, type_name, _set_name,
+        group=group or (lambda el: label),
+        collect=lambda doc: DB.FilteredElementCollector(doc).OfClass(cls),
+    )
+
+
+TYPE_FIELDS = {
+    TEXT_TYPES: _type_field(TEXT_TYPES, DB.TextNoteType),
+    # dimension type names are unique per style family (linear, angular, ...)
+    DIMENSION_TYPES: _type_field(DIMENSION_TYPES, DB.DimensionType, lambda el: str(el.StyleType)),
+    FILLED_REGION_TYPES: _type_field(FILLED_REGION_TYPES, DB.FilledRegionType),
+}
+
+
+def field_for(doc, scope):
+    if scope in TYPE_FIELDS:
+        return TYPE_FIELDS[scope]
+    swapper = LineStyleSwapper(doc)
+    return renamer.Field(
+        LINE_STYLES, lambda s: s.name, swapper.rename,
+        group=lambda s: LINE_STYLES,
+        collect=lambda d: line_styles(d, user_only=False),
+    )
+
+
+def elements_for(doc, scope):
+    """Elements a rule of `scope` renames (user line styles only), sorted by name."""
+    if scope == LINE_STYLES:
+        return sorted(line_styles(doc), key=lambda s: s.name)
+    return sorted(TYPE_FIELDS[scope].collect(doc), key=type_name)
+
+
+# ---------------------------------------------------------------- plans
+def chain(rules):
+    """renamer rule applying `rules` in order."""
+    def rule(el, old, index):
+        name = old
+        for r in rules:
+            name = r.apply(name)
+        return name
+    return rule
+
+
+def _unique_rule(doc, elements, field, rule):
+    """Precompute all new names, suffixing _1, _2, ... where a name is taken."""
+    final = {}
+    raw = []
+    for index, el in enumerate(elements):
+        old = field.get(el)
+        try:
+            raw.append((el, old, rule(el, old, index)))
+        except (ValueError, IndexError, re.error):
+            continue  # build_plan reports the error
+    key = renamer.name_key  # the same case rule the plan checks collisions with
+    released = set((field.group(el), key(old)) for el, old, new in raw if new != old)
+    taken = set()
+    for group, names in field.taken(doc).items():
+        taken.update((group, key(n)) for n in names if (group, key(n)) not in released)
+    for el, old, new in raw:
+        group = field.group(el)
+        name, suffix = new, 1
+        if new != old:
+            while (group, key(name)) in taken:
+                name = "{}_{}".format(new, suffix)
+                suffix += 1
+        taken.add((group, key(name)))
+        final[id(el)] = name
+
+    def unique(el, old, index):
+        if id(el) in final:
+            return final[id(el)]
+        return rule(el, old, index)
+    return unique
+
+
+def build_plans(doc, rules, scopes=None, unique=False):
+    """{scope: renamer.Plan} for every scope that has rules (nothing is written)."""
+    plans = {}
+    for scope in SCOPES:
+        scoped = [r for r in rules if r.scope == scope]
+        if not scoped or (scopes and scope not in scopes):
+            continue
+        field = field_for(doc, scope)
+        elements = elements_for(doc, scope)
+        rule = chain(scoped)
+        if unique:
+            rule = _unique_rule(doc, elements, field, rule)
+        plans[scope] = renamer.build_plan(doc, elements, field, rule)
+    return plans
+
+
+def preview_rows(plans):
+    """[scope, old, new, status, note] of every changing entry."""
+    rows = []
+    for scope in SCOPES:
+        if scope in plans:
+            rows.extend([scope] + row for row in plans[scope].rows())
+    return rows
+
+
+def apply_plans(plans):
+    """Write every plan (call inside one transaction). Returns {scope: renamed}.
+
+    Entries Revit refused are left in each plan as renamer.FAILED.
+    """
+    return dict((scope, renamer.apply_plan(plan)) for scope, plan in plans.items())
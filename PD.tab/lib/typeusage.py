@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""Instance counts per type for annotation type classes, shared by the purge tools.
+
+Types of every kind are gathered with one multi-class (+ viewport category)
+collector and instances with one multi-class collector, so a single pass
+gives the instance count of every text, dimension, filled region and
+viewport type. On Revit 2024+ the purge list of the document is consulted
+too, so types still referenced elsewhere (nested families, view templates,
+other types) are never reported as unused. Default types are protected.
+
+The same pass keeps a type id -> instance ids index, so swapping instances
+between types (reassign, or duplicate -> swap -> delete renames) is one
+bulk ChangeTypeId per old type instead of a scan of every instance.
+"""
+
+import csv
+
+import clr
+from System import Type
+from System.Collections.Generic import HashSet, List
+from pyrevit import DB
+
+from csvutil import enc
+
+
+TEXT = "Text Style"
+DIMENSION = "Dimension Style"
+FILLED_REGION = "Filled Region Type"
+VIEWPORT = "Viewport Type"
+
+# kind -> (type class or None, instance class)
+KINDS = {
+    TEXT: (DB.TextNoteType, DB.TextNote),
+    DIMENSION: (DB.DimensionType, DB.Dimension),
+    FILLED_REGION: (DB.FilledRegionType, DB.FilledRegion),
+    VIEWPORT: (None, DB.Viewport),  # viewport types are plain ElementTypes
+}
+
+DEFAULT_GROUPS = [
+    "TextNoteType", "FilledRegionType", "ViewportType", "LinearDimensionType",
+    "AngularDimensionType", "RadialDimensionType", "DiameterDimensionType",
+    "ArcLengthDimensionType", "SpotElevationType", "SpotCoordinateType", "SpotSlopeType",
+]
+
+IN_USE = "in use"
+UNUSED = "unused"
+DEFAULT = "default type"
+REFERENCED = "referenced"
+
+
+def type_name(el):
+    param = el.get_Parameter(DB.BuiltInParameter.SYMBOL_NAME_PARAM)
+    name = param.AsString() if param else None
+    return name or DB.Element.Name.GetValue(el) or "(Unnamed)"
+
+
+def _classes(types):
+    return List[Type]([clr.GetClrType(t) for t in types if t is not None])
+
+
+class TypeUsage(object):
+    def __init__(self, doc, kinds=None):
+        self.doc = doc
+        self.kinds = list(kinds or KINDS.keys())
+        self.types = dict((kind, []) for kind in self.kinds)
+        self.kind_of = {}      # type id -> kind
+        self.instances = {}    # type id -> [instance ElementIds]
+        self._collect_types()
+        self._count_instances()
+        self.defaults = self._default_ids()
+        self._referenced = False   # purge-list lookup, only when a status is asked
+
+    def _collect_types(self):
+        by_class = dict((KINDS[k][0], k) for k in self.kinds if KINDS[k][0] is not None)
+        type_filter = DB.ElementMulticlassFilter(_classes(by_class.keys())) if by_class else None
+        if VIEWPORT in self.kinds:
+            vp_filter = DB.ElementCategoryFilter(DB.BuiltInCategory.OST_Viewports)
+            type_filter = DB.LogicalOrFilter(type_filter, vp_filter) if type_filter else vp_filter
+        for el in DB.FilteredElementCollector(self.doc).WhereElementIsElementType().WherePasses(type_filter):
+            kind = None
+            for cls, k in by_class.items():
+                if isinstance(el, cls):
+                    kind = k
+                    break
+            if kind is None and VIEWPORT in self.kinds and el.Category is not None \
+                    and el.Category.Id.IntegerValue == int(DB.BuiltInCategory.OST_Viewports):
+                kind = VIEWPORT
+            if kind is not None:
+                self.types[kind].append(el)
+                self.kind_of[el.Id.IntegerValue] = kind
+                self.instances[el.Id.IntegerValue] = []
+
+    def _count_instances(self):
+        classes = _classes(KINDS[k][1] for k in self.kinds)
+        for el in (
+            DB.FilteredElementCollector(self.doc)
+            .WhereElementIsNotElementType()
+            .WherePasses(DB.ElementMulticlassFilter(classes))
+        ):
+            tid = el.GetTypeId().IntegerValue
+            if tid in self.instances:
+                self.instances[tid].append(el.Id)
+
+    def _default_ids(self):
+        ids = set()
+        for group in DEFAULT_GROUPS:
+            try:
+                default = self.doc.GetDefaultElementTypeId(getattr(DB.ElementTypeGroup, group))
+                ids.add(default.IntegerValue)
+            except Exception:
+                continue
+        return ids
+
+    @property
+    def referenced(self):
+        """Types Revit would not purge although no instance uses them (2024+), else None."""
+        if self._referenced is False:
+            try:
+                purgeable = set(i.IntegerValue for i in self.doc.GetUnusedElements(HashSet[DB.ElementId]()))
+                self._referenced = set(tid for tid in self.instances if tid not in purgeable)
+            except Exception:
+                self._referenced = None
+        return self._referenced
+
+    # -- queries
+    def count(self, type_id):
+        return len(self.instances.get(type_id, ()))
+
+    def status(self, type_id):
+        if self.count(type_id):
+            return IN_USE
+        if type_id in self.defaults:
+            return DEFAULT
+        if self.referenced is not None and type_id in self.referenced:
+            return REFERENCED
+        return UNUSED
+
+    def rows(self, kind):
+        """[name, instance count, status] per type of one kind, sorted by name."""
+        return sorted(
+            [type_name(t), self.count(t.Id.IntegerValue), self.status(t.Id.IntegerValue)]
+            for t in self.types[kind]
+        )
+
+    def unused(self, kind):
+        return sorted(
+            (t for t in self.types[kind] if self.status(t.Id.IntegerValue) == UNUSED),
+            key=type_name,
+        )
+
+    def used(self, kind):
+        return sorted((t for t in self.types[kind] if self.count(t.Id.IntegerValue)), key=type_name)
+
+    def by_name(self, kind):
+        return dict((type_name(t), t) for t in self.types[kind])
+
+    # -- changes (call inside a transaction)
+    def swap(self, mapping):
+        """Move every instance of each old type to its new type.
+
+        mapping: {old type ElementId: new type ElementId}. All instance lists
+        are read before any change, so chains and swaps (a -> b, b -> a) are
+        safe. Returns {old type id: instances moved}; the index is updated.
+        """
+        pending = [(old, new, list(self.instances.get(old.IntegerValue, ())))
+                   for old, new in mapping.items() if old != new]
+        moved = {}
+        for old, new, ids in pending:
+            if ids:
+                _change_type(self.doc, ids, new)
+            moved[old.IntegerValue] = len(ids)
+        for old, _, _ in pending:
+            self.instances[old.IntegerValue] = []
+        for _, new, ids in pending:
+            self.instances.setdefault(new.IntegerValue, []).extend(ids)
+        return moved
+
+    def delete(self, types):
+        """Delete types (call inside a transaction). Returns (count, [(name, error)])."""
+        count, failed = 0, []
+        for t in types:
+            name = type_name(t)
+            try:
+                self.doc.Delete(t.Id)
+                count += 1
+            except Exception as ex:
+                failed.append((name, str(ex)))
+        return count, failed
+
+    def write_csv(self, path):
+        with open(path, "wb") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["Kind", "Type", "Instances", "Status"])
+            for kind in self.kinds:
+                for name, count, status in self.rows(kind):
+                    writer.writerow([kind, enc(name), count, status])
+
+
+def _change_type(doc, ids, new_type_id):
+    """Bulk ChangeTypeId for one target type; per element where the overload is missing."""
+    try:
+        DB.Element.ChangeTypeId(doc, List[DB.ElementId](ids), new_type_id)
+    except (AttributeError, TypeError):
+        for eid in ids:
+            doc.GetElement(eid).ChangeTypeId(new_type_id)